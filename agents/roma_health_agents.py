@@ -1,4 +1,5 @@
 from typing import Dict, Any
+import health_scoring
 
 # ---- Validation & normalization ----
 def validate_health_data(data: Dict[str, Any]) -> Dict[str, Any]:
@@ -28,30 +29,15 @@ def normalize_data(data: Dict[str, Any]) -> Dict[str, Any]:
     return n
 
 # ---- Scoring helpers (0–100) ----
+# Scalar wrappers over health_scoring (pass arrays to the module directly for batches)
 def _scale(value: float, target: float, max_value: float) -> float:
-    if max_value <= 0: return 0.0
-    ratio = min(value / target, 1.0)
-    # smooth cap toward target, allow small bonus if above target (up to +10%)
-    score = ratio * 100.0
-    if value > target:
-        bonus = min((value - target) / max_value, 0.1) * 100.0
-        score = min(100.0, score + bonus)
-    return round(score, 1)
+    return float(health_scoring.scale(value, target, max_value))
 
 def calc_activity_score(steps: int, workouts: int) -> float:
-    # 10k steps target, 3 workouts target; 30k max considered for bonus
-    steps_score = _scale(float(steps), 10000.0, 30000.0)
-    wkt_score = _scale(float(workouts), 3.0, 10.0)
-    return round(0.7 * steps_score + 0.3 * wkt_score, 1)
+    return float(health_scoring.activity_score(steps, workouts))
 
 def calc_sleep_score(sleep_hours: float) -> float:
-    # ideal 7.5h; penalize distance from 7.5 within [0,12]
-    ideal = 7.5
-    max_dev = 4.5  # from 7.5 to 3.0 or 12.0
-    deviation = min(abs(sleep_hours - ideal), max_dev)
-    score = (1.0 - deviation / max_dev) * 100.0
-    return round(max(0.0, min(100.0, score)), 1)
+    return float(health_scoring.sleep_score(sleep_hours))
 
 def calc_hydration_score(water_liters: float) -> float:
-    # target 2.5L, bonus up to 3.5L
-    return _scale(water_liters, 2.5, 3.5)
+    return float(health_scoring.hydration_score(water_liters))
@@ -12,7 +12,7 @@ from logging_config import get_logger
 
 # Import fallback system
 try:
-    from llm_fallback import call_llm_with_fallback, get_fallback_status
+    from llm_fallback import call_llm_with_fallback, acall_llm_with_fallback, get_fallback_status
     FALLBACK_AVAILABLE = True
 except ImportError:
     FALLBACK_AVAILABLE = False
@@ -57,15 +57,11 @@ async def simple_execute(
         
         # Use asyncio timeout to prevent hanging
         async def execute_with_timeout():
-            loop = asyncio.get_event_loop()
-            # Run LLM call in thread pool to avoid blocking
-            result = await loop.run_in_executor(
-                None, 
-                call_llm_with_fallback,
+            # Async hedged LLM call; does not block the event loop
+            return await acall_llm_with_fallback(
                 prompt,
                 "You are a helpful AI assistant. Provide clear, concise responses."
             )
-            return result
         
         # Execute with timeout
         result = await asyncio.wait_for(execute_with_timeout(), timeout=timeout)
@@ -126,14 +122,7 @@ async def simple_analysis(
         start_time = time.time()
         
         async def analyze_with_timeout():
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None,
-                call_llm_with_fallback,
-                prompt,
-                system_prompt
-            )
-            return result
+            return await acall_llm_with_fallback(prompt, system_prompt)
         
         analysis_result = await asyncio.wait_for(analyze_with_timeout(), timeout=30)
         
@@ -186,14 +175,7 @@ async def simple_research(
         start_time = time.time()
         
         async def research_with_timeout():
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None,
-                call_llm_with_fallback,
-                prompt,
-                system_prompt
-            )
-            return result
+            return await acall_llm_with_fallback(prompt, system_prompt)
         
         research_result = await asyncio.wait_for(research_with_timeout(), timeout=45)
         
@@ -230,7 +212,7 @@ async def simple_test():
         try:
             # Test LLM fallback with simple prompt
             test_prompt = "Say 'Hello from the simple API!' in exactly those words."
-            result = call_llm_with_fallback(test_prompt, "", temperature=0.1)
+            result = await acall_llm_with_fallback(test_prompt, "", temperature=0.1)
             test_results["llm_test"] = "success"
             test_results["llm_response"] = result[:100] + "..." if len(result) > 100 else result
         except Exception as e:
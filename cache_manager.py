@@ -1,59 +1,385 @@
 # cache_manager.py
+import hashlib
 import json
+import os
+import random
+import re
+import sqlite3
+import threading
 import time
-from typing import Optional, Dict, Any
+from collections import OrderedDict
+from typing import Optional, Dict, Any, FrozenSet, List
 from datetime import datetime, timedelta
 
+# ----------------- Query canonicalization -----------------
+# Multi-word health terms folded to one token (longest phrases first)
+PHRASE_SYNONYMS = [
+    ("resting heart rate", "rhr"),
+    ("heart rate variability", "hrv"),
+    ("resting hr", "rhr"),
+    ("heart rate", "hr"),
+    ("blood pressure", "bp"),
+    ("vo2 max", "vo2max"),
+    ("high intensity interval training", "hiit"),
+    ("high intensity interval", "hiit"),
+]
+
+# Only words interchangeable in any health query: direction words stay apart
+# ("increase" is not "improve", "drop" may be a symptom), and near-misses such as
+# rest/sleep, daily/day or step/walk ask different questions
+TOKEN_SYNONYMS = {
+    "enhance": "improve", "optimize": "improve", "optimise": "improve",
+    "boost": "increase", "raise": "increase",
+    "lower": "reduce", "decrease": "reduce",
+    "workout": "exercise",
+    "hydrate": "hydration", "h2o": "water",
+    "slumber": "sleep",
+    "advantage": "benefit",
+}
+
+# Filler only: interrogatives (how/why/when/what), quantities (much/more/many) and
+# intent words (need/best/tips/ways) change the question and stay in the key
+STOPWORDS = frozenset("""
+a an the and or of for to in on at by with from about into as is are was were be been being
+do does did doing can could should would will shall may might must i me my mine we our you your
+it its this that these those there here really very just also get getting have has had
+please tell
+""".split())
+
+def _stem(token: str) -> str:
+    """Light suffix stripping so plural/-ing variants share a key"""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 5 and token.endswith("ing"):
+        return token[:-3]
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+def canonical_tokens(query: str) -> List[str]:
+    """Normalized, synonym-folded, stopword-free tokens (sorted, unique)"""
+    text = re.sub(r"[^a-z0-9\s]", " ", query.lower())
+    text = " ".join(text.split())
+    for phrase, replacement in PHRASE_SYNONYMS:
+        text = re.sub(rf"\b{phrase}\b", replacement, text)
+    tokens = set()
+    for raw in text.split():
+        if raw in STOPWORDS:
+            continue
+        token = _stem(raw)
+        token = TOKEN_SYNONYMS.get(token, TOKEN_SYNONYMS.get(raw, token))
+        if token not in STOPWORDS:
+            tokens.add(token)
+    return sorted(tokens)
+
+def canonicalize_query(query: str) -> str:
+    """
+    Canonical form used for cache keys, e.g.
+    "how to improve HRV" and "how can I improve my heart rate variability" -> "how hrv improve"
+    """
+    tokens = canonical_tokens(query)
+    return " ".join(tokens) if tokens else query.lower().strip()
+
+class NearDuplicateIndex:
+    """
+    MinHash + LSH index over canonical token sets
+
+    Candidates come from matching LSH bands, then are verified with exact
+    Jaccard similarity against `threshold`.
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 32, bands: int = 16):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = random.Random(1)  # fixed seed so signatures are stable across restarts
+        self.perms = [(rng.randrange(1, self._PRIME), rng.randrange(0, self._PRIME)) for _ in range(num_perm)]
+        self.buckets: Dict[tuple, set] = {}
+        self.entries: Dict[str, tuple] = {}  # key -> (namespace, tokens, band keys)
+
+    _PRIME = (1 << 61) - 1
+
+    def _signature(self, tokens: FrozenSet[str]) -> List[int]:
+        # One 64-bit hash per token, permuted with (a*h + b) mod p per slot
+        sig = [self._PRIME] * self.num_perm
+        for token in tokens:
+            h = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+            for i, (a, b) in enumerate(self.perms):
+                v = (a * h + b) % self._PRIME
+                if v < sig[i]:
+                    sig[i] = v
+        return sig
+
+    def _band_keys(self, namespace: str, tokens: FrozenSet[str]) -> List[tuple]:
+        sig = self._signature(tokens)
+        return [(namespace, b, tuple(sig[b * self.rows:(b + 1) * self.rows])) for b in range(self.bands)]
+
+    def add(self, key: str, namespace: str, tokens: FrozenSet[str]):
+        if not tokens:
+            return
+        self.remove(key)
+        band_keys = self._band_keys(namespace, tokens)
+        for bk in band_keys:
+            self.buckets.setdefault(bk, set()).add(key)
+        self.entries[key] = (namespace, tokens, band_keys)
+
+    def remove(self, key: str):
+        entry = self.entries.pop(key, None)
+        if not entry:
+            return
+        for bk in entry[2]:
+            bucket = self.buckets.get(bk)
+            if bucket:
+                bucket.discard(key)
+                if not bucket:
+                    del self.buckets[bk]
+
+    def clear(self):
+        self.buckets.clear()
+        self.entries.clear()
+
+    def find(self, namespace: str, tokens: FrozenSet[str]) -> Optional[str]:
+        """Most similar indexed key with Jaccard >= threshold, if any"""
+        if not tokens:
+            return None
+        candidates = set()
+        for bk in self._band_keys(namespace, tokens):
+            candidates |= self.buckets.get(bk, set())
+        best_key, best_score = None, 0.0
+        for key in candidates:
+            other = self.entries[key][1]
+            score = len(tokens & other) / len(tokens | other)
+            if score >= self.threshold and score > best_score:
+                best_key, best_score = key, score
+        return best_key
+
 class SearchCache:
-    """Simple in-memory cache for search results"""
-    
-    def __init__(self, ttl_hours: int = 24):
-        self.cache: Dict[str, Dict[str, Any]] = {}
+    """
+    Bounded in-memory LRU + TTL cache for search results
+
+    - O(1) LRU eviction once `max_entries` or `max_bytes` is exceeded
+    - expired entries are dropped on access and by `sweep_expired()`
+      (run periodically by `start_sweeper()`)
+    - optional SQLite tier (`db_path`) so results survive restarts
+    """
+
+    def __init__(self, ttl_hours: int = 24, max_entries: int = 1000,
+                 max_bytes: int = 50 * 1024 * 1024, db_path: Optional[str] = None,
+                 max_disk_entries: int = 20000, similarity_threshold: float = 0.8):
+        self.cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
         self.ttl_seconds = ttl_hours * 3600
-        
-    def _get_key(self, query: str, deep_mode: bool) -> str:
-        """Generate cache key from query"""
-        return f"{query.lower().strip()}:{deep_mode}"
-    
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_disk_entries = max_disk_entries
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.near_hits = 0
+        # Near-duplicate lookup over the memory tier; threshold <= 0 or > 1 disables it
+        self.near_index = NearDuplicateIndex(similarity_threshold) if 0 < similarity_threshold <= 1 else None
+        self._lock = threading.RLock()
+        self._sweeper: Optional[threading.Thread] = None
+        self._stop_sweeper = threading.Event()
+        self.db: Optional[sqlite3.Connection] = None
+        self.db_path = db_path
+        if db_path:
+            self._open_db(db_path)
+
+    def _open_db(self, db_path: str):
+        """Open (or create) the persistent tier"""
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db = sqlite3.connect(db_path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS search_cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " created_at REAL NOT NULL, size INTEGER NOT NULL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_search_cache_created ON search_cache(created_at)")
+        self.db.commit()
+
+    def cache_key(self, query: str, deep_mode: bool = False) -> str:
+        """Cache key for a query: its canonical form plus the mode (also the single-flight key)"""
+        return f"{canonicalize_query(query)}:{deep_mode}"
+
+    def _index_tokens(self, key: str) -> FrozenSet[str]:
+        return frozenset(key.rsplit(":", 1)[0].split())
+
+    def _expired(self, timestamp: float, now: Optional[float] = None) -> bool:
+        return ((now or time.time()) - timestamp) > self.ttl_seconds
+
+    def _remove(self, key: str):
+        entry = self.cache.pop(key, None)
+        if entry:
+            self.bytes -= entry["size"]
+            if self.near_index:
+                self.near_index.remove(key)
+
+    def _insert(self, key: str, result: Dict[str, Any], timestamp: float, size: int):
+        """Insert into the memory tier and evict LRU entries until within budget"""
+        self._remove(key)
+        self.cache[key] = {"result": result, "timestamp": timestamp, "size": size}
+        self.bytes += size
+        if self.near_index:
+            self.near_index.add(key, key.rsplit(":", 1)[1], self._index_tokens(key))
+        while self.cache and (len(self.cache) > self.max_entries or self.bytes > self.max_bytes):
+            evicted_key, evicted = self.cache.popitem(last=False)
+            self.bytes -= evicted["size"]
+            self.evictions += 1
+            if self.near_index:
+                self.near_index.remove(evicted_key)
+
+    def _disk_get(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.db:
+            return None
+        row = self.db.execute(
+            "SELECT value, created_at, size FROM search_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if not row:
+            return None
+        value, created_at, size = row
+        if self._expired(created_at):
+            self.db.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+            self.db.commit()
+            return None
+        result = json.loads(value)
+        self._insert(key, result, created_at, size)
+        return result
+
     def get(self, query: str, deep_mode: bool = False) -> Optional[Dict[str, Any]]:
         """Retrieve cached result if available and not expired"""
-        key = self._get_key(query, deep_mode)
-        
-        if key not in self.cache:
-            return None
-        
-        cached = self.cache[key]
-        age = time.time() - cached["timestamp"]
-        
-        if age > self.ttl_seconds:
-            # Expired, remove it
-            del self.cache[key]
+        key = self.cache_key(query, deep_mode)
+
+        with self._lock:
+            cached = self.cache.get(key)
+            if cached is not None:
+                if self._expired(cached["timestamp"]):
+                    # Expired, remove it
+                    self._remove(key)
+                    self.expirations += 1
+                else:
+                    self.cache.move_to_end(key)
+                    self.hits += 1
+                    return cached["result"]
+
+            result = self._disk_get(key)
+            if result is not None:
+                self.hits += 1
+                self.disk_hits += 1
+                return result
+
+            if self.near_index:
+                similar = self.near_index.find(str(deep_mode), self._index_tokens(key))
+                cached = self.cache.get(similar) if similar else None
+                if cached is not None and not self._expired(cached["timestamp"]):
+                    self.cache.move_to_end(similar)
+                    self.hits += 1
+                    self.near_hits += 1
+                    return cached["result"]
+
+            self.misses += 1
             return None
-        
-        return cached["result"]
-    
+
     def set(self, query: str, result: Dict[str, Any], deep_mode: bool = False):
         """Store result in cache"""
-        key = self._get_key(query, deep_mode)
-        self.cache[key] = {
-            "result": result,
-            "timestamp": time.time()
-        }
-    
+        key = self.cache_key(query, deep_mode)
+        value = json.dumps(result)
+        size = len(value.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self._insert(key, result, now, size)
+            if self.db:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO search_cache (key, value, created_at, size) VALUES (?, ?, ?, ?)",
+                    (key, value, now, size),
+                )
+                self.db.commit()
+
+    def sweep_expired(self) -> int:
+        """Drop expired entries from both tiers; returns how many were removed"""
+        now = time.time()
+        removed = 0
+        with self._lock:
+            for key in [k for k, v in self.cache.items() if self._expired(v["timestamp"], now)]:
+                self._remove(key)
+                removed += 1
+            self.expirations += removed
+            if self.db:
+                cur = self.db.execute("DELETE FROM search_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+                removed += cur.rowcount
+                # Keep the disk tier bounded too (oldest first)
+                self.db.execute(
+                    "DELETE FROM search_cache WHERE key IN ("
+                    " SELECT key FROM search_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_disk_entries,),
+                )
+                self.db.commit()
+        return removed
+
+    def start_sweeper(self, interval_seconds: float = 300):
+        """Run sweep_expired() periodically in a daemon thread"""
+        if self._sweeper and self._sweeper.is_alive():
+            return
+        self._stop_sweeper.clear()
+
+        def run():
+            while not self._stop_sweeper.wait(interval_seconds):
+                self.sweep_expired()
+
+        self._sweeper = threading.Thread(target=run, name="search-cache-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self):
+        self._stop_sweeper.set()
+
     def clear(self):
         """Clear all cached results"""
-        self.cache.clear()
-    
+        with self._lock:
+            self.cache.clear()
+            self.bytes = 0
+            if self.near_index:
+                self.near_index.clear()
+            if self.db:
+                self.db.execute("DELETE FROM search_cache")
+                self.db.commit()
+
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
         now = time.time()
-        active = sum(1 for v in self.cache.values() if (now - v["timestamp"]) <= self.ttl_seconds)
-        
-        return {
-            "total_entries": len(self.cache),
-            "active_entries": active,
-            "ttl_hours": self.ttl_seconds / 3600
-        }
+        with self._lock:
+            active = sum(1 for v in self.cache.values() if not self._expired(v["timestamp"], now))
+            lookups = self.hits + self.misses
+            stats = {
+                "total_entries": len(self.cache),
+                "active_entries": active,
+                "ttl_hours": self.ttl_seconds / 3600,
+                "max_entries": self.max_entries,
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "near_duplicate_hits": self.near_hits,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "persistent": self.db is not None,
+            }
+            if self.db:
+                count, size = self.db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM search_cache").fetchone()
+                stats.update(disk_entries=count, disk_bytes=size, disk_hits=self.disk_hits)
+        return stats
 
 # Global cache instance
-search_cache = SearchCache(ttl_hours=24)
+search_cache = SearchCache(
+    ttl_hours=int(os.getenv("SEARCH_CACHE_TTL_HOURS", "24")),
+    max_entries=int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "1000")),
+    max_bytes=int(os.getenv("SEARCH_CACHE_MAX_BYTES", str(50 * 1024 * 1024))),
+    db_path=os.getenv("SEARCH_CACHE_DB") or None,
+    similarity_threshold=float(os.getenv("SEARCH_CACHE_SIMILARITY", "0.8")),
+)
@@ -101,6 +101,7 @@ class ExecutionConfig(BaseModel):
     
     # Immediate slot filling for better concurrency
     enable_immediate_slot_fill: bool = True  # Fill slots as soon as they become available
+    orchestrator_watchdog_seconds: float = 1.0  # Max idle wait; status changes wake the orchestrator sooner
     
     # HITL (Human-in-the-Loop) Configuration - Centralized
     enable_hitl: bool = True  # Master HITL switch
@@ -173,6 +174,7 @@ class ExecutionConfig(BaseModel):
                 'enable_ws_compression': True,
                 'enable_diff_updates': True,
                 'enable_immediate_slot_fill': True,
+                'orchestrator_watchdog_seconds': 1.0,
                 'enable_hitl': True,
                 'hitl_timeout_seconds': 1200.0,  # 20 minutes
                 'hitl_root_plan_only': True,
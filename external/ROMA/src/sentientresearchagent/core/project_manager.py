@@ -362,12 +362,10 @@ class ProjectExecutionContext:
             True if successful, False otherwise
         """
         try:
-            # Clear existing state
-            self.task_graph.nodes.clear()
-            self.task_graph.graphs.clear()
-            self.task_graph.root_graph_id = None
-            self.task_graph.overall_project_goal = None
+            # Clear existing state; the task graph's contents are replaced in one go below
             self.knowledge_store.clear()
+            nodes: Dict[str, Any] = {}
+            graphs: Dict[str, Any] = {}
             
             if 'all_nodes' in project_state:
                 # Load nodes by deserializing dictionaries back to TaskNode objects
@@ -381,7 +379,7 @@ class ProjectExecutionContext:
                         
                         # Create TaskNode object from dictionary
                         task_node = TaskNode(**node_data)
-                        self.task_graph.nodes[node_id] = task_node
+                        nodes[node_id] = task_node
                         
                         # Also add to knowledge store
                         self.knowledge_store.add_or_update_record_from_node(task_node)
@@ -391,13 +389,14 @@ class ProjectExecutionContext:
             
             # Properly reconstruct graphs
             if 'graphs' in project_state:
-                self._reconstruct_graphs(project_state['graphs'])
+                graphs = self._reconstruct_graphs(project_state['graphs'], nodes)
             
-            if 'overall_project_goal' in project_state:
-                self.task_graph.overall_project_goal = project_state['overall_project_goal']
-                
-            if 'root_graph_id' in project_state:
-                self.task_graph.root_graph_id = project_state['root_graph_id']
+            self.task_graph.replace_contents(
+                nodes,
+                graphs,
+                root_graph_id=project_state.get('root_graph_id'),
+                overall_project_goal=project_state.get('overall_project_goal')
+            )
             
             logger.info(f"✅ Loaded state for project {self.project_id}: {len(self.task_graph.nodes)} nodes")
             return True
@@ -461,30 +460,31 @@ class ProjectExecutionContext:
             except KeyError:
                 node_data['node_type'] = None
     
-    def _reconstruct_graphs(self, graphs_data: Dict[str, Any]):
-        """Reconstruct graph structure from serialized data."""
+    def _reconstruct_graphs(self, graphs_data: Dict[str, Any], nodes: Dict[str, Any]) -> Dict[str, Any]:
+        """Reconstruct graph structure from serialized data, keyed by graph ID."""
+        graphs: Dict[str, Any] = {}
         try:
             for graph_id, graph_data in graphs_data.items():
                 if isinstance(graph_data, dict) and 'node_ids' in graph_data:
                     # Reconstruct the graph with proper node references
                     node_ids = graph_data['node_ids']
-                    valid_node_ids = [nid for nid in node_ids if nid in self.task_graph.nodes]
+                    valid_node_ids = [nid for nid in node_ids if nid in nodes]
                     
                     if valid_node_ids:
-                        self.task_graph.graphs[graph_id] = {
+                        graphs[graph_id] = {
                             'node_ids': valid_node_ids,
                             'metadata': graph_data.get('metadata', {})
                         }
         except Exception as e:
             logger.warning(f"Failed to reconstruct graphs for project {self.project_id}: {e}")
+        return graphs
     
     def cleanup(self):
         """Clean up resources when context is no longer needed."""
         try:
             # Clear all data structures
             if hasattr(self, 'task_graph'):
-                self.task_graph.nodes.clear()
-                self.task_graph.graphs.clear()
+                self.task_graph.reset()
             
             if hasattr(self, 'knowledge_store'):
                 self.knowledge_store.clear()
@@ -46,6 +46,40 @@ class TaskRecord(BaseModel):
     class Config:
         use_enum_values = True # Keep this for serialization consistency
 
+    @classmethod
+    def from_node(cls, node: Any) -> "TaskRecord":
+        """
+        Builds the record for a TaskNode without re-validating it.
+
+        The node's fields are already validated, so only its dicts and lists are
+        copied (shallowly, as validation did): the record is a snapshot, and later
+        in-place changes to the node's aux_data, payload or sub-task IDs do not
+        show up in it. `result` is referenced, as it was under validation.
+        """
+        # Simplified enum handling - string enums work directly
+        return cls.model_construct(
+            task_id=node.task_id,
+            goal=node.goal,
+            task_type=str(node.task_type),
+            node_type=str(node.node_type) if node.node_type else None,
+            input_params_dict=dict(node.input_payload_dict or {}),
+            output_content=node.result,
+            output_type_description=node.output_type_description,
+            output_summary=node.output_summary,
+            status=str(node.status),
+            timestamp_created=node.timestamp_created,
+            timestamp_updated=node.timestamp_updated,
+            timestamp_completed=node.timestamp_completed,
+            parent_task_id=node.parent_node_id,
+            child_task_ids_generated=list(node.planned_sub_task_ids or []),
+            layer=node.layer,
+            error_message=node.error,
+            sub_graph_id=node.sub_graph_id,  # CRITICAL FIX: Include sub_graph_id for PLAN nodes
+            aux_data=dict(node.aux_data or {}),  # CRITICAL FIX: Preserve aux_data including depends_on_indices
+            result=node.result,  # Store actual result for dependency context
+            planned_sub_task_ids=list(node.planned_sub_task_ids or [])  # For dependency resolution
+        )
+
 class KnowledgeStore(BaseModel):
     """A central repository for all task records."""
     records: Dict[str, TaskRecord] = Field(default_factory=dict)
@@ -65,33 +99,7 @@ class KnowledgeStore(BaseModel):
             object.__setattr__(self, '_lock', threading.RLock())
         
         with self._lock:
-            # Simplified enum handling - string enums work directly
-            task_type_val = str(node.task_type)
-            node_type_val = str(node.node_type) if node.node_type else None
-            status_val = str(node.status)
-
-            record = TaskRecord(
-                task_id=node.task_id,
-                goal=node.goal,
-                task_type=task_type_val,
-                node_type=node_type_val,
-                input_params_dict=node.input_payload_dict or {},
-                output_content=node.result,
-                output_type_description=node.output_type_description,
-                output_summary=node.output_summary,
-                status=status_val,
-                timestamp_created=node.timestamp_created,
-                timestamp_updated=node.timestamp_updated,
-                timestamp_completed=node.timestamp_completed,
-                parent_task_id=node.parent_node_id,
-                child_task_ids_generated=node.planned_sub_task_ids or [],
-                layer=node.layer,
-                error_message=node.error,
-                sub_graph_id=node.sub_graph_id,  # CRITICAL FIX: Include sub_graph_id for PLAN nodes
-                aux_data=node.aux_data or {},  # CRITICAL FIX: Preserve aux_data including depends_on_indices
-                result=node.result,  # Store actual result for dependency context
-                planned_sub_task_ids=node.planned_sub_task_ids or []  # For dependency resolution
-            )
+            record = TaskRecord.from_node(node)
             self.records[record.task_id] = record
             logger.info(f"KnowledgeStore: Added/Updated record for {node.task_id}")
 
@@ -158,32 +158,7 @@ class OptimizedKnowledgeStore(KnowledgeStore):
         with self._lock:
             for node in buffer:
                 # Create record without logging each one
-                task_type_val = str(node.task_type)
-                node_type_val = str(node.node_type) if node.node_type else None
-                status_val = str(node.status)
-
-                record = TaskRecord(
-                    task_id=node.task_id,
-                    goal=node.goal,
-                    task_type=task_type_val,
-                    node_type=node_type_val,
-                    input_params_dict=node.input_payload_dict or {},
-                    output_content=node.result,
-                    output_type_description=node.output_type_description,
-                    output_summary=node.output_summary,
-                    status=status_val,
-                    timestamp_created=node.timestamp_created,
-                    timestamp_updated=node.timestamp_updated,
-                    timestamp_completed=node.timestamp_completed,
-                    parent_task_id=node.parent_node_id,
-                    child_task_ids_generated=node.planned_sub_task_ids or [],
-                    layer=node.layer,
-                    error_message=node.error,
-                    sub_graph_id=node.sub_graph_id,
-                    aux_data=node.aux_data or {},
-                    result=node.result,
-                    planned_sub_task_ids=node.planned_sub_task_ids or []
-                )
+                record = TaskRecord.from_node(node)
                 self.records[record.task_id] = record
                 
                 # Invalidate cache for this record
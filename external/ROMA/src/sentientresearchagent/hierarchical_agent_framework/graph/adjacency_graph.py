@@ -0,0 +1,150 @@
+"""
+AdjacencyGraph - Compact directed graph backing each of TaskGraph's graphs.
+
+TaskGraph only needs insertion-ordered nodes, edges and predecessor/successor
+lookups, but a networkx.DiGraph keeps several dicts per node and one per edge.
+Here node IDs are mapped to integer indices and adjacency is stored as integer
+arrays per node, which is several times smaller for plans with thousands of
+nodes. The networkx.DiGraph API used across the code base is kept (the
+nodes/edges views, add_node(s), add_edge, predecessors, successors,
+number_of_nodes, `in`), so code walking `task_graph.graphs` works unchanged
+and graphs restored as networkx DiGraphs can sit next to these ones.
+"""
+
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+# Shared placeholder until a node gets its first edge in that direction
+_NO_EDGES: Tuple[int, ...] = ()
+
+
+class _NodeView:
+    """Mimics networkx's G.nodes: iterable, sized, supports `in` and G.nodes()."""
+    __slots__ = ("_graph",)
+
+    def __init__(self, graph: "AdjacencyGraph"):
+        self._graph = graph
+
+    def __call__(self) -> List[str]:
+        return list(self._graph._ids)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._graph._ids)
+
+    def __len__(self) -> int:
+        return len(self._graph._ids)
+
+    def __contains__(self, node_id: Any) -> bool:
+        return node_id in self._graph._index
+
+    def __getitem__(self, node_id: str) -> Dict[str, Any]:
+        # Node attributes are not stored; TaskGraph.nodes holds the TaskNode objects
+        if node_id not in self._graph._index:
+            raise KeyError(node_id)
+        return {}
+
+
+class _EdgeView:
+    """Mimics networkx's G.edges: iterable of (u, v), sized, supports `in` and G.edges()."""
+    __slots__ = ("_graph",)
+
+    def __init__(self, graph: "AdjacencyGraph"):
+        self._graph = graph
+
+    def __call__(self) -> List[Tuple[str, str]]:
+        return list(self)
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        ids = self._graph._ids
+        for u, targets in enumerate(self._graph._succ):
+            for v in targets:
+                yield ids[u], ids[v]
+
+    def __len__(self) -> int:
+        return self._graph._edge_count
+
+    def __contains__(self, edge: Any) -> bool:
+        try:
+            u_node_id, v_node_id = edge
+        except (TypeError, ValueError):
+            return False
+        return self._graph.has_edge(u_node_id, v_node_id)
+
+
+class AdjacencyGraph:
+    """Directed graph over string node IDs, stored as integer adjacency arrays."""
+    __slots__ = ("graph", "_ids", "_index", "_succ", "_pred", "_edge_count", "nodes", "edges")
+
+    def __init__(self, graph_id: Optional[str] = None):
+        self.graph: Dict[str, Any] = {"graph_id": graph_id}  # graph attributes, as in networkx
+        self._ids: List[str] = []            # index -> node ID
+        self._index: Dict[str, int] = {}     # node ID -> index
+        self._succ: List[Union[array, Tuple[int, ...]]] = []
+        self._pred: List[Union[array, Tuple[int, ...]]] = []
+        self._edge_count = 0
+        self.nodes = _NodeView(self)
+        self.edges = _EdgeView(self)
+
+    def _add(self, node_id: str) -> int:
+        index = self._index.get(node_id)
+        if index is None:
+            index = len(self._ids)
+            self._index[node_id] = index
+            self._ids.append(node_id)
+            self._succ.append(_NO_EDGES)
+            self._pred.append(_NO_EDGES)
+        return index
+
+    def add_node(self, node_id: str, **attrs: Any) -> None:
+        """Adds a node (attributes are accepted for networkx compatibility but not stored)."""
+        self._add(node_id)
+
+    def add_nodes_from(self, node_ids: Iterable[str]) -> None:
+        for node_id in node_ids:
+            self._add(node_id)
+
+    def add_edge(self, u_node_id: str, v_node_id: str, **attrs: Any) -> None:
+        """Adds u -> v, adding missing nodes as networkx does."""
+        u, v = self._add(u_node_id), self._add(v_node_id)
+        if v in self._succ[u]:
+            return
+        if self._succ[u] is _NO_EDGES:
+            self._succ[u] = array("i")
+        if self._pred[v] is _NO_EDGES:
+            self._pred[v] = array("i")
+        self._succ[u].append(v)
+        self._pred[v].append(u)
+        self._edge_count += 1
+
+    def has_node(self, node_id: str) -> bool:
+        return node_id in self._index
+
+    def has_edge(self, u_node_id: str, v_node_id: str) -> bool:
+        u, v = self._index.get(u_node_id), self._index.get(v_node_id)
+        return u is not None and v is not None and v in self._succ[u]
+
+    def successors(self, node_id: str) -> Iterator[str]:
+        ids = self._ids
+        return (ids[v] for v in self._succ[self._index[node_id]])
+
+    def predecessors(self, node_id: str) -> Iterator[str]:
+        ids = self._ids
+        return (ids[u] for u in self._pred[self._index[node_id]])
+
+    def number_of_nodes(self) -> int:
+        return len(self._ids)
+
+    def number_of_edges(self) -> int:
+        return self._edge_count
+
+    def __contains__(self, node_id: Any) -> bool:
+        return node_id in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __repr__(self) -> str:
+        return f"AdjacencyGraph(graph_id={self.graph.get('graph_id')!r}, nodes={len(self._ids)}, edges={self._edge_count})"
@@ -1,3 +1,4 @@
+import os
 from typing import Optional, TYPE_CHECKING
 from collections import deque
 from loguru import logger
@@ -11,11 +12,15 @@ from sentientresearchagent.hierarchical_agent_framework.types import (
     TERMINAL_STATUSES, is_terminal_status
 )
 
+# Per-child status dumps when aggregation is blocked (O(children) per check)
+AGGREGATION_DEBUG = os.getenv("ROMA_AGGREGATION_DEBUG", "false").lower() == "true"
+
 class StateManager:
     """Handles logic for checking if nodes can transition state."""
 
-    def __init__(self, task_graph: "TaskGraph"):
+    def __init__(self, task_graph: "TaskGraph", debug_aggregation: bool = AGGREGATION_DEBUG):
         self.task_graph = task_graph
+        self.debug_aggregation = debug_aggregation
 
     def _find_container_graph_id_for_node(self, node: "TaskNode") -> Optional[str]:
         """
@@ -98,7 +103,11 @@ class StateManager:
         return self._check_predecessor_conditions_for_ready(node, container_graph_id)
 
     def can_aggregate(self, node: "TaskNode") -> bool:
-        """Checks if a PLAN_DONE node (which is a PLAN type node) can transition to AGGREGATING."""
+        """
+        Checks if a PLAN_DONE node (which is a PLAN type node) can transition to AGGREGATING.
+
+        Uses the sub-graph's terminal-children counter, so the check is O(1).
+        """
         
         # Use safe conversion for better type handling
         try:
@@ -107,47 +116,34 @@ class StateManager:
             logger.debug(f"StateManager.can_aggregate: Node {node.task_id} has invalid node_type '{node.node_type}'. Cannot convert to NodeType enum.")
             return False
 
-        logger.debug(f"StateManager.can_aggregate CALLED for node {node.task_id}, status: {node.status}, node_type: {current_node_type}")
-
         if node.status != TaskStatus.PLAN_DONE or current_node_type != NodeType.PLAN:
-            logger.debug(f"StateManager.can_aggregate: Node {node.task_id} failed initial status/type check.")
             return False
-        
-        logger.debug(f"StateManager.can_aggregate: Node {node.task_id} passed initial status/type check.")
 
         if not node.sub_graph_id:
             logger.warning(f"StateManager: Node {node.task_id} is PLAN_DONE but has no sub_graph_id.")
             return False
         
-        logger.debug(f"StateManager.can_aggregate: Node {node.task_id} has sub_graph_id: {node.sub_graph_id}. Fetching sub-graph nodes.")
-        sub_graph_nodes = self.task_graph.get_nodes_in_graph(node.sub_graph_id)
-        logger.info(f"🔍 AGGREGATION DEBUG - Node {node.task_id} sub_graph_id: {node.sub_graph_id}, found {len(sub_graph_nodes)} children")
+        total, finished = self.task_graph.get_completion_counts(node.sub_graph_id)
 
-        if not sub_graph_nodes:
+        if total == 0:
             # If a plan resulted in no sub-tasks, it could be considered ready to "aggregate" nothing.
             logger.info(f"Node {node.task_id} can AGGREGATE: PLAN_DONE and its sub-graph '{node.sub_graph_id}' is empty.")
             return True
 
         # All tasks within its sub_graph_id must be in a terminal state
-        all_sub_finished = all(is_terminal_status(sn.status) for sn in sub_graph_nodes)
-        
-        if all_sub_finished:
-            logger.info(f"Node {node.task_id} can AGGREGATE: All {len(sub_graph_nodes)} sub-tasks in '{node.sub_graph_id}' are finished.")
-        else:
+        if finished >= total:
+            logger.info(f"Node {node.task_id} can AGGREGATE: All {total} sub-tasks in '{node.sub_graph_id}' are finished.")
+            return True
+
+        logger.debug(f"Node {node.task_id} cannot AGGREGATE yet: {total - finished}/{total} children incomplete")
+        if self.debug_aggregation:
             # Enhanced debugging: show which specific nodes are blocking aggregation
-            incomplete_nodes = []
-            for sn in sub_graph_nodes:
-                if not is_terminal_status(sn.status):
-                    incomplete_nodes.append(f"{sn.task_id}:{sn.status.name}")
-            
+            sub_graph_nodes = self.task_graph.get_nodes_in_graph(node.sub_graph_id)
+            incomplete_nodes = [f"{sn.task_id}:{sn.status.name}" for sn in sub_graph_nodes if not is_terminal_status(sn.status)]
             logger.warning(f"⏳ AGGREGATION BLOCKED - Node {node.task_id} cannot AGGREGATE: {len(incomplete_nodes)}/{len(sub_graph_nodes)} children incomplete: {', '.join(incomplete_nodes)}")
-            
-            # Log each sub-task status for debugging
             for sn in sub_graph_nodes:
-                terminal_status = is_terminal_status(sn.status)
-                logger.debug(f"  ⏳ Sub-task {sn.task_id}: status={sn.status.name}, is_terminal={terminal_status}")
-            
-        return all_sub_finished
+                logger.debug(f"  ⏳ Sub-task {sn.task_id}: status={sn.status.name}, is_terminal={is_terminal_status(sn.status)}")
+        return False
 
     def can_transition_to_done(self, node: "TaskNode") -> bool:
         """Check if a node can transition to DONE status."""
@@ -1,6 +1,5 @@
 import threading
-import networkx as nx
-from typing import Dict, List, Optional, Any, TYPE_CHECKING
+from typing import Dict, List, Optional, Any, Tuple, TYPE_CHECKING
 from enum import Enum # Added for isinstance check
 
 if TYPE_CHECKING:
@@ -8,28 +7,110 @@ if TYPE_CHECKING:
 from sentientresearchagent.hierarchical_agent_framework.context.agent_io_models import CustomSearcherOutput # <--- IMPORT IT
 from pydantic import BaseModel # Make sure this import is present
 from loguru import logger # Add loguru import
+from sentientresearchagent.hierarchical_agent_framework.types import is_terminal_status
+from sentientresearchagent.hierarchical_agent_framework.graph.adjacency_graph import AdjacencyGraph
 # GraphSerializer import moved to method level to avoid circular import
 
 class TaskGraph:
     """Manages the hierarchical graph structure of TaskNodes."""
     def __init__(self):
-        # Stores the actual graphs. Key is graph_id, value is nx.DiGraph
+        # Stores the actual graphs. Key is graph_id, value is an AdjacencyGraph (graphs
+        # restored as networkx DiGraphs also work, both expose the same API).
         # A graph_id typically corresponds to a parent TaskNode's sub_graph_id or a root_graph_id.
-        self.graphs: Dict[str, nx.DiGraph] = {}
+        self.graphs: Dict[str, AdjacencyGraph] = {}
         # Flat map for quick node lookup by ID across all graphs
         self.nodes: Dict[str, "TaskNode"] = {}
         self.root_graph_id: Optional[str] = None
         self.overall_project_goal: Optional[str] = None # Store the main goal
         # Add lock for thread-safe operations
         self._lock = threading.RLock()  # RLock allows re-entrant locking
+        # node_id -> graph_id, so finding a node's container graph is O(1)
+        self._node_graph_ids: Dict[str, str] = {}
+        # Observers of structural and status changes (e.g. TaskScheduler's ready index)
+        self._listeners: List[Any] = []
+        # graph_id -> [graph size, nodes, nodes in a terminal status], kept current
+        # on node adds and status changes so aggregation readiness is O(1)
+        self._completion_counts: Dict[str, List[int]] = {}
+        # Bumped whenever the contents are swapped out (replace_contents/reset); observers
+        # rebuild state derived from the old nodes when it changes
+        self.generation = 0
 
-    def add_graph(self, graph_id: str, is_root: bool = False) -> nx.DiGraph:
+    def add_listener(self, listener: Any) -> None:
+        """
+        Register an observer. It may implement any of:
+        on_node_added(graph_id, node), on_edge_added(graph_id, u_node_id, v_node_id),
+        on_status_change(node, old_status, new_status)
+        """
+        with self._lock:
+            if listener not in self._listeners:
+                self._listeners.append(listener)
+
+    def remove_listener(self, listener: Any) -> None:
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def _notify(self, event: str, *args: Any) -> None:
+        for listener in list(self._listeners):
+            handler = getattr(listener, event, None)
+            if handler is None:
+                continue
+            try:
+                handler(*args)
+            except Exception as e:
+                # An observer must never break graph mutation or a status update
+                logger.error(f"TaskGraph: listener {type(listener).__name__}.{event} failed: {e}")
+
+    def _on_node_status_change(self, node: "TaskNode", old_status: Any, new_status: Any) -> None:
+        if self.nodes.get(node.task_id) is not node:
+            # A node from contents that have since been replaced
+            return
+        delta = int(is_terminal_status(new_status)) - int(is_terminal_status(old_status))
+        if delta:
+            with self._lock:
+                counts = self._completion_counts.get(self._node_graph_ids.get(node.task_id))
+                if counts is not None:
+                    counts[2] += delta
+        self._notify("on_status_change", node, old_status, new_status)
+
+    def watch_node(self, node: "TaskNode") -> None:
+        """Route a node's status changes to this graph's listeners (done by add_node_to_graph)."""
+        object.__setattr__(node, "_status_listener", self._on_node_status_change)
+
+    def replace_contents(self, nodes: Dict[str, "TaskNode"], graphs: Dict[str, Any],
+                         root_graph_id: Optional[str] = None,
+                         overall_project_goal: Optional[str] = None) -> None:
+        """
+        Swap in a whole set of nodes and graphs (e.g. a restored project) without
+        per-node events. Restore paths must use this (or reset) rather than mutating
+        `nodes`/`graphs` directly, so observers see the new generation.
+        """
+        # Copy first, the arguments may be this graph's own containers
+        nodes, graphs = dict(nodes), dict(graphs)
+        with self._lock:
+            self.nodes.clear()
+            self.nodes.update(nodes)
+            self.graphs.clear()
+            self.graphs.update(graphs)
+            self.root_graph_id = root_graph_id
+            self.overall_project_goal = overall_project_goal
+            # Derived from the old nodes; rebuilt (and the new nodes watched) on next use
+            self._node_graph_ids.clear()
+            self._completion_counts.clear()
+            self.generation += 1
+            logger.info(f"TaskGraph: Replaced contents with {len(nodes)} nodes in {len(graphs)} graphs.")
+
+    def reset(self) -> None:
+        """Empty the graph."""
+        self.replace_contents({}, {})
+
+    def add_graph(self, graph_id: str, is_root: bool = False) -> AdjacencyGraph:
         with self._lock:
             if graph_id in self.graphs:
                 # In a resumable system, you might load an existing graph.
                 # For now, let's assume fresh creation or raise error.
                 raise ValueError(f"Graph ID {graph_id} already exists.")
-            graph = nx.DiGraph(graph_id=graph_id) # Add graph_id attribute to the graph itself
+            graph = AdjacencyGraph(graph_id=graph_id) # Add graph_id attribute to the graph itself
             self.graphs[graph_id] = graph
             if is_root:
                 if self.root_graph_id is not None and self.root_graph_id != graph_id:
@@ -38,7 +119,7 @@ class TaskGraph:
             logger.info(f"TaskGraph: Added graph '{graph_id}'. Is root: {is_root}")
             return graph
 
-    def get_graph(self, graph_id: str) -> Optional[nx.DiGraph]:
+    def get_graph(self, graph_id: str) -> Optional[AdjacencyGraph]:
         return self.graphs.get(graph_id)
 
     def add_node_to_graph(self, graph_id: str, node: "TaskNode"):
@@ -60,9 +141,17 @@ class TaskGraph:
                 raise ValueError(f"Node ID {node.task_id} already exists in the global node map.")
 
             self.nodes[node.task_id] = node
-            # Store the TaskNode object itself as a node attribute in the graph
-            graph.add_node(node.task_id, task_node_obj=node)
+            self._node_graph_ids[node.task_id] = graph_id
+            # The graph only holds the ID; the TaskNode lives in self.nodes
+            graph.add_node(node.task_id)
+            self.watch_node(node)
+            counts = self._completion_counts.get(graph_id)
+            if counts is not None:
+                counts[0] += 1
+                counts[1] += 1
+                counts[2] += int(is_terminal_status(node.status))
             logger.info(f"TaskGraph: Added node '{node.task_id}' to graph '{graph_id}'.")
+        self._notify("on_node_added", graph_id, node)
 
 
     def add_edge(self, graph_id: str, u_node_id: str, v_node_id: str):
@@ -75,11 +164,51 @@ class TaskGraph:
                 raise ValueError("Nodes must exist in the specified graph to add an edge.")
             graph.add_edge(u_node_id, v_node_id)
             logger.info(f"TaskGraph: Added edge {u_node_id} -> {v_node_id} in graph '{graph_id}'.")
+        self._notify("on_edge_added", graph_id, u_node_id, v_node_id)
 
     def get_node(self, node_id: str) -> Optional["TaskNode"]:
         """Retrieves a TaskNode by its ID from the global lookup."""
         return self.nodes.get(node_id)
 
+    def get_container_graph_id(self, node_id: str) -> Optional[str]:
+        """Returns the ID of the graph containing a node, or None."""
+        graph_id = self._node_graph_ids.get(node_id)
+        if graph_id is not None and graph_id in self.graphs:
+            return graph_id
+        # Nodes restored by assigning into self.graphs/self.nodes directly are not in the map yet
+        for graph_id, graph in self.graphs.items():
+            if node_id in graph.nodes:
+                self._node_graph_ids[node_id] = graph_id
+                return graph_id
+        return None
+
+    def get_completion_counts(self, graph_id: str) -> Tuple[int, int]:
+        """
+        Returns (nodes in the graph, nodes in a terminal status) for a graph.
+
+        Counts are maintained incrementally. A graph is recounted after
+        replace_contents/reset, or when nodes were placed into it without
+        add_node_to_graph.
+        """
+        with self._lock:
+            graph = self.get_graph(graph_id)
+            if graph is None:
+                return 0, 0
+            counts = self._completion_counts.get(graph_id)
+            if counts is None or counts[0] != graph.number_of_nodes():
+                # Nodes missing from the global map are skipped, as in get_nodes_in_graph
+                counts = [graph.number_of_nodes(), 0, 0]
+                for node_id in graph.nodes:
+                    node = self.get_node(node_id)
+                    if node is None:
+                        continue
+                    self._node_graph_ids[node_id] = graph_id
+                    self.watch_node(node)
+                    counts[1] += 1
+                    counts[2] += int(is_terminal_status(node.status))
+                self._completion_counts[graph_id] = counts
+            return counts[1], counts[2]
+
     def get_all_nodes(self) -> List["TaskNode"]:
         """Returns a list of all TaskNode objects managed."""
         with self._lock:
@@ -1,3 +1,4 @@
+import sys
 import uuid
 import threading
 from typing import Optional, Any, List, Dict, Union, Callable, TYPE_CHECKING
@@ -16,6 +17,9 @@ from sentientresearchagent.exceptions import InvalidTaskStateError, TaskError
 if TYPE_CHECKING:
     from ...core.system_manager import SystemManager
 
+# Free-text fields whose values repeat across the nodes of a plan
+_INTERNED_FIELDS = ("overall_objective", "agent_name", "parent_node_id", "output_type_description")
+
 class TaskNode(BaseModel):
     """Represents a single task unit in the hierarchy."""
     goal: str
@@ -68,11 +72,31 @@ class TaskNode(BaseModel):
         # Ensure aux_data is never None - fix for deserialization issues
         if 'aux_data' not in data or data['aux_data'] is None:
             data['aux_data'] = {}
+        # One timestamp object for both creation fields (datetimes are immutable)
+        if 'timestamp_created' not in data and 'timestamp_updated' not in data:
+            data['timestamp_created'] = data['timestamp_updated'] = datetime.now()
+        # Strings repeated across a plan (e.g. the objective, on every node) are
+        # shared instead of each restored node holding its own copy
+        for name in _INTERNED_FIELDS:
+            if type(data.get(name)) is str:
+                data[name] = sys.intern(data[name])
         
         super().__init__(**data)
         # Initialize the lock after the object is created
         object.__setattr__(self, '_status_lock', threading.RLock())
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name != "status":
+            super().__setattr__(name, value)
+            return
+        old_status = self.__dict__.get("status")
+        super().__setattr__(name, value)
+        # Every status write (update_status, update_status_fast or a direct assignment)
+        # reaches the owning TaskGraph's listeners, see TaskGraph.watch_node
+        listener = self.__dict__.get("_status_listener")
+        if listener is not None and old_status != self.status:
+            listener(self, old_status, self.status)
+
     def update_status(self, new_status: TaskStatus, result: Any = None, 
                      error_msg: Optional[str] = None, result_summary: Optional[str] = None,
                      validate_transition: bool = True, update_manager: Any = None):
@@ -284,3 +308,4 @@ class TaskNode(BaseModel):
         return (f"TaskNode(id={self.task_id}, goal='{self.goal[:30]}...', "
                 f"type={self.task_type}/{self.node_type}, "
                 f"status={self.status}, layer={self.layer})")
+
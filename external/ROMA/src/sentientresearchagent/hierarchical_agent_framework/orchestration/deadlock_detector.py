@@ -6,9 +6,22 @@ Responsibilities:
 - Analyze root causes of deadlocks
 - Provide detailed diagnostics
 - Suggest recovery strategies
+
+Detection is incremental. The detector listens to the TaskGraph and keeps a
+wait-for graph (a node waits on its parent and its dependencies) in an
+incremental topological order, so a cycle is found when the edge closing it
+is added. Status transitions mark the affected region (the node, its parent
+and its children); detect_deadlock re-checks only that region plus earlier
+suspects, which makes it cheap enough to run on every orchestrator iteration.
+Non-structural patterns must hold for `confirm_seconds` before they are
+reported, so states that only exist between two transitions are not flagged.
 """
 
-from typing import List, Dict, Set, Optional, Tuple, TYPE_CHECKING
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, List, Dict, Set, Optional, Tuple, TYPE_CHECKING
 from dataclasses import dataclass
 from enum import Enum
 from loguru import logger
@@ -20,6 +33,9 @@ if TYPE_CHECKING:
     from sentientresearchagent.hierarchical_agent_framework.graph.task_graph import TaskGraph
     from sentientresearchagent.hierarchical_agent_framework.graph.state_manager import StateManager
 
+# How long a suspected (non-cycle) deadlock must persist before it is reported
+DEADLOCK_CONFIRM_SECONDS = float(os.getenv("ROMA_DEADLOCK_CONFIRM_SECONDS", "5.0"))
+
 
 class DeadlockPattern(Enum):
     """Types of deadlock patterns."""
@@ -51,16 +67,19 @@ class DeadlockDetector:
     clean separation from the execution engine.
     """
     
-    def __init__(self, task_graph: "TaskGraph", state_manager: "StateManager"):
+    def __init__(self, task_graph: "TaskGraph", state_manager: "StateManager",
+                 confirm_seconds: float = DEADLOCK_CONFIRM_SECONDS):
         """
         Initialize the DeadlockDetector.
         
         Args:
             task_graph: The task graph to analyze
             state_manager: State manager for node states
+            confirm_seconds: How long a suspected deadlock must persist before it is reported
         """
         self.task_graph = task_graph
         self.state_manager = state_manager
+        self.confirm_seconds = confirm_seconds
         
         # Detection state
         self._detection_history: List[DeadlockInfo] = []
@@ -72,46 +91,233 @@ class DeadlockDetector:
             DeadlockPattern.SINGLE_NODE_HANG: self._detect_single_node_hang,
         }
         
+        # Incremental state, maintained from TaskGraph events
+        self._lock = threading.RLock()
+        self._tracked: Set[str] = set()
+        self._tracked_generation = getattr(task_graph, "generation", 0)
+        self._active: Set[str] = set()                           # non-terminal nodes
+        self._children: Dict[str, Set[str]] = defaultdict(set)   # parent -> tracked children
+        self._dirty: Set[str] = set()                            # nodes to re-check
+        self._suspects: Dict[Tuple[DeadlockPattern, str], float] = {}  # -> first seen (monotonic)
+        
+        # Wait-for graph kept in topological order (u before v when v waits on u)
+        self._order: Dict[str, int] = {}
+        self._next_order = 0
+        self._waiters: Dict[str, Set[str]] = defaultdict(set)    # u -> nodes waiting on u
+        self._waits_on: Dict[str, Set[str]] = defaultdict(set)   # v -> nodes v waits on
+        self._cycles: List[List[str]] = []
+        self._cycle_edges: Set[Tuple[str, str]] = set()          # edges left out because they close a cycle
+        
+        if hasattr(task_graph, "add_listener"):
+            task_graph.add_listener(self)
+        
         logger.info("DeadlockDetector initialized")
     
+    # ----- Incremental state -----
+    
+    def on_node_added(self, graph_id: str, node: TaskNode) -> None:
+        with self._lock:
+            self._track(node)
+    
+    def on_edge_added(self, graph_id: str, u_node_id: str, v_node_id: str) -> None:
+        with self._lock:
+            if u_node_id in self._tracked and v_node_id in self._tracked:
+                self._add_wait(u_node_id, v_node_id)
+                self._dirty.add(v_node_id)
+    
+    def on_status_change(self, node: TaskNode, old_status: Any, new_status: Any) -> None:
+        with self._lock:
+            if node.task_id not in self._tracked:
+                return
+            if is_terminal_status(new_status):
+                self._active.discard(node.task_id)
+            else:
+                self._active.add(node.task_id)
+            self._mark(node)
+    
+    def _track(self, node: TaskNode) -> None:
+        node_id = node.task_id
+        if node_id in self._tracked:
+            return
+        self._tracked.add(node_id)
+        self._order[node_id] = self._next_order
+        self._next_order += 1
+        if not is_terminal_status(node.status):
+            self._active.add(node_id)
+        if node.parent_node_id:
+            self._children[node.parent_node_id].add(node_id)
+            # A child tracked before its parent is linked when the parent is tracked
+            if node.parent_node_id in self._tracked:
+                self._add_wait(node.parent_node_id, node_id)
+        for child_id in self._children.get(node_id, ()):
+            self._add_wait(node_id, child_id)
+        self._mark(node)
+    
+    def _mark(self, node: TaskNode) -> None:
+        """Mark the region a transition of `node` can affect."""
+        self._dirty.add(node.task_id)
+        if node.parent_node_id:
+            self._dirty.add(node.parent_node_id)
+        self._dirty.update(self._children.get(node.task_id, ()))
+    
+    def _sync(self) -> None:
+        """
+        Rebuild from the graph when its contents were replaced (a new TaskGraph
+        generation, e.g. a project reloaded with the same node IDs) or nodes were
+        put into it without events. O(1) when in sync.
+        """
+        nodes = self.task_graph.nodes
+        generation = getattr(self.task_graph, "generation", 0)
+        if generation == self._tracked_generation and len(nodes) == len(self._tracked):
+            return
+        with self._lock:
+            if generation != self._tracked_generation:
+                # Suspicions about the old nodes do not carry over
+                self._dirty.clear()
+                self._suspects.clear()
+                self._tracked_generation = generation
+            self._tracked.clear()
+            self._active.clear()
+            self._children.clear()
+            self._order.clear()
+            self._waiters.clear()
+            self._waits_on.clear()
+            self._cycles.clear()
+            self._cycle_edges.clear()
+            self._next_order = 0
+            for node in list(nodes.values()):
+                if hasattr(self.task_graph, "watch_node"):
+                    self.task_graph.watch_node(node)
+                self._track(node)
+            for graph in list(self.task_graph.graphs.values()):
+                for u_node_id, v_node_id in list(graph.edges):
+                    if u_node_id in self._tracked and v_node_id in self._tracked:
+                        self._add_wait(u_node_id, v_node_id)
+    
+    def _add_wait(self, u: str, v: str) -> None:
+        """Record that v waits on u, keeping the topological order (Pearce-Kelly)."""
+        if v in self._waiters[u] or (u, v) in self._cycle_edges:
+            return
+        if u == v:
+            self._record_cycle((u, v), [u, u])
+            return
+        self._waiters[u].add(v)
+        self._waits_on[v].add(u)
+        lower, upper = self._order[v], self._order[u]
+        if upper < lower:
+            return
+        
+        # Nodes reachable from v that are ordered before u must move after it;
+        # reaching u itself means the new edge closes a cycle
+        came_from: Dict[str, Optional[str]] = {v: None}
+        forward, stack = [], [v]
+        while stack:
+            current = stack.pop()
+            forward.append(current)
+            for waiter in self._waiters[current]:
+                if waiter == u:
+                    self._waiters[u].discard(v)
+                    self._waits_on[v].discard(u)
+                    path = [current]
+                    while came_from[path[-1]] is not None:
+                        path.append(came_from[path[-1]])
+                    # u waits on current, ..., which waits on v, which waits on u
+                    self._record_cycle((u, v), [u] + path + [u])
+                    return
+                if waiter not in came_from and self._order[waiter] < upper:
+                    came_from[waiter] = current
+                    stack.append(waiter)
+        
+        # Nodes u (transitively) waits on that are ordered after v must move before it
+        seen, backward, stack = {u}, [], [u]
+        while stack:
+            current = stack.pop()
+            backward.append(current)
+            for dependency in self._waits_on[current]:
+                if dependency not in seen and self._order[dependency] > lower:
+                    seen.add(dependency)
+                    stack.append(dependency)
+        
+        slots = sorted(self._order[n] for n in backward + forward)
+        moved = sorted(backward, key=self._order.get) + sorted(forward, key=self._order.get)
+        for node_id, slot in zip(moved, slots):
+            self._order[node_id] = slot
+    
+    def _record_cycle(self, edge: Tuple[str, str], cycle: List[str]) -> None:
+        self._cycle_edges.add(edge)
+        self._cycles.append(cycle)
+        self._dirty.update(cycle)
+        logger.warning(f"DeadlockDetector: dependency cycle closed: {' -> '.join(cycle)}")
+    
+    def _confirmed(self, pattern: DeadlockPattern, region: List[TaskNode],
+                   check: Callable[[TaskNode], Optional[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Issues `check` finds in the region that have persisted for confirm_seconds."""
+        now = time.monotonic()
+        confirmed = []
+        with self._lock:
+            for node in region:
+                key = (pattern, node.task_id)
+                issue = check(node)
+                if issue is None:
+                    self._suspects.pop(key, None)
+                    continue
+                first_seen = self._suspects.setdefault(key, now)
+                if now - first_seen >= self.confirm_seconds:
+                    confirmed.append(issue)
+        return confirmed
+    
     async def detect_deadlock(self) -> Dict[str, any]:
         """
         Detect if the system is in a deadlock state.
         
+        Only nodes affected by transitions since the last call (and nodes already
+        suspected) are re-checked.
+        
         Returns:
             Dictionary with deadlock information
         """
-        # Get active nodes
-        active_nodes = self._get_active_nodes()
-        
-        if not active_nodes:
-            return {
-                "is_deadlocked": False,
-                "reason": "No active nodes"
-            }
-        
-        # Try each pattern detector
-        for pattern, detector in self._pattern_detectors.items():
-            result = await detector(active_nodes)
-            if result and result.is_deadlocked:
-                # Record detection
-                self._detection_history.append(result)
-                
-                # Return formatted result
+        with self._lock:
+            self._sync()
+            if not self._active:
+                self._dirty.clear()
+                self._suspects.clear()
                 return {
-                    "is_deadlocked": True,
-                    "pattern": pattern.value,
-                    "affected_nodes": result.affected_nodes,
-                    "reason": result.reason,
-                    "diagnostics": result.diagnostics,
-                    "suggested_recovery": result.suggested_recovery
+                    "is_deadlocked": False,
+                    "reason": "No active nodes"
                 }
+            region_ids = self._dirty | {node_id for _, node_id in self._suspects}
+            self._dirty = set()
+            active_count = len(self._active)
+        region = [node for node in map(self.task_graph.get_node, region_ids) if node is not None]
+        
+        # Run every detector so each keeps its suspects current, then report
+        # the first pattern found (in the detectors' order)
+        found = None
+        for pattern, detector in self._pattern_detectors.items():
+            result = await detector(region)
+            if found is None and result and result.is_deadlocked:
+                found = (pattern, result)
+        
+        if found:
+            pattern, result = found
+            # Record detection
+            self._detection_history.append(result)
+            
+            # Return formatted result
+            return {
+                "is_deadlocked": True,
+                "pattern": pattern.value,
+                "affected_nodes": result.affected_nodes,
+                "reason": result.reason,
+                "diagnostics": result.diagnostics,
+                "suggested_recovery": result.suggested_recovery
+            }
         
         # No deadlock detected
         return {
             "is_deadlocked": False,
             "reason": "No deadlock patterns detected",
-            "active_nodes": len(active_nodes)
+            "active_nodes": active_count
         }
     
     async def analyze_execution_state(self) -> Dict[str, any]:
@@ -157,104 +363,54 @@ class DeadlockDetector:
             ]
         }
     
-    async def _detect_circular_dependencies(self, active_nodes: List[TaskNode]) -> Optional[DeadlockInfo]:
-        """Detect circular dependency deadlocks."""
-        visited = set()
-        path = []
-        
-        def has_cycle(node_id: str, visiting: Set[str]) -> Optional[List[str]]:
-            """DFS to detect cycles."""
-            if node_id in visiting:
-                # Found cycle
-                cycle_start = path.index(node_id)
-                return path[cycle_start:] + [node_id]
-            
-            if node_id in visited:
-                return None
-            
-            visiting.add(node_id)
-            path.append(node_id)
-            
-            node = self.task_graph.get_node(node_id)
-            if node:
-                # Check parent dependency
-                if node.parent_node_id:
-                    cycle = has_cycle(node.parent_node_id, visiting)
-                    if cycle:
-                        return cycle
-                
-                # Check graph dependencies
-                container_graph = self._find_container_graph(node)
-                if container_graph:
-                    predecessors = self.task_graph.get_node_predecessors(container_graph, node_id)
-                    for pred in predecessors:
-                        cycle = has_cycle(pred.task_id, visiting)
-                        if cycle:
-                            return cycle
-            
-            path.pop()
-            visiting.remove(node_id)
-            visited.add(node_id)
-            return None
-        
-        # Check each active node
-        for node in active_nodes:
-            if node.task_id not in visited:
-                cycle = has_cycle(node.task_id, set())
-                if cycle:
-                    return DeadlockInfo(
-                        is_deadlocked=True,
-                        pattern=DeadlockPattern.CIRCULAR_DEPENDENCY,
-                        affected_nodes=cycle,
-                        reason=f"Circular dependency detected: {' -> '.join(cycle)}",
-                        diagnostics={"cycle": cycle},
-                        suggested_recovery="Break cycle by failing one of the nodes"
-                    )
+    async def _detect_circular_dependencies(self, region: List[TaskNode]) -> Optional[DeadlockInfo]:
+        """Report a wait-for cycle (found when its closing edge was added) that still blocks active nodes."""
+        with self._lock:
+            cycle = next((c for c in self._cycles if any(n in self._active for n in c)), None)
+        if cycle:
+            return DeadlockInfo(
+                is_deadlocked=True,
+                pattern=DeadlockPattern.CIRCULAR_DEPENDENCY,
+                affected_nodes=cycle,
+                reason=f"Circular dependency detected: {' -> '.join(cycle)}",
+                diagnostics={"cycle": cycle},
+                suggested_recovery="Break cycle by failing one of the nodes"
+            )
         
         return None
     
-    async def _detect_parent_child_sync_issues(self, active_nodes: List[TaskNode]) -> Optional[DeadlockInfo]:
-        """Detect parent-child synchronization issues."""
-        issues = []
-        
-        # Group nodes by status
-        nodes_by_status = {}
-        for node in active_nodes:
-            status = node.status
-            if status not in nodes_by_status:
-                nodes_by_status[status] = []
-            nodes_by_status[status].append(node)
-        
-        # Check for RUNNING parents with PENDING children
-        running_nodes = nodes_by_status.get(TaskStatus.RUNNING, [])
-        pending_nodes = nodes_by_status.get(TaskStatus.PENDING, [])
-        
-        for parent in running_nodes:
-            stuck_children = []
-            for child in pending_nodes:
-                if child.parent_node_id == parent.task_id:
-                    # Check if child can't find its container graph
-                    container_graph = self._find_container_graph(child)
-                    if not container_graph:
-                        stuck_children.append(child)
-            
-            if stuck_children:
-                issues.append({
+    def _sync_issue(self, node: TaskNode) -> Optional[Dict[str, Any]]:
+        # RUNNING parent with a PENDING child that can't find its container graph
+        if node.status == TaskStatus.PENDING and node.parent_node_id:
+            parent = self.task_graph.get_node(node.parent_node_id)
+            if parent and parent.status == TaskStatus.RUNNING and not self._find_container_graph(node):
+                return {
                     "parent": parent.task_id,
-                    "stuck_children": [c.task_id for c in stuck_children],
+                    "stuck_children": [node.task_id],
                     "reason": "Children can't find container graph"
-                })
+                }
         
-        # Check for PLAN_DONE parents without proper sub-graph
-        plan_done_nodes = nodes_by_status.get(TaskStatus.PLAN_DONE, [])
-        for node in plan_done_nodes:
-            if node.sub_graph_id:
-                sub_nodes = self.task_graph.get_nodes_in_graph(node.sub_graph_id)
-                if not sub_nodes:
-                    issues.append({
-                        "node": node.task_id,
-                        "reason": "PLAN_DONE with empty sub-graph"
-                    })
+        # PLAN_DONE parent without proper sub-graph
+        if node.status == TaskStatus.PLAN_DONE and node.sub_graph_id:
+            if not self.task_graph.get_nodes_in_graph(node.sub_graph_id):
+                return {
+                    "node": node.task_id,
+                    "reason": "PLAN_DONE with empty sub-graph"
+                }
+        return None
+    
+    async def _detect_parent_child_sync_issues(self, region: List[TaskNode]) -> Optional[DeadlockInfo]:
+        """Detect parent-child synchronization issues."""
+        issues = []
+        by_parent: Dict[str, Dict[str, Any]] = {}
+        for issue in self._confirmed(DeadlockPattern.PARENT_CHILD_SYNC, region, self._sync_issue):
+            if "parent" not in issue:
+                issues.append(issue)
+            elif issue["parent"] in by_parent:
+                by_parent[issue["parent"]]["stuck_children"].extend(issue["stuck_children"])
+            else:
+                by_parent[issue["parent"]] = issue
+        issues = list(by_parent.values()) + issues
         
         if issues:
             affected_nodes = []
@@ -276,54 +432,41 @@ class DeadlockDetector:
         
         return None
     
-    async def _detect_stuck_aggregation(self, active_nodes: List[TaskNode]) -> Optional[DeadlockInfo]:
-        """Detect nodes stuck waiting for aggregation."""
-        stuck_nodes = []
+    def _stuck_aggregation_issue(self, node: TaskNode) -> Optional[Dict[str, Any]]:
+        if node.status != TaskStatus.PLAN_DONE or not node.sub_graph_id:
+            return None
+        sub_nodes = self.task_graph.get_nodes_in_graph(node.sub_graph_id)
         
-        for node in active_nodes:
-            if node.status == TaskStatus.PLAN_DONE and node.sub_graph_id:
-                sub_nodes = self.task_graph.get_nodes_in_graph(node.sub_graph_id)
-                
-                # Check if all children are done but parent hasn't aggregated
-                if sub_nodes:
-                    all_done = all(
-                        n.status in [TaskStatus.DONE, TaskStatus.FAILED] 
-                        for n in sub_nodes
-                    )
-                    
-                    if all_done:
-                        # Parent should be aggregating
-                        stuck_nodes.append({
-                            "node": node.task_id,
-                            "children_count": len(sub_nodes),
-                            "reason": "All children complete but not aggregating"
-                        })
-                    else:
-                        # Some children still active - only consider stuck if ALL children are PENDING
-                        # and none are RUNNING or READY (true deadlock)
-                        incomplete = [
-                            n for n in sub_nodes 
-                            if n.status not in [TaskStatus.DONE, TaskStatus.FAILED]
-                        ]
-                        
-                        # Only flag as stuck if all incomplete children are truly stuck (PENDING only)
-                        # and none are actively running or ready to run
-                        all_stuck = all(
-                            n.status == TaskStatus.PENDING for n in incomplete
-                        )
-                        
-                        if all_stuck and len(incomplete) > 0:
-                            # Additional check: are any children actually ready to transition?
-                            children_can_progress = any(
-                                self.state_manager.can_become_ready(n) for n in incomplete
-                            )
-                            
-                            if not children_can_progress:
-                                stuck_nodes.append({
-                                    "node": node.task_id,
-                                    "incomplete_children": [n.task_id for n in incomplete],
-                                    "reason": f"True deadlock: {len(incomplete)} children permanently stuck in PENDING"
-                                })
+        # Check if all children are done but parent hasn't aggregated
+        if not sub_nodes:
+            return None
+        incomplete = [
+            n for n in sub_nodes 
+            if n.status not in [TaskStatus.DONE, TaskStatus.FAILED]
+        ]
+        if not incomplete:
+            # Parent should be aggregating
+            return {
+                "node": node.task_id,
+                "children_count": len(sub_nodes),
+                "reason": "All children complete but not aggregating"
+            }
+        
+        # Some children still active - only consider stuck if ALL children are PENDING
+        # and none are RUNNING or READY (true deadlock)
+        if all(n.status == TaskStatus.PENDING for n in incomplete):
+            # Additional check: are any children actually ready to transition?
+            if not any(self.state_manager.can_become_ready(n) for n in incomplete):
+                return {
+                    "node": node.task_id,
+                    "incomplete_children": [n.task_id for n in incomplete],
+                    "reason": f"True deadlock: {len(incomplete)} children permanently stuck in PENDING"
+                }
+        return None
+    
+    async def _detect_stuck_aggregation(self, region: List[TaskNode]) -> Optional[DeadlockInfo]:
+        """Detect nodes stuck waiting for aggregation."""
+        stuck_nodes = self._confirmed(DeadlockPattern.STUCK_AGGREGATION, region, self._stuck_aggregation_issue)
         
         if stuck_nodes:
             affected_nodes = [s["node"] for s in stuck_nodes]
@@ -339,27 +482,29 @@ class DeadlockDetector:
         
         return None
     
-    async def _detect_orphaned_nodes(self, active_nodes: List[TaskNode]) -> Optional[DeadlockInfo]:
-        """Detect orphaned nodes with invalid parent states."""
-        orphaned = []
+    def _orphan_issue(self, node: TaskNode) -> Optional[Dict[str, Any]]:
+        if node.status != TaskStatus.PENDING or not node.parent_node_id:
+            return None
+        parent = self.task_graph.get_node(node.parent_node_id)
         
-        for node in active_nodes:
-            if node.status == TaskStatus.PENDING and node.parent_node_id:
-                parent = self.task_graph.get_node(node.parent_node_id)
-                
-                if not parent:
-                    orphaned.append({
-                        "node": node.task_id,
-                        "parent": node.parent_node_id,
-                        "reason": "Parent not found"
-                    })
-                elif parent.status not in [TaskStatus.RUNNING, TaskStatus.PLAN_DONE, TaskStatus.DONE, TaskStatus.AGGREGATING]:
-                    orphaned.append({
-                        "node": node.task_id,
-                        "parent": node.parent_node_id,
-                        "parent_status": parent.status.name,
-                        "reason": "Parent in invalid state"
-                    })
+        if not parent:
+            return {
+                "node": node.task_id,
+                "parent": node.parent_node_id,
+                "reason": "Parent not found"
+            }
+        if parent.status not in [TaskStatus.RUNNING, TaskStatus.PLAN_DONE, TaskStatus.DONE, TaskStatus.AGGREGATING]:
+            return {
+                "node": node.task_id,
+                "parent": node.parent_node_id,
+                "parent_status": parent.status.name,
+                "reason": "Parent in invalid state"
+            }
+        return None
+    
+    async def _detect_orphaned_nodes(self, region: List[TaskNode]) -> Optional[DeadlockInfo]:
+        """Detect orphaned nodes with invalid parent states."""
+        orphaned = self._confirmed(DeadlockPattern.ORPHANED_NODES, region, self._orphan_issue)
         
         if orphaned:
             affected_nodes = [o["node"] for o in orphaned]
@@ -375,13 +520,14 @@ class DeadlockDetector:
         
         return None
     
-    async def _detect_single_node_hang(self, active_nodes: List[TaskNode]) -> Optional[DeadlockInfo]:
+    async def _detect_single_node_hang(self, region: List[TaskNode]) -> Optional[DeadlockInfo]:
         """Detect single node execution hang."""
-        if len(active_nodes) == 1 and active_nodes[0].status == TaskStatus.RUNNING:
+        with self._lock:
+            active_nodes = [self.task_graph.get_node(node_id) for node_id in self._active] if len(self._active) == 1 else []
+        if len(active_nodes) == 1 and active_nodes[0] is not None and active_nodes[0].status == TaskStatus.RUNNING:
             node = active_nodes[0]
             
             # Check if node has been running for too long
-            import time
             current_time = time.time()
             
             # Get node start time from timestamp_updated or use a reasonable default
@@ -428,14 +574,15 @@ class DeadlockDetector:
     
     def _get_active_nodes(self) -> List[TaskNode]:
         """Get all non-terminal nodes."""
-        all_nodes = self.task_graph.get_all_nodes()
-        return [
-            node for node in all_nodes 
-            if not is_terminal_status(node.status)
-        ]
+        with self._lock:
+            self._sync()
+            active_ids = list(self._active)
+        return [node for node in map(self.task_graph.get_node, active_ids) if node is not None]
     
     def _find_container_graph(self, node: TaskNode) -> Optional[str]:
         """Find the graph containing a node."""
+        if hasattr(self.task_graph, "get_container_graph_id"):
+            return self.task_graph.get_container_graph_id(node.task_id)
         for graph_id, graph in self.task_graph.graphs.items():
             if node.task_id in graph.nodes:
                 return graph_id
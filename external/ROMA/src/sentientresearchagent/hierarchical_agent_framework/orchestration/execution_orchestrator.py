@@ -8,10 +8,11 @@ Responsibilities:
 - Manage the execution lifecycle
 """
 
-from typing import Optional, Dict, Any, TYPE_CHECKING
+from typing import Optional, Dict, Any, Set, TYPE_CHECKING
 from loguru import logger
 from pathlib import Path
 import asyncio
+import threading
 
 from sentientresearchagent.hierarchical_agent_framework.node.task_node import TaskNode, TaskStatus, TaskType, NodeType
 from sentientresearchagent.exceptions import SentientError
@@ -29,6 +30,41 @@ if TYPE_CHECKING:
     from ..persistence.checkpoint_manager import CheckpointManager
 
 
+class StatusSignal:
+    """
+    Wake-up flag for one asyncio waiter, raised whenever a node changes status.
+
+    set() may be called from any thread; wait() returns on the next set() or
+    when the watchdog timeout passes, whichever comes first.
+    """
+    
+    def __init__(self):
+        self._loop = asyncio.get_running_loop()
+        self._event = asyncio.Event()
+    
+    def set(self) -> None:
+        if self._loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._event.set()
+        else:
+            self._loop.call_soon_threadsafe(self._event.set)
+    
+    async def wait(self, timeout: float) -> bool:
+        """Returns True if woken by a status change, False on the watchdog timeout."""
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._event.clear()
+
+
 class ExecutionOrchestrator:
     """
     High-level orchestrator for task execution.
@@ -107,6 +143,16 @@ class ExecutionOrchestrator:
         self._processing_times = []  # Track recent processing times
         self._concurrency_lock = asyncio.Lock()
         
+        # Event-driven wake-ups: node status changes wake the main loop and the
+        # slot filler; the watchdog only bounds how long either sleeps without one
+        self._watchdog_seconds = getattr(config.execution, 'orchestrator_watchdog_seconds', 1.0)
+        self._loop_signal: Optional[StatusSignal] = None
+        self._fill_signal: Optional[StatusSignal] = None
+        self._parents_to_check: Set[str] = set()  # parents of nodes that just finished
+        self._parents_lock = threading.Lock()
+        if hasattr(task_graph, "add_listener"):
+            task_graph.add_listener(self)
+        
         # Initialize batched state manager
         self.batched_state_manager = BatchedStateManager(
             knowledge_store=knowledge_store,
@@ -126,6 +172,15 @@ class ExecutionOrchestrator:
         
         logger.info(f"ExecutionOrchestrator initialized with execution_strategy={config.execution.execution_strategy}")
     
+    def on_status_change(self, node: TaskNode, old_status: Any, new_status: Any) -> None:
+        """TaskGraph listener: queue the parent for an aggregation check and wake the loops."""
+        if new_status == TaskStatus.DONE and node.parent_node_id:
+            with self._parents_lock:
+                self._parents_to_check.add(node.parent_node_id)
+        for signal in (self._loop_signal, self._fill_signal):
+            if signal is not None:
+                signal.set()
+    
     async def execute(
         self, 
         root_goal: str,
@@ -246,6 +301,9 @@ class ExecutionOrchestrator:
         completed_queue = asyncio.Queue()
         active_tasks = {}  # Track active processing tasks
         
+        self._loop_signal = StatusSignal()
+        self._fill_signal = StatusSignal()
+        
         # Start the immediate-fill processor if enabled
         immediate_fill_task = None
         use_immediate_fill = getattr(self.config.execution, 'enable_immediate_slot_fill', True)
@@ -260,7 +318,7 @@ class ExecutionOrchestrator:
         try:
             step = 0
             last_activity_time = time.time()
-            iterations_without_work = 0  # Track consecutive iterations with no work
+            stall_level = 0  # 1 after the 10s notice, 2 after the 30s warning
             
             while step < max_steps:
                 # Check timeout
@@ -293,10 +351,7 @@ class ExecutionOrchestrator:
                     did_work = True
                     logger.info(f"✅ PENDING → READY: {transitioned} nodes transitioned")
                     # Batch update knowledge store for all newly ready nodes
-                    ready_nodes_to_update = []
-                    for node in self.task_graph.get_all_nodes():
-                        if node.status == TaskStatus.READY:
-                            ready_nodes_to_update.append(node)
+                    ready_nodes_to_update = self.task_scheduler.get_nodes_by_status(TaskStatus.READY)
                     
                     # Use batched update
                     for node in ready_nodes_to_update:
@@ -313,8 +368,7 @@ class ExecutionOrchestrator:
                 
                 for agg_iter in range(max_aggregate_iterations):
                     aggregated_this_iter = 0
-                    all_nodes = self.task_graph.get_all_nodes()
-                    plan_done_nodes = [n for n in all_nodes if n.status == TaskStatus.PLAN_DONE]
+                    plan_done_nodes = self.task_scheduler.get_nodes_by_status(TaskStatus.PLAN_DONE)
                     
                     if not plan_done_nodes:
                         break
@@ -358,8 +412,8 @@ class ExecutionOrchestrator:
                     if aggregated_this_iter == 0:
                         break
                         
-                    # Small delay to allow async operations to complete
-                    await asyncio.sleep(0.05)
+                    # Yield so callbacks of the transitions above can run
+                    await asyncio.sleep(0)
                 
                 if aggregated_total > 0:
                     did_work = True
@@ -381,8 +435,7 @@ class ExecutionOrchestrator:
                             return {"error": f"Immediate-fill processor failed: {e}"}
                 else:
                     # Traditional batch processing mode
-                    all_nodes = self.task_graph.get_all_nodes()
-                    running_nodes = [n for n in all_nodes if n.status == TaskStatus.RUNNING]
+                    running_nodes = self.task_scheduler.get_nodes_by_status(TaskStatus.RUNNING)
                     max_concurrent = self._get_dynamic_concurrency()
                     available_slots = max_concurrent - len(running_nodes)
                     
@@ -405,9 +458,6 @@ class ExecutionOrchestrator:
                     if await self._is_execution_complete():
                         logger.info("✅ EXECUTION COMPLETE")
                         break
-                    
-                    # Small delay for batch mode
-                    await asyncio.sleep(0.2)
             
                 # Check for immediate aggregation triggers
                 immediate_aggregation_count = await self._check_immediate_aggregation_triggers()
@@ -415,27 +465,24 @@ class ExecutionOrchestrator:
                     did_work = True
                     logger.info(f"🚀 IMMEDIATE AGGREGATION: {immediate_aggregation_count} parents checked due to child completion")
                 
-                # Check for deadlock periodically
-                if step % 50 == 0:  # Check every 50 steps (5 seconds)
-                    deadlock_info = await self.deadlock_detector.detect_deadlock()
-                    if deadlock_info["is_deadlocked"]:
-                        # Try recovery
-                        recovery_result = await self._attempt_deadlock_recovery(deadlock_info)
-                        if not recovery_result["recovered"]:
-                            logger.error(f"Deadlock detected and recovery failed: {deadlock_info['reason']}")
-                            if immediate_fill_task:
-                                immediate_fill_task.cancel()
-                            return {"error": f"Deadlock: {deadlock_info['reason']}"}
-                        else:
-                            logger.info(f"Recovered from deadlock: {recovery_result['action']}")
+                # Check for deadlock every iteration; the detector only re-checks
+                # nodes affected by transitions since the previous check
+                deadlock_info = await self.deadlock_detector.detect_deadlock()
+                if deadlock_info["is_deadlocked"]:
+                    # Try recovery
+                    recovery_result = await self._attempt_deadlock_recovery(deadlock_info)
+                    if not recovery_result["recovered"]:
+                        logger.error(f"Deadlock detected and recovery failed: {deadlock_info['reason']}")
+                        if immediate_fill_task:
+                            immediate_fill_task.cancel()
+                        return {"error": f"Deadlock: {deadlock_info['reason']}"}
+                    else:
+                        logger.info(f"Recovered from deadlock: {recovery_result['action']}")
                 
-                # In immediate-fill mode, wait longer since the processor handles execution
-                if use_immediate_fill:
-                    # Wait for either completion or significant time to pass
-                    await asyncio.sleep(1.0)  # Check status every second
-                else:
-                    # Traditional mode - shorter delay
-                    await asyncio.sleep(0.1)
+                # Sleep until a node changes status (or the watchdog fires), unless
+                # this iteration changed something that may unlock more work
+                if not did_work:
+                    await self._loop_signal.wait(self._watchdog_seconds)
                 
                 # Create checkpoint if needed
                 if self.checkpoint_manager and self.checkpoint_manager.should_checkpoint():
@@ -446,31 +493,29 @@ class ExecutionOrchestrator:
                     step += 1
                     self._execution_stats["steps_executed"] = step
                     last_activity_time = time.time()
-                    iterations_without_work = 0  # Reset counter
+                    stall_level = 0
                     logger.debug(f"✅ Step {step}: Work completed")
                 else:
-                    # No work done - track consecutive iterations without work
-                    iterations_without_work += 1
-                    
-                    # Check if we're stuck
+                    # No work done - check if we're stuck
                     time_since_activity = time.time() - last_activity_time
                     
                     # Log warnings at appropriate intervals
-                    if iterations_without_work == 100:  # 10 seconds of waiting
-                        logger.info(f"⏳ Waiting for nodes to complete... ({time_since_activity:.1f}s since last activity)")
-                    elif iterations_without_work == 300:  # 30 seconds
-                        logger.warning(f"⚠️ Long wait detected: {time_since_activity:.1f}s since last activity")
-                    elif iterations_without_work > 600:  # 60 seconds
-                        # Check if we have any running nodes
-                        all_nodes = self.task_graph.get_all_nodes()
-                        running_nodes = [n for n in all_nodes if n.status == TaskStatus.RUNNING]
+                    if time_since_activity > 60:
+                        running_nodes = self.task_scheduler.get_nodes_by_status(TaskStatus.RUNNING)
                         if running_nodes:
                             logger.info(f"🔄 Still waiting for {len(running_nodes)} running nodes to complete")
-                            # Reset the counter to avoid spam
-                            iterations_without_work = 100
+                            # Restart the 60s window to avoid spam
+                            last_activity_time = time.time() - 10
+                            stall_level = 1
                         else:
                             logger.error(f"❌ No activity for {time_since_activity:.1f}s with no running nodes - system may be stuck")
                             break
+                    elif time_since_activity > 30 and stall_level < 2:
+                        logger.warning(f"⚠️ Long wait detected: {time_since_activity:.1f}s since last activity")
+                        stall_level = 2
+                    elif time_since_activity > 10 and stall_level < 1:
+                        logger.info(f"⏳ Waiting for nodes to complete... ({time_since_activity:.1f}s since last activity)")
+                        stall_level = 1
         
             # Check if we hit max steps
             if step >= max_steps:
@@ -501,6 +546,8 @@ class ExecutionOrchestrator:
                     await immediate_fill_task
                 except asyncio.CancelledError:
                     logger.info("Immediate-fill processor cancelled")
+            self._loop_signal = None
+            self._fill_signal = None
     
     async def _process_nodes_immediate_fill(self, max_concurrent: int) -> None:
         """
@@ -513,6 +560,7 @@ class ExecutionOrchestrator:
         semaphore = asyncio.Semaphore(max_concurrent)
         active_tasks = set()
         processed_count = 0
+        signal = self._fill_signal or StatusSignal()
         
         async def process_node_with_tracking(node: TaskNode) -> None:
             """Process a node and track its completion."""
@@ -560,17 +608,16 @@ class ExecutionOrchestrator:
                     logger.info(f"✅ Immediate fill processor completed. Total nodes processed: {processed_count}")
                     break
             
-            # Wait for any task to complete (this frees up a slot)
-            if active_tasks:
-                done, pending = await asyncio.wait(active_tasks, return_when=asyncio.FIRST_COMPLETED)
-                active_tasks = pending
-                
-                # Log slot availability
-                if done:
-                    logger.info(f"🔄 SLOTS UPDATE: {len(done)} task(s) completed, {len(pending)} still running, {max_concurrent - len(pending)} slots now available")
-            else:
-                # No active tasks, wait a bit before checking for new work
-                await asyncio.sleep(0.1)
+            # Wait for a task to complete (this frees up a slot) or for a status change
+            # that may have made more nodes ready; the watchdog bounds the wait
+            status_changed = asyncio.create_task(signal.wait(self._watchdog_seconds))
+            done, _ = await asyncio.wait(active_tasks | {status_changed}, return_when=asyncio.FIRST_COMPLETED)
+            if not status_changed.done():
+                status_changed.cancel()
+            finished = done - {status_changed}
+            if finished:
+                active_tasks -= finished
+                logger.info(f"🔄 SLOTS UPDATE: {len(finished)} task(s) completed, {len(active_tasks)} still running, {max_concurrent - len(active_tasks)} slots now available")
     
     async def _process_nodes(self, nodes: list[TaskNode]) -> int:
         """
@@ -633,13 +680,18 @@ class ExecutionOrchestrator:
         """
         checked_parents = 0
         
-        # Get all nodes and check for aggregation triggers
-        all_nodes = self.task_graph.get_all_nodes()
-        
-        for node in all_nodes:
-            # Check if this node has an aggregation trigger in its aux_data
-            if (hasattr(node, 'aux_data') and node.aux_data and 
-                'trigger_parent_aggregation_check' in node.aux_data):
+        # Parents of children that completed since the last check (see on_status_change)
+        with self._parents_lock:
+            parent_ids, self._parents_to_check = self._parents_to_check, set()
+        
+        for parent_id in parent_ids:
+            parent_node = self.task_graph.get_node(parent_id)
+            children = [self.task_graph.get_node(cid) for cid in (parent_node.planned_sub_task_ids if parent_node else [])]
+            for node in children:
+                # Check if this child has an aggregation trigger in its aux_data
+                if not (node is not None and node.aux_data and
+                        'trigger_parent_aggregation_check' in node.aux_data):
+                    continue
                 
                 trigger_info = node.aux_data['trigger_parent_aggregation_check']
                 parent_id = trigger_info.get('parent_id')
@@ -725,8 +777,7 @@ class ExecutionOrchestrator:
         active_nodes = await self.task_scheduler.get_active_nodes()
         
         # Also check for PLAN_DONE nodes that might transition to AGGREGATING
-        all_nodes = self.task_graph.get_all_nodes()
-        plan_done_nodes = [n for n in all_nodes if n.status == TaskStatus.PLAN_DONE]
+        plan_done_nodes = self.task_scheduler.get_nodes_by_status(TaskStatus.PLAN_DONE)
         
         # If there are PLAN_DONE nodes, check if any could potentially aggregate
         for node in plan_done_nodes:
@@ -6,9 +6,19 @@ Responsibilities:
 - Determine execution readiness
 - Manage execution order
 - Handle parallel execution constraints
+
+Readiness is indexed rather than rescanned: the scheduler listens to the
+TaskGraph for added nodes/edges and status changes, keeps per-status node
+sets and per-node sets of unmet dependencies (emptied as dependencies
+complete), and pushes a node onto a (layer, created time) heap the moment
+it becomes executable. PENDING nodes whose dependencies are met become
+promotion candidates the same way, so neither path scans the whole graph.
 """
 
-from typing import List, Set, Dict, Optional, TYPE_CHECKING, Tuple
+import heapq
+import itertools
+import threading
+from typing import Any, List, Set, Dict, Optional, TYPE_CHECKING, Tuple
 from loguru import logger
 from collections import defaultdict, deque
 
@@ -19,6 +29,13 @@ if TYPE_CHECKING:
     from sentientresearchagent.hierarchical_agent_framework.graph.task_graph import TaskGraph
     from sentientresearchagent.hierarchical_agent_framework.graph.state_manager import StateManager
 
+# Statuses that are picked up by get_ready_nodes
+EXECUTABLE_STATUSES = (TaskStatus.READY, TaskStatus.AGGREGATING)
+# Statuses whose dependencies are tracked
+WAITING_STATUSES = (TaskStatus.PENDING, TaskStatus.READY)
+# Parent statuses that allow a child to start
+PARENT_READY_STATUSES = (TaskStatus.RUNNING, TaskStatus.PLAN_DONE, TaskStatus.DONE, TaskStatus.AGGREGATING)
+
 
 class TaskScheduler:
     """
@@ -49,8 +66,160 @@ class TaskScheduler:
         self._topological_order: List[str] = []
         self._graph_version = 0
         
+        # Ready index, maintained from TaskGraph events
+        self._index_lock = threading.RLock()
+        self._indexed: Set[str] = set()
+        self._indexed_generation = getattr(task_graph, "generation", 0)
+        self._by_status: Dict[TaskStatus, Set[str]] = defaultdict(set)
+        self._unmet_deps: Dict[str, Set[str]] = {}           # PENDING/READY node -> dependencies not yet DONE
+        self._dependents: Dict[str, Set[str]] = defaultdict(set)  # dependency -> nodes waiting on it
+        self._parent_waiters: Dict[str, Set[str]] = defaultdict(set)  # parent -> children it blocks
+        self._promotable: Set[str] = set()                   # PENDING nodes with dependencies met
+        self._ready_heap: List[Tuple[int, Any, int, str]] = []  # (layer, created, seq, node_id)
+        self._queued: Set[str] = set()                       # node IDs with an entry in the heap
+        self._seq = itertools.count()
+        
+        if hasattr(task_graph, "add_listener"):
+            task_graph.add_listener(self)
+        
         logger.info("TaskScheduler initialized")
     
+    # ----- Ready index -----
+    
+    def _index_node(self, node: TaskNode) -> None:
+        node_id = node.task_id
+        if node_id in self._indexed:
+            return
+        self._indexed.add(node_id)
+        self._by_status[node.status].add(node_id)
+        if hasattr(self.task_graph, "watch_node"):
+            self.task_graph.watch_node(node)
+        self._track(node)
+    
+    def _sync_index(self) -> None:
+        """
+        Catch up with nodes that were put into the graph without events. A new
+        TaskGraph generation (contents replaced, e.g. a project reloaded with the
+        same node IDs) drops the whole index and rebuilds it from the new nodes.
+        O(1) when in sync.
+        """
+        nodes = self.task_graph.nodes
+        generation = getattr(self.task_graph, "generation", 0)
+        if generation == self._indexed_generation and len(nodes) == len(self._indexed):
+            return
+        with self._index_lock:
+            if generation != self._indexed_generation:
+                self._clear_index()
+                self._indexed_generation = generation
+            for node in list(nodes.values()):
+                self._index_node(node)
+            for node_id in self._indexed - nodes.keys():
+                self._forget(node_id)
+    
+    def _clear_index(self) -> None:
+        self._indexed.clear()
+        self._by_status.clear()
+        self._unmet_deps.clear()
+        self._dependents.clear()
+        self._parent_waiters.clear()
+        self._promotable.clear()
+        self._ready_heap.clear()
+        self._queued.clear()
+        self._dependency_cache.clear()
+    
+    def _forget(self, node_id: str) -> None:
+        self._indexed.discard(node_id)
+        for ids in self._by_status.values():
+            ids.discard(node_id)
+        self._untrack(node_id)
+
+    def _untrack(self, node_id: str) -> None:
+        self._promotable.discard(node_id)
+        for dep_id in self._unmet_deps.pop(node_id, ()):
+            self._dependents[dep_id].discard(node_id)
+    
+    def _push(self, node: TaskNode) -> None:
+        if node.task_id in self._queued:
+            return
+        self._queued.add(node.task_id)
+        heapq.heappush(self._ready_heap, (node.layer, node.timestamp_created, next(self._seq), node.task_id))
+    
+    def _register_unmet(self, node: TaskNode) -> bool:
+        """(Re)compute the unmet dependencies of a waiting node; True if there are none."""
+        node_id = node.task_id
+        self._untrack(node_id)
+        unmet = set()
+        for dep_id in self._compute_dependencies(node):
+            dep_node = self.task_graph.get_node(dep_id)
+            # Unknown dependencies are ignored, as in _are_dependencies_satisfied
+            if dep_node is not None and dep_node.status != TaskStatus.DONE:
+                unmet.add(dep_id)
+                self._dependents[dep_id].add(node_id)
+        if unmet:
+            self._unmet_deps[node_id] = unmet
+        return not unmet
+    
+    def _deps_met(self, node: TaskNode) -> None:
+        if node.status == TaskStatus.READY:
+            # Parent state is checked when popped, it can change until then
+            self._push(node)
+        elif node.status == TaskStatus.PENDING:
+            if self._parent_allows(node):
+                self._promotable.add(node.task_id)
+            else:
+                self._parent_waiters[node.parent_node_id].add(node.task_id)
+    
+    def _track(self, node: TaskNode) -> None:
+        """Queue a node whose wait is over, or park it on whatever it is waiting for."""
+        if node.status == TaskStatus.AGGREGATING:
+            self._push(node)
+        elif node.status in WAITING_STATUSES and self._register_unmet(node):
+            self._deps_met(node)
+    
+    def on_node_added(self, graph_id: str, node: TaskNode) -> None:
+        with self._index_lock:
+            self._index_node(node)
+    
+    def on_edge_added(self, graph_id: str, u_node_id: str, v_node_id: str) -> None:
+        self._dependency_cache.pop(v_node_id, None)
+        with self._index_lock:
+            v_node = self.task_graph.get_node(v_node_id)
+            if v_node is not None and v_node.status in WAITING_STATUSES:
+                self._track(v_node)
+    
+    def on_status_change(self, node: TaskNode, old_status: Any, new_status: Any) -> None:
+        node_id = node.task_id
+        with self._index_lock:
+            if node_id not in self._indexed:
+                self._index_node(node)
+                return
+            self._by_status[old_status].discard(node_id)
+            self._by_status[new_status].add(node_id)
+            
+            if new_status == TaskStatus.DONE:
+                # Shrink every dependent's unmet set; release the ones that become empty
+                for dependent_id in self._dependents.pop(node_id, ()):
+                    unmet = self._unmet_deps.get(dependent_id)
+                    if unmet is None:
+                        continue
+                    unmet.discard(node_id)
+                    if not unmet:
+                        del self._unmet_deps[dependent_id]
+                        dependent = self.task_graph.get_node(dependent_id)
+                        if dependent is not None:
+                            self._deps_met(dependent)
+            
+            if new_status in PARENT_READY_STATUSES:
+                for child_id in self._parent_waiters.pop(node_id, ()):
+                    child = self.task_graph.get_node(child_id)
+                    if child is not None:
+                        self._track(child)
+            
+            if new_status in WAITING_STATUSES or new_status == TaskStatus.AGGREGATING:
+                self._track(node)
+            else:
+                self._untrack(node_id)
+    
     async def get_ready_nodes(self, max_nodes: Optional[int] = None) -> List[TaskNode]:
         """
         Get nodes that are ready for execution.
@@ -60,48 +229,63 @@ class TaskScheduler:
         - All its dependencies are satisfied
         - Its parent (if any) is in an appropriate state
         
+        Pops up to max_nodes entries off the ready heap, O(k log n). Entries
+        whose node has since left READY/AGGREGATING are dropped lazily. The
+        returned nodes stay queued until their status changes, so nodes the
+        caller does not start are offered again on the next call.
+        
         Args:
             max_nodes: Maximum number of nodes to return (for controlling parallelism)
             
         Returns:
             List of nodes ready for execution
         """
-        ready_nodes = []
-        
-        # Get all nodes in READY or AGGREGATING status
-        all_nodes = self.task_graph.get_all_nodes()
-        potential_ready = [node for node in all_nodes if node.status in [TaskStatus.READY, TaskStatus.AGGREGATING]]
-        
-        # Check each potential node
-        for node in potential_ready:
-            if await self._is_node_executable(node):
+        self._sync_index()
+        ready_nodes: List[TaskNode] = []
+        dropped = 0
+        
+        with self._index_lock:
+            while self._ready_heap and not (max_nodes and len(ready_nodes) >= max_nodes):
+                node_id = heapq.heappop(self._ready_heap)[-1]
+                self._queued.discard(node_id)
+                node = self.task_graph.get_node(node_id)
+                if node is None or node.status not in EXECUTABLE_STATUSES:
+                    dropped += 1
+                    continue
+                if node.status == TaskStatus.READY:
+                    if not self._parent_allows(node):
+                        self._parent_waiters[node.parent_node_id].add(node_id)
+                        continue
+                    # Re-check in case the dependency set grew (late edges / replans)
+                    if not self._register_unmet(node):
+                        logger.debug(f"Node {node_id} not executable: dependencies not satisfied")
+                        continue
                 ready_nodes.append(node)
-                
-                # Check if we've reached the limit
-                if max_nodes and len(ready_nodes) >= max_nodes:
-                    break
-        
-        # Sort by priority (layer, then creation time)
-        ready_nodes.sort(key=lambda n: (n.layer, n.timestamp_created))
-        
-        if potential_ready:
-            logger.info(f"TaskScheduler: Checked {len(potential_ready)} potential nodes "
-                       f"(READY: {sum(1 for n in potential_ready if n.status == TaskStatus.READY)}, "
-                       f"AGGREGATING: {sum(1 for n in potential_ready if n.status == TaskStatus.AGGREGATING)}), "
-                       f"found {len(ready_nodes)} executable")
             
-            # Log why nodes were rejected - more detail
-            if len(ready_nodes) == 0 and len(potential_ready) > 0:
-                logger.warning(f"Found {len(potential_ready)} potential nodes but NONE are executable!")
-                for node in potential_ready[:3]:  # Log first 3 for debugging
-                    is_exec = await self._is_node_executable(node)
-                    logger.info(f"  Node {node.task_id}: status={node.status}, "
-                               f"parent={node.parent_node_id}, executable={is_exec}")
-        else:
-            logger.info(f"TaskScheduler: No nodes in READY or AGGREGATING status")
+            for node in ready_nodes:
+                self._push(node)
+        
+        if ready_nodes or dropped:
+            logger.info(f"TaskScheduler: {len(ready_nodes)} executable nodes "
+                        f"(READY: {len(self._by_status[TaskStatus.READY])}, "
+                        f"AGGREGATING: {len(self._by_status[TaskStatus.AGGREGATING])}, "
+                        f"stale entries dropped: {dropped})")
         
         return ready_nodes
     
+    def _parent_allows(self, node: TaskNode) -> bool:
+        if not node.parent_node_id:
+            return True
+        parent = self.task_graph.get_node(node.parent_node_id)
+        return parent is not None and parent.status in PARENT_READY_STATUSES
+    
+    def get_nodes_by_status(self, *statuses: TaskStatus) -> List[TaskNode]:
+        """Nodes currently in any of `statuses`, read from the status index."""
+        self._sync_index()
+        with self._index_lock:
+            ids = [node_id for status in statuses for node_id in self._by_status.get(status, ())]
+        return [node for node in map(self.task_graph.get_node, ids) if node is not None]
+    
     async def get_active_nodes(self) -> List[TaskNode]:
         """
         Get all nodes that are currently active (not in terminal state).
@@ -109,13 +293,7 @@ class TaskScheduler:
         Returns:
             List of active nodes
         """
-        all_nodes = self.task_graph.get_all_nodes()
-        active_nodes = [
-            node for node in all_nodes 
-            if not is_terminal_status(node.status)
-        ]
-        
-        return active_nodes
+        return self.get_nodes_by_status(*(s for s in TaskStatus if not is_terminal_status(s)))
     
     async def get_pending_nodes(self) -> List[TaskNode]:
         """
@@ -124,15 +302,13 @@ class TaskScheduler:
         Returns:
             List of pending nodes with their blocking reasons
         """
-        all_nodes = self.task_graph.get_all_nodes()
         pending_nodes = []
         
-        for node in all_nodes:
-            if node.status == TaskStatus.PENDING:
-                # Analyze why the node is pending
-                blocking_reason = await self._get_blocking_reason(node)
-                node.aux_data["blocking_reason"] = blocking_reason
-                pending_nodes.append(node)
+        for node in self.get_nodes_by_status(TaskStatus.PENDING):
+            # Analyze why the node is pending
+            blocking_reason = await self._get_blocking_reason(node)
+            node.aux_data["blocking_reason"] = blocking_reason
+            pending_nodes.append(node)
         
         return pending_nodes
     
@@ -141,27 +317,34 @@ class TaskScheduler:
         Update the readiness status of all nodes.
         
         This method transitions PENDING nodes to READY when their
-        dependencies are satisfied.
+        dependencies are satisfied. Only the indexed promotion candidates
+        are visited, each re-checked with _can_transition_to_ready.
         
         Returns:
             Number of nodes transitioned to READY
         """
         transitioned = 0
-        all_nodes = self.task_graph.get_all_nodes()
         
-        for node in all_nodes:
-            if node.status == TaskStatus.PENDING:
-                if await self._can_transition_to_ready(node):
-                    # Transition the node to READY
-                    old_status = node.status
-                    node.update_status(TaskStatus.READY, validate_transition=True)
-                    
-                    # Update in knowledge store if we have one
-                    # Note: TaskScheduler doesn't have direct access to knowledge store
-                    # This should be handled by the caller
-                    
-                    transitioned += 1
-                    logger.info(f"Node {node.task_id} transitioned from PENDING to READY")
+        self._sync_index()
+        with self._index_lock:
+            candidates = [self.task_graph.get_node(node_id) for node_id in self._promotable]
+        candidates = sorted((n for n in candidates if n is not None), key=lambda n: (n.layer, n.timestamp_created))
+        
+        for node in candidates:
+            if await self._can_transition_to_ready(node):
+                # Transition the node to READY (the status event queues it)
+                node.update_status(TaskStatus.READY, validate_transition=True)
+                
+                # Update in knowledge store if we have one
+                # Note: TaskScheduler doesn't have direct access to knowledge store
+                # This should be handled by the caller
+                
+                transitioned += 1
+                logger.info(f"Node {node.task_id} transitioned from PENDING to READY")
+            else:
+                # Dependencies or parent turned out to be unmet after all: park it again
+                with self._index_lock:
+                    self._track(node)
         
         if transitioned > 0:
             logger.info(f"TaskScheduler: {transitioned} nodes transitioned to READY")
@@ -284,6 +467,15 @@ class TaskScheduler:
         if node.task_id in self._dependency_cache:
             return self._dependency_cache[node.task_id]
         
+        dependencies = self._compute_dependencies(node)
+        
+        # Cache the result
+        self._dependency_cache[node.task_id] = dependencies
+        
+        return dependencies
+    
+    def _compute_dependencies(self, node: TaskNode) -> Set[str]:
+        """Dependency IDs of a node from its plan indices and graph edges (uncached)."""
         dependencies = set()
         
         # Method 1: Check aux_data for depends_on_indices (more reliable for newly created nodes)
@@ -299,11 +491,7 @@ class TaskScheduler:
                         logger.debug(f"Found dependency {dep_id} for node {node.task_id} from aux_data")
         
         # Method 2: Find the graph containing this node and check graph edges
-        container_graph_id = None
-        for graph_id, graph in self.task_graph.graphs.items():
-            if node.task_id in graph.nodes:
-                container_graph_id = graph_id
-                break
+        container_graph_id = self.task_graph.get_container_graph_id(node.task_id)
         
         if container_graph_id:
             # Get predecessors in the graph
@@ -315,9 +503,6 @@ class TaskScheduler:
                 dependencies.add(pred.task_id)
                 logger.debug(f"Found dependency {pred.task_id} for node {node.task_id} from graph")
         
-        # Cache the result
-        self._dependency_cache[node.task_id] = dependencies
-        
         return dependencies
     
     async def _can_transition_to_ready(self, node: TaskNode) -> bool:
@@ -394,19 +579,20 @@ class TaskScheduler:
         Returns:
             Dictionary with execution metrics
         """
-        all_nodes = self.task_graph.get_all_nodes()
-        
-        metrics = {
-            "total_nodes": len(all_nodes),
-            "pending": sum(1 for n in all_nodes if n.status == TaskStatus.PENDING),
-            "ready": sum(1 for n in all_nodes if n.status == TaskStatus.READY),
-            "running": sum(1 for n in all_nodes if n.status == TaskStatus.RUNNING),
-            "completed": sum(1 for n in all_nodes if n.status == TaskStatus.DONE),
-            "failed": sum(1 for n in all_nodes if n.status == TaskStatus.FAILED),
-            "plan_done": sum(1 for n in all_nodes if n.status == TaskStatus.PLAN_DONE),
-            "aggregating": sum(1 for n in all_nodes if n.status == TaskStatus.AGGREGATING),
-            "needs_replan": sum(1 for n in all_nodes if n.status == TaskStatus.NEEDS_REPLAN),
-        }
+        self._sync_index()
+        with self._index_lock:
+            count = lambda status: len(self._by_status.get(status, ()))
+            metrics = {
+                "total_nodes": len(self._indexed),
+                "pending": count(TaskStatus.PENDING),
+                "ready": count(TaskStatus.READY),
+                "running": count(TaskStatus.RUNNING),
+                "completed": count(TaskStatus.DONE),
+                "failed": count(TaskStatus.FAILED),
+                "plan_done": count(TaskStatus.PLAN_DONE),
+                "aggregating": count(TaskStatus.AGGREGATING),
+                "needs_replan": count(TaskStatus.NEEDS_REPLAN),
+            }
         
         return metrics
     
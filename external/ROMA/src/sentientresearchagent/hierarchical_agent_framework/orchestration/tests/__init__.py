@@ -0,0 +1,3 @@
+"""
+Test suite for orchestration module.
+"""
@@ -0,0 +1,100 @@
+"""
+Tests for reloading a TaskGraph in place (same node IDs, new TaskNode objects).
+"""
+
+import asyncio
+
+from sentientresearchagent.hierarchical_agent_framework.graph.adjacency_graph import AdjacencyGraph
+from sentientresearchagent.hierarchical_agent_framework.graph.task_graph import TaskGraph
+from sentientresearchagent.hierarchical_agent_framework.node.task_node import TaskNode
+from sentientresearchagent.hierarchical_agent_framework.orchestration.deadlock_detector import DeadlockDetector
+from sentientresearchagent.hierarchical_agent_framework.orchestration.task_scheduler import TaskScheduler
+from sentientresearchagent.hierarchical_agent_framework.types import NodeType, TaskStatus, TaskType
+
+
+def make_node(task_id: str, status: TaskStatus) -> TaskNode:
+    return TaskNode(goal=task_id, task_type=TaskType.THINK, node_type=NodeType.EXECUTE,
+                    layer=1, task_id=task_id, overall_objective="test", status=status)
+
+
+def build_graph(first: TaskStatus, second: TaskStatus) -> TaskGraph:
+    task_graph = TaskGraph()
+    task_graph.add_graph("root_graph", is_root=True)
+    task_graph.add_node_to_graph("root_graph", make_node("a", first))
+    task_graph.add_node_to_graph("root_graph", make_node("b", second))
+    task_graph.add_edge("root_graph", "a", "b")
+    return task_graph
+
+
+def reload(task_graph: TaskGraph, first: TaskStatus, second: TaskStatus) -> None:
+    """Replace the contents the way a project restore does."""
+    graph = AdjacencyGraph(graph_id="root_graph")
+    graph.add_node("a")
+    graph.add_node("b")
+    graph.add_edge("a", "b")
+    task_graph.replace_contents({"a": make_node("a", first), "b": make_node("b", second)},
+                                {"root_graph": graph}, root_graph_id="root_graph")
+
+
+class TestSchedulerReload:
+    """The ready index must follow a reload even when the node count is unchanged."""
+
+    def test_reload_with_same_ids_rebuilds_ready_index(self):
+        task_graph = build_graph(TaskStatus.READY, TaskStatus.PENDING)
+        scheduler = TaskScheduler(task_graph, None)
+        assert [n.task_id for n in asyncio.run(scheduler.get_ready_nodes())] == ["a"]
+
+        generation = task_graph.generation
+        reload(task_graph, TaskStatus.DONE, TaskStatus.READY)
+        assert task_graph.generation == generation + 1
+
+        ready = asyncio.run(scheduler.get_ready_nodes())
+        assert ready == [task_graph.get_node("b")]
+        assert ready[0] is task_graph.nodes["b"]
+
+    def test_reloaded_nodes_report_status_changes(self):
+        task_graph = build_graph(TaskStatus.RUNNING, TaskStatus.PENDING)
+        scheduler = TaskScheduler(task_graph, None)
+        old_a = task_graph.get_node("a")
+        asyncio.run(scheduler.get_ready_nodes())
+
+        reload(task_graph, TaskStatus.RUNNING, TaskStatus.PENDING)
+        assert scheduler.get_nodes_by_status(TaskStatus.RUNNING) == [task_graph.get_node("a")]
+
+        # The replaced object no longer feeds the index; its successor does
+        old_a.update_status(TaskStatus.DONE)
+        assert asyncio.run(scheduler.update_node_readiness()) == 0
+        task_graph.get_node("a").update_status(TaskStatus.DONE)
+        assert asyncio.run(scheduler.update_node_readiness()) == 1
+        assert task_graph.get_node("b").status == TaskStatus.READY
+
+
+class TestCompletionCountsReload:
+    """Completion counts must be recounted from the reloaded nodes."""
+
+    def test_reload_with_same_ids_recounts(self):
+        task_graph = build_graph(TaskStatus.DONE, TaskStatus.DONE)
+        assert task_graph.get_completion_counts("root_graph") == (2, 2)
+
+        reload(task_graph, TaskStatus.DONE, TaskStatus.RUNNING)
+        assert task_graph.get_completion_counts("root_graph") == (2, 1)
+
+        task_graph.get_node("b").update_status(TaskStatus.DONE)
+        assert task_graph.get_completion_counts("root_graph") == (2, 2)
+
+
+class TestDeadlockDetectorReload:
+    """The detector's incremental state must follow a reload of the same graph."""
+
+    def test_reload_with_same_ids_rebuilds_active_set(self):
+        task_graph = build_graph(TaskStatus.RUNNING, TaskStatus.PENDING)
+        detector = DeadlockDetector(task_graph, None, confirm_seconds=0)
+        assert {n.task_id for n in detector._get_active_nodes()} == {"a", "b"}
+
+        reload(task_graph, TaskStatus.DONE, TaskStatus.DONE)
+        assert detector._get_active_nodes() == []
+
+        reload(task_graph, TaskStatus.DONE, TaskStatus.RUNNING)
+        assert detector._get_active_nodes() == [task_graph.get_node("b")]
+        task_graph.get_node("b").update_status(TaskStatus.DONE)
+        assert detector._get_active_nodes() == []
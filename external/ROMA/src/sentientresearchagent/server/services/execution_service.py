@@ -446,10 +446,7 @@ class ExecutionService:
                 logger.info("🧹 Starting fresh project...")
                 
                 # Clear project graph
-                project_task_graph.nodes.clear()
-                project_task_graph.graphs.clear()
-                project_task_graph.root_graph_id = None
-                project_task_graph.overall_project_goal = None
+                project_task_graph.reset()
                 
                 # CRITICAL FIX: Clear the knowledge store for the project
                 knowledge_store = project_components.get('knowledge_store')
@@ -540,7 +537,12 @@ class ExecutionService:
         """Load project state into task graph."""
         # This logic was extracted from the original load method
         # It deserializes nodes and reconstructs graphs
-        self.project_service._reconstruct_graphs(project_task_graph, project_state.get('graphs', {}))
+        project_task_graph.replace_contents(
+            project_task_graph.nodes,
+            self.project_service._reconstruct_graphs(project_state.get('graphs', {})),
+            root_graph_id=project_task_graph.root_graph_id,
+            overall_project_goal=project_task_graph.overall_project_goal
+        )
         # ... other state loading logic
     
     def _save_final_project_state_enhanced(self, project_task_graph, project_id):
@@ -634,11 +634,9 @@ class ProjectService:
                     logger.error(f"🚨 LOAD DEBUG - Task graph is missing from project components for {project_id}")
                     return False
                 
-                # Clear and reload the project's task graph
-                project_task_graph.nodes.clear()
-                project_task_graph.graphs.clear()
-                project_task_graph.root_graph_id = None
-                project_task_graph.overall_project_goal = None
+                # Deserialize into fresh containers, then swap them into the project's task graph
+                nodes: Dict[str, Any] = {}
+                graphs: Dict[str, Any] = {}
                 
                 if 'all_nodes' in project_state and node_count > 0:
                     # Load nodes by deserializing dictionaries back to TaskNode objects
@@ -655,7 +653,7 @@ class ProjectService:
                             prepared_data = self._prepare_node_data_for_deserialization(node_data)
                             
                             task_node = TaskNode(**prepared_data)
-                            project_task_graph.nodes[node_id] = task_node
+                            nodes[node_id] = task_node
                             successful_nodes += 1
                             
                         except Exception as e:
@@ -667,18 +665,22 @@ class ProjectService:
                 
                 # Reconstruct graphs
                 if 'graphs' in project_state:
-                    self._reconstruct_graphs(project_task_graph, project_state['graphs'])
+                    graphs = self._reconstruct_graphs(project_state['graphs'])
                     logger.debug(f"🚨 LOAD DEBUG - Reconstructed {len(project_state['graphs'])} graphs")
                 
                 # Set project goal
+                overall_project_goal = None
                 if 'overall_project_goal' in project_state:
-                    project_task_graph.overall_project_goal = project_state['overall_project_goal']
+                    overall_project_goal = project_state['overall_project_goal']
                 elif project:
-                    project_task_graph.overall_project_goal = project.goal
+                    overall_project_goal = project.goal
                 
-                # Set root graph ID
-                if 'root_graph_id' in project_state:
-                    project_task_graph.root_graph_id = project_state['root_graph_id']
+                project_task_graph.replace_contents(
+                    nodes,
+                    graphs,
+                    root_graph_id=project_state.get('root_graph_id'),
+                    overall_project_goal=overall_project_goal
+                )
             
             elif project:
                 # No saved state, just set the goal
@@ -716,12 +718,12 @@ class ProjectService:
                 # Also update the project-specific graph if it exists
                 if current_project.id in self.project_graphs:
                     project_task_graph = self.project_graphs[current_project.id]['task_graph']
-                    project_task_graph.nodes.clear()
-                    project_task_graph.nodes.update(display_graph.nodes)
-                    project_task_graph.graphs.clear()
-                    project_task_graph.graphs.update(display_graph.graphs)
-                    project_task_graph.overall_project_goal = display_graph.overall_project_goal
-                    project_task_graph.root_graph_id = display_graph.root_graph_id
+                    project_task_graph.replace_contents(
+                        display_graph.nodes,
+                        display_graph.graphs,
+                        root_graph_id=display_graph.root_graph_id,
+                        overall_project_goal=display_graph.overall_project_goal
+                    )
                 
                 logger.debug(f"💾 Saved state for project {current_project.id}")
             except Exception as e:
@@ -791,11 +793,7 @@ class ProjectService:
     
     def _clear_display_graph(self):
         """Clear the display graph."""
-        display_graph = self.system_manager.task_graph
-        display_graph.nodes.clear()
-        display_graph.graphs.clear()
-        display_graph.root_graph_id = None
-        display_graph.overall_project_goal = None
+        self.system_manager.task_graph.reset()
     
     def _deserialize_node_timestamps(self, node_data: Dict[str, Any]):
         """Convert timestamp strings back to datetime objects."""
@@ -860,12 +858,11 @@ class ProjectService:
             logger.warning(f"Failed to prepare node data for deserialization: {e}")
             return node_data
     
-    def _reconstruct_graphs(self, project_task_graph: TaskGraph, graphs_data: Dict[str, Any]):
-        """Reconstruct NetworkX graphs from serialized data."""
+    def _reconstruct_graphs(self, graphs_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Reconstruct NetworkX graphs from serialized data, keyed by graph ID."""
         import networkx as nx
         
-        project_task_graph.graphs.clear()
-        
+        graphs: Dict[str, Any] = {}
         for graph_id, graph_data in graphs_data.items():
             try:
                 # Create a new DiGraph
@@ -883,9 +880,11 @@ class ProjectService:
                         elif isinstance(edge, (list, tuple)) and len(edge) == 2:
                             new_graph.add_edge(edge[0], edge[1])
                 
-                project_task_graph.graphs[graph_id] = new_graph
+                graphs[graph_id] = new_graph
             except Exception as e:
                 logger.warning(f"Failed to reconstruct graph {graph_id}: {e}")
+        
+        return graphs
 
     def _check_system_readiness_for_execution(self) -> bool:
         """
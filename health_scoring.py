@@ -0,0 +1,134 @@
+"""
+Vectorized health scoring
+
+Every scoring rule used by the analyzers lives here, written over NumPy arrays:
+pass scalars to score one entry, or whole columns (see `columns`) to score a
+batch of users or re-score the reports table in one pass. Each scheme keeps the
+exact targets and rounding of the call site it was taken from.
+"""
+
+from typing import Any, Dict, Iterable, List
+
+import numpy as np
+
+def _as_float(v: Any, default: float) -> float:
+    if v is None or isinstance(v, bool):
+        return default
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return default
+
+_pyround = np.frompyfunc(round, 2, 1)
+
+def _round(x, ndigits: int) -> np.ndarray:
+    """Python's round() elementwise; np.round scales first and can flip .x5 ties"""
+    return np.asarray(_pyround(x, ndigits), dtype=float)
+
+def columns(rows: List[Dict[str, Any]], fields: Iterable[str], default: float = 0.0) -> Dict[str, np.ndarray]:
+    """
+    Columnar float arrays from a list of dicts
+
+    Missing or non-numeric values become `default` (use np.nan to tell "absent" from zero).
+    """
+    return {f: np.array([_as_float(r.get(f), default) for r in rows], dtype=float) for f in fields}
+
+# ---- Weekly averages (/weekly-report) ----
+def weekly_averages(steps, sleep_hours) -> Dict[str, np.ndarray]:
+    """Per-day averages from weekly totals"""
+    return {
+        "daily_steps_avg": np.round(np.asarray(steps, dtype=float) / 7, 0),
+        "daily_sleep_avg": _round(np.asarray(sleep_hours, dtype=float) / 7, 1),
+    }
+
+# ---- Weekly scores against 10k steps/day, 56h sleep, 14L water (MetricsAnalysisAgent) ----
+def weekly_scores(steps, sleep_hours, workouts, water_liters) -> Dict[str, np.ndarray]:
+    activity = np.minimum(100, (np.asarray(steps, dtype=float) / 10000) * 100 + np.asarray(workouts, dtype=float) * 15)
+    hydration = np.minimum(100, (np.asarray(water_liters, dtype=float) / 14.0) * 100)
+    sleep = np.minimum(100, (np.asarray(sleep_hours, dtype=float) / 56.0) * 100)
+    return {
+        "activity": activity,
+        "hydration": hydration,
+        "sleep": sleep,
+        "overall": (activity + hydration + sleep) / 3,
+    }
+
+# ---- Integer percent-of-target scores (MetricsAnalysisExecutor) ----
+WEEKLY_TARGETS = {
+    "steps": 70000.0,       # ~10k/day
+    "sleep": 56.0,          # 8h/day
+    "workouts": 4.0,        # 4/week
+    "hydration": 14.0,      # 2L/day
+}
+
+def target_scores(steps, sleep_hours, workouts, water_liters) -> Dict[str, np.ndarray]:
+    values = {"steps": steps, "sleep": sleep_hours, "workouts": workouts, "hydration": water_liters}
+    scores = {
+        name: np.minimum(100, np.trunc(np.asarray(values[name], dtype=float) / target * 100)).astype(int)
+        for name, target in WEEKLY_TARGETS.items()
+    }
+    scores["overall"] = np.trunc(np.mean([scores[n] for n in WEEKLY_TARGETS], axis=0)).astype(int)
+    return scores
+
+# ---- Daily scores with a small above-target bonus (calc_*_score) ----
+def scale(value, target: float, max_value: float) -> np.ndarray:
+    """Percent of target capped at 100, plus up to +10 for exceeding it"""
+    value = np.asarray(value, dtype=float)
+    if max_value <= 0:
+        return np.zeros_like(value)
+    score = np.minimum(value / target, 1.0) * 100.0
+    bonus = np.minimum((value - target) / max_value, 0.1) * 100.0
+    score = np.where(value > target, np.minimum(100.0, score + bonus), score)
+    return _round(score, 1)
+
+def activity_score(steps, workouts) -> np.ndarray:
+    # 10k steps target, 3 workouts target; 30k max considered for bonus
+    return _round(0.7 * scale(steps, 10000.0, 30000.0) + 0.3 * scale(workouts, 3.0, 10.0), 1)
+
+def sleep_score(sleep_hours) -> np.ndarray:
+    # ideal 7.5h; penalize distance from 7.5 within [0,12]
+    ideal, max_dev = 7.5, 4.5
+    deviation = np.minimum(np.abs(np.asarray(sleep_hours, dtype=float) - ideal), max_dev)
+    return _round(np.clip((1.0 - deviation / max_dev) * 100.0, 0.0, 100.0), 1)
+
+def hydration_score(water_liters) -> np.ndarray:
+    # target 2.5L, bonus up to 3.5L
+    return scale(water_liters, 2.5, 3.5)
+
+# ---- Recovery markers (analyze_health_locally); NaN = not provided ----
+RHR_BANDS = ["very_low", "excellent", "good", "slightly_elevated", "high"]
+HRV_BANDS = ["strong", "moderate", "low"]
+
+def recovery_assessment(resting_hr, hrv, calories, runs) -> Dict[str, np.ndarray]:
+    """
+    Bands (-1 when absent), flags and the 0-100 score
+
+    Score: 70, +5 per positive (rHR 50-60, HRV >= 70, 3+ runs), -10 per flag.
+    """
+    rhr = np.asarray(resting_hr, dtype=float)
+    hrv = np.asarray(hrv, dtype=float)
+    cals = np.asarray(calories, dtype=float)
+    runs = np.trunc(np.asarray(runs, dtype=float))
+
+    has_rhr, has_hrv, has_cals, has_runs = ~np.isnan(rhr), ~np.isnan(hrv), ~np.isnan(cals), ~np.isnan(runs)
+    rhr_band = np.select(
+        [rhr < 50, (rhr >= 50) & (rhr <= 60), (rhr >= 61) & (rhr <= 70), (rhr >= 71) & (rhr <= 80)],
+        [0, 1, 2, 3], default=4,
+    )
+    rhr_band = np.where(has_rhr, rhr_band, -1)
+    hrv_band = np.where(has_hrv, np.select([hrv >= 70, hrv >= 50], [0, 1], default=2), -1)
+
+    flags = {
+        "resting_hr_high": rhr_band == 4,
+        "hrv_low": hrv_band == 2,
+        "calories_low": has_cals & (cals < 10000),
+        "runs_low": has_runs & (runs < 3),
+    }
+    positives = (rhr_band == 1).astype(int) + (hrv_band == 0).astype(int) + (has_runs & (runs >= 3)).astype(int)
+    n_flags = sum(f.astype(int) for f in flags.values())
+    return {
+        "rhr_band": rhr_band,
+        "hrv_band": hrv_band,
+        "flags": flags,
+        "score": np.clip(70 + 5 * positives - 10 * n_flags, 0, 100),
+    }
@@ -0,0 +1,167 @@
+"""
+Incremental trends over daily metric samples
+
+A RollingAggregate holds the state for one (user, metric): the last 28 days of
+values, running sums for the current 7 days, the previous 7 days and the last
+28 days, and (for resting HR / HRV) an EWMA baseline. Each new sample updates
+it in O(1) - sliding the window touches at most one value per bucket per day -
+so trends are available without re-reading stored history. The state is a
+small JSON-serializable dict.
+"""
+
+import os
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+EWMA_METRICS = ("resting_hr", "hrv")
+EWMA_SPAN_DAYS = float(os.getenv("TRENDS_EWMA_SPAN_DAYS", "14"))
+WINDOW_DAYS = 28
+
+# Bucket -> (min age, max age) in days relative to the newest sample
+BUCKETS = {"last_7d": (0, 6), "prev_7d": (7, 13), "last_28d": (0, 27)}
+
+LABELS = {
+    "steps": "Steps",
+    "sleep_hours": "Sleep (h)",
+    "workouts": "Workouts",
+    "water_liters": "Water (L)",
+    "resting_hr": "Resting HR",
+    "hrv": "HRV",
+}
+
+class RollingAggregate:
+    """Rolling 7/28-day means, week-over-week delta and EWMA baseline for one metric"""
+
+    def __init__(self, metric: str, state: Optional[Dict[str, Any]] = None):
+        state = state or {}
+        self.metric = metric
+        self.as_of: Optional[date] = date.fromisoformat(state["as_of"]) if state.get("as_of") else None
+        self.window: Dict[date, float] = {date.fromisoformat(d): v for d, v in state.get("window", {}).items()}
+        self.sums: Dict[str, List[float]] = {b: list(state.get("sums", {}).get(b, [0.0, 0])) for b in BUCKETS}
+        self.ewma: Optional[float] = state.get("ewma")
+        self.ewma_before: Optional[float] = state.get("ewma_before")  # baseline before the newest day's sample
+        self.samples: int = state.get("samples", 0)
+
+    def _add(self, day: date, value: float, sign: int) -> None:
+        age = (self.as_of - day).days
+        for bucket, (lo, hi) in BUCKETS.items():
+            if lo <= age <= hi:
+                self.sums[bucket][0] += sign * value
+                self.sums[bucket][1] += sign
+
+    def _advance(self, day: date) -> None:
+        """Move the newest day forward, sliding values across bucket boundaries"""
+        if self.as_of is None or (day - self.as_of).days >= WINDOW_DAYS:
+            self.window.clear()
+            self.sums = {b: [0.0, 0] for b in BUCKETS}
+            self.as_of = day
+            return
+        while self.as_of < day:
+            for age, leaving, entering in ((6, "last_7d", "prev_7d"), (13, "prev_7d", None), (27, "last_28d", None)):
+                d = self.as_of - timedelta(days=age)
+                if d not in self.window:
+                    continue
+                v = self.window[d]
+                self.sums[leaving][0] -= v
+                self.sums[leaving][1] -= 1
+                if entering:
+                    self.sums[entering][0] += v
+                    self.sums[entering][1] += 1
+                if age == WINDOW_DAYS - 1:
+                    del self.window[d]
+            self.as_of += timedelta(days=1)
+
+    def _update_ewma(self, day: date, value: float, gap_days: int) -> None:
+        if self.metric not in EWMA_METRICS:
+            return
+        if gap_days == 0 and day in self.window:
+            # Correction of the newest day: re-apply from the baseline before it
+            base = self.ewma_before
+        else:
+            self.ewma_before = self.ewma
+            base = self.ewma
+        if base is None:
+            self.ewma = value
+            return
+        # Decay per elapsed day, so gaps weigh the new value more
+        alpha = 1 - (1 - 2 / (EWMA_SPAN_DAYS + 1)) ** max(1, gap_days)
+        self.ewma = base + alpha * (value - base)
+
+    def update(self, day: date, value: float) -> bool:
+        """Fold one daily sample in; returns False if it is older than the window"""
+        value = float(value)
+        if self.as_of is not None and (self.as_of - day).days >= WINDOW_DAYS:
+            return False
+        gap_days = (day - self.as_of).days if self.as_of is not None else 1
+        if self.as_of is None or gap_days > 0:
+            self._advance(day)
+        if gap_days >= 0:
+            self._update_ewma(day, value, gap_days)
+        old = self.window.get(day)
+        if old is not None:
+            self._add(day, old, -1)
+        else:
+            self.samples += 1
+        self.window[day] = value
+        self._add(day, value, +1)
+        return True
+
+    def _mean(self, bucket: str) -> Optional[float]:
+        total, n = self.sums[bucket]
+        return round(total / n, 2) if n else None
+
+    def snapshot(self) -> Dict[str, Any]:
+        mean_7d, prev_7d = self._mean("last_7d"), self._mean("prev_7d")
+        out = {
+            "as_of": self.as_of.isoformat() if self.as_of else None,
+            "mean_7d": mean_7d,
+            "mean_28d": self._mean("last_28d"),
+            "days_7d": int(self.sums["last_7d"][1]),
+            "days_28d": int(self.sums["last_28d"][1]),
+            "prev_7d_mean": prev_7d,
+            "wow_delta": round(mean_7d - prev_7d, 2) if mean_7d is not None and prev_7d is not None else None,
+        }
+        if self.metric in EWMA_METRICS and self.ewma is not None:
+            out["baseline"] = round(self.ewma, 2)
+            out["vs_baseline"] = round(mean_7d - self.ewma, 2) if mean_7d is not None else None
+        return out
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "as_of": self.as_of.isoformat() if self.as_of else None,
+            "window": {d.isoformat(): v for d, v in sorted(self.window.items())},
+            "sums": self.sums,
+            "ewma": self.ewma,
+            "ewma_before": self.ewma_before,
+            "samples": self.samples,
+        }
+
+def trend_lines(trends: Dict[str, Dict[str, Any]], today: Optional[date] = None) -> List[str]:
+    """
+    One human-readable line per metric, for reports and prompts
+
+    Windows end at each metric's newest sample, so a metric with no sample in the
+    last 7 days is labelled with its date, and one with none in the last 28 days
+    is left out rather than presented as current.
+    """
+    today = today or date.today()
+    lines = []
+    for metric, t in sorted(trends.items()):
+        if t.get("mean_7d") is None:
+            continue
+        as_of = date.fromisoformat(t["as_of"]) if t.get("as_of") else None
+        age_days = (today - as_of).days if as_of else 0
+        if age_days >= WINDOW_DAYS:
+            continue
+        label = LABELS.get(metric, metric)
+        if age_days >= 7:
+            label += f" (as of {as_of.isoformat()})"
+        line = f"{label}: 7-day avg {t['mean_7d']:g}"
+        if t.get("wow_delta") is not None:
+            line += f" ({t['wow_delta']:+g} vs previous week)"
+        if t.get("mean_28d") is not None:
+            line += f", 28-day avg {t['mean_28d']:g}"
+        if t.get("baseline") is not None:
+            line += f", baseline {t['baseline']:g}"
+        lines.append(line)
+    return lines
@@ -2,17 +2,312 @@
 LLM Provider Fallback System
 
 Handles automatic failover between different LLM providers when quota/credits are exhausted.
+Calls are hedged: if the current provider has not answered within its p95 latency,
+the next provider of equal or lower cost is started too and the first successful
+answer wins.
 """
 
 import os
+import json
+import asyncio
+import hashlib
 import logging
+import sqlite3
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from typing import Dict, Any, List, Optional
-from litellm import completion
+from litellm import completion, acompletion, RateLimitError
 import time
 
 # Configure logging to avoid the "Level 'PLAN' already exists" error
 logger = logging.getLogger(__name__)
 
+# Hedging / timeout settings
+#
+# Cost trade-off: a hedge pays for a second completion of the same prompt, and a
+# losing synchronous call cannot be cancelled (its thread runs to completion and
+# the provider bills it). Roughly, hedging at p95 duplicates ~5% of calls in steady
+# state, more when a provider slows down. To bound that, a provider is only hedged
+# once it has LLM_HEDGE_MIN_SAMPLES latency samples (no blind hedging on cold start
+# or rarely used providers), only onto providers with equal or lower cost_per_1k,
+# and synchronous calls stop hedging while LLM_MAX_SYNC_LOSERS losers still hold
+# worker threads. Set LLM_HEDGE=false to trade tail latency for zero extra spend.
+LLM_TIMEOUT_S = float(os.getenv("LLM_TIMEOUT_S", "30"))             # default per-provider timeout
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE", "true").lower() == "true"
+LLM_HEDGE_DELAY_S = float(os.getenv("LLM_HEDGE_DELAY_S", "3"))      # expected latency of providers without samples (ordering)
+LLM_HEDGE_MIN_DELAY_S = float(os.getenv("LLM_HEDGE_MIN_DELAY_S", "0.5"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))   # samples before a provider's p95 is trusted
+LLM_MAX_PARALLEL = int(os.getenv("LLM_MAX_PARALLEL", "16"))
+LLM_MAX_SYNC_LOSERS = int(os.getenv("LLM_MAX_SYNC_LOSERS", str(max(1, LLM_MAX_PARALLEL // 4))))
+LATENCY_SAMPLES = 100
+
+# Circuit breaker settings
+LLM_BREAKER_WINDOW = int(os.getenv("LLM_BREAKER_WINDOW", "20"))               # recent outcomes considered
+LLM_BREAKER_MIN_CALLS = int(os.getenv("LLM_BREAKER_MIN_CALLS", "5"))
+LLM_BREAKER_ERROR_RATE = float(os.getenv("LLM_BREAKER_ERROR_RATE", "0.5"))
+LLM_BREAKER_CONSECUTIVE = int(os.getenv("LLM_BREAKER_CONSECUTIVE", "3"))
+LLM_BREAKER_COOLDOWN_S = float(os.getenv("LLM_BREAKER_COOLDOWN_S", "30"))
+LLM_RATE_LIMIT_COOLDOWN_S = float(os.getenv("LLM_RATE_LIMIT_COOLDOWN_S", "20"))  # 429 rate limits
+LLM_QUOTA_COOLDOWN_S = float(os.getenv("LLM_QUOTA_COOLDOWN_S", "600"))       # 402 / exhausted credits
+LLM_PROVIDER_ORDER = os.getenv("LLM_PROVIDER_ORDER", "latency")              # "latency" or "config"
+LATENCY_EWMA_ALPHA = 0.3
+
+# Completion cache settings
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "true").lower() == "true"
+LLM_CACHE_TTL_HOURS = float(os.getenv("LLM_CACHE_TTL_HOURS", "24"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2000"))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(20 * 1024 * 1024)))
+LLM_CACHE_DB = os.getenv("LLM_CACHE_DB")                                      # unset = memory only
+LLM_CACHE_TEMPERATURE_STEP = float(os.getenv("LLM_CACHE_TEMPERATURE_STEP", "0.25"))
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker: closed -> open -> half_open -> closed
+
+    Opens when the error rate over the last `window` calls (or the run of consecutive
+    failures) is too high, or immediately with the given cool-down on rate-limit and
+    billing errors. After the cool-down one trial request is let through (half-open).
+    """
+    
+    def __init__(self, name: str, timeout: float):
+        self.name = name
+        self.timeout = timeout
+        self.state = "closed"
+        self.outcomes: deque = deque(maxlen=LLM_BREAKER_WINDOW)
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.cooldown = LLM_BREAKER_COOLDOWN_S
+        self.trial_started_at = 0.0
+        self.latency_ewma: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+    
+    def _refresh(self, now: float) -> None:
+        if self.state == "open" and now - self.opened_at >= self.cooldown:
+            self.state = "half_open"
+            self.trial_started_at = 0.0
+            logger.info(f"🟡 {self.name} circuit half-open, allowing a trial request")
+    
+    def allow_request(self) -> bool:
+        """True if a call may be made now (reserves the single half-open trial)"""
+        now = time.time()
+        with self._lock:
+            self._refresh(now)
+            if self.state == "closed":
+                return True
+            if self.state == "half_open":
+                # One trial at a time; a trial that never reported back expires after the timeout
+                if not self.trial_started_at or now - self.trial_started_at > self.timeout:
+                    self.trial_started_at = now
+                    return True
+            return False
+    
+    def is_available(self) -> bool:
+        """Non-reserving check used for ordering and status"""
+        with self._lock:
+            self._refresh(time.time())
+            return self.state != "open"
+    
+    def record_success(self, latency: float) -> None:
+        with self._lock:
+            self.outcomes.append(True)
+            self.consecutive_failures = 0
+            self.latency_ewma = latency if self.latency_ewma is None else (
+                LATENCY_EWMA_ALPHA * latency + (1 - LATENCY_EWMA_ALPHA) * self.latency_ewma)
+            if self.state != "closed":
+                logger.info(f"🟢 {self.name} circuit closed")
+            self.state = "closed"
+            self.cooldown = LLM_BREAKER_COOLDOWN_S
+    
+    def record_failure(self, error: str, cooldown: Optional[float] = None) -> None:
+        """`cooldown` opens the circuit straight away for that long (see classify_error)"""
+        with self._lock:
+            self.outcomes.append(False)
+            self.consecutive_failures += 1
+            self.last_error = error
+            failures = self.outcomes.count(False)
+            error_rate_high = len(self.outcomes) >= LLM_BREAKER_MIN_CALLS and failures / len(self.outcomes) >= LLM_BREAKER_ERROR_RATE
+            if cooldown is not None:
+                self._open(cooldown)
+            elif self.state == "half_open":
+                # Failed trial: back off harder
+                self._open(min(self.cooldown * 2, LLM_QUOTA_COOLDOWN_S))
+            elif error_rate_high or self.consecutive_failures >= LLM_BREAKER_CONSECUTIVE:
+                self._open(LLM_BREAKER_COOLDOWN_S)
+    
+    def _open(self, cooldown: float) -> None:
+        self.state = "open"
+        self.opened_at = time.time()
+        self.cooldown = cooldown
+        logger.warning(f"🔴 {self.name} circuit open for {cooldown:.0f}s: {self.last_error}")
+    
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refresh(time.time())
+            total = len(self.outcomes)
+            return {
+                "state": self.state,
+                "error_rate": round(self.outcomes.count(False) / total, 3) if total else 0.0,
+                "window_calls": total,
+                "consecutive_failures": self.consecutive_failures,
+                "retry_in_seconds": round(max(0.0, self.opened_at + self.cooldown - time.time()), 1) if self.state == "open" else 0.0,
+                "latency_ewma": round(self.latency_ewma, 3) if self.latency_ewma is not None else None,
+                "last_error": self.last_error,
+            }
+
+def classify_error(error: Exception) -> Optional[str]:
+    """
+    "billing", "rate_limit" or None (an ordinary failure) for a provider error
+
+    Goes by exception type and HTTP status only: messages such as "maximum context
+    length exceeded" or "insufficient permissions" are about the request, not the
+    provider's quota, and must not take the provider out of rotation.
+    """
+    status = getattr(error, "status_code", None)
+    if status == 402:
+        return "billing"
+    if isinstance(error, RateLimitError) or status == 429:
+        # OpenAI reports exhausted credits as a 429 with this error code
+        return "billing" if "insufficient_quota" in str(error) else "rate_limit"
+    return None
+
+ERROR_COOLDOWNS = {"billing": LLM_QUOTA_COOLDOWN_S, "rate_limit": LLM_RATE_LIMIT_COOLDOWN_S}
+
+class CompletionCache:
+    """
+    LRU + TTL cache of completion texts keyed on a prompt fingerprint
+
+    The key covers (model, system prompt, prompt, temperature bucket) plus any other
+    call parameters, so only calls that would be sent identically share an entry.
+    Entries remember the provider that produced them, which gives the cost saved
+    by each hit (`cost_per_1k` x tokens). Optional SQLite tier via `db_path`.
+    """
+
+    def __init__(self, ttl_hours: float = 24, max_entries: int = 2000,
+                 max_bytes: int = 20 * 1024 * 1024, db_path: Optional[str] = None):
+        self.cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        self.tokens_saved = 0
+        self.dollars_saved = 0.0
+        self._lock = threading.RLock()
+        self.db: Optional[sqlite3.Connection] = None
+        if db_path:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.db = sqlite3.connect(db_path, check_same_thread=False)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self.db.commit()
+
+    @staticmethod
+    def fingerprint(model: str, system_prompt: str, prompt: str, temperature: Optional[float],
+                    params: Optional[Dict[str, Any]] = None) -> str:
+        """Stable key; temperatures are bucketed (0.7 and 0.75 share a bucket at step 0.25)"""
+        bucket = None
+        if temperature is not None:
+            step = LLM_CACHE_TEMPERATURE_STEP
+            bucket = round(round(float(temperature) / step) * step, 4) if step > 0 else float(temperature)
+        payload = json.dumps([model, system_prompt, prompt, bucket, params or {}], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _insert(self, key: str, entry: Dict[str, Any]) -> None:
+        old = self.cache.pop(key, None)
+        if old:
+            self.bytes -= old["size"]
+        self.cache[key] = entry
+        self.bytes += entry["size"]
+        while self.cache and (len(self.cache) > self.max_entries or self.bytes > self.max_bytes):
+            _, evicted = self.cache.popitem(last=False)
+            self.bytes -= evicted["size"]
+            self.evictions += 1
+
+    def _expired(self, entry: Dict[str, Any]) -> bool:
+        return time.time() - entry["created_at"] > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached completion text, or None"""
+        with self._lock:
+            entry = self.cache.get(key)
+            if entry is not None and self._expired(entry):
+                self.bytes -= self.cache.pop(key)["size"]
+                entry = None
+            if entry is not None:
+                self.cache.move_to_end(key)
+            elif self.db:
+                row = self.db.execute("SELECT value FROM llm_cache WHERE key = ?", (key,)).fetchone()
+                if row:
+                    entry = json.loads(row[0])
+                    entry["size"] = len(row[0].encode("utf-8"))
+                    if self._expired(entry):
+                        self.db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                        self.db.commit()
+                        entry = None
+                    else:
+                        self.disk_hits += 1
+                        self._insert(key, entry)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.tokens_saved += entry["tokens"]
+            self.dollars_saved += entry["tokens"] / 1000.0 * entry["cost_per_1k"]
+            return entry["text"]
+
+    def set(self, key: str, text: str, provider: Dict[str, Any], tokens: int) -> None:
+        entry = {
+            "text": text,
+            "provider": provider["name"],
+            "tokens": tokens,
+            "cost_per_1k": provider.get("cost_per_1k", 0.0),
+            "created_at": time.time(),
+        }
+        value = json.dumps(entry)
+        entry["size"] = len(value.encode("utf-8"))
+        with self._lock:
+            self._insert(key, entry)
+            if self.db:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, created_at) VALUES (?, ?, ?)",
+                    (key, value, entry["created_at"]),
+                )
+                self.db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self.cache.clear()
+            self.bytes = 0
+            if self.db:
+                self.db.execute("DELETE FROM llm_cache")
+                self.db.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.cache),
+                "bytes": self.bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "disk_hits": self.disk_hits,
+                "evictions": self.evictions,
+                "tokens_saved": self.tokens_saved,
+                "dollars_saved": round(self.dollars_saved, 6),
+                "persistent": self.db is not None,
+            }
+
 class LLMFallback:
     """
     Handles automatic fallback between multiple LLM providers
@@ -22,6 +317,19 @@ class LLMFallback:
         self.providers = self._initialize_providers()
         self.current_provider_index = 0
         self.last_successful_provider = None
+        self.latencies: Dict[str, deque] = {p["name"]: deque(maxlen=LATENCY_SAMPLES) for p in self.providers}
+        self.hedged_calls = 0
+        self.breakers: Dict[str, CircuitBreaker] = {p["name"]: CircuitBreaker(p["name"], p["timeout"]) for p in self.providers}
+        # Worker threads for hedged synchronous calls (losers finish in the background)
+        self._executor = ThreadPoolExecutor(max_workers=LLM_MAX_PARALLEL, thread_name_prefix="llm")
+        self.sync_losers = 0  # losing sync calls still running in the pool
+        self._losers_lock = threading.Lock()
+        self.cache: Optional[CompletionCache] = CompletionCache(
+            ttl_hours=LLM_CACHE_TTL_HOURS,
+            max_entries=LLM_CACHE_MAX_ENTRIES,
+            max_bytes=LLM_CACHE_MAX_BYTES,
+            db_path=LLM_CACHE_DB,
+        ) if LLM_CACHE_ENABLED else None
         
     def _initialize_providers(self) -> List[Dict[str, Any]]:
         """Initialize available LLM providers based on environment variables"""
@@ -81,67 +389,266 @@ class LLMFallback:
                 "cost_per_1k": 0.0
             })
         
+        # Per-provider timeouts, e.g. LLM_TIMEOUT_OPENROUTER=20
+        for provider in providers:
+            provider["timeout"] = float(os.getenv(f"LLM_TIMEOUT_{provider['name'].upper()}", LLM_TIMEOUT_S))
+        
         logger.info(f"Initialized {len(providers)} LLM providers")
         return providers
     
+    def _call_params(self, provider: Dict[str, Any], messages: List[Dict], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        call_params = {
+            "model": provider["model"],
+            "messages": messages,
+            "api_key": provider["api_key"],
+            "timeout": provider["timeout"],
+            **kwargs
+        }
+        if provider["base_url"]:
+            call_params["base_url"] = provider["base_url"]
+        return call_params
+    
+    def _percentile(self, name: str, pct: float) -> Optional[float]:
+        samples = sorted(self.latencies.get(name, ()))
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(round(pct / 100.0 * (len(samples) - 1))))]
+    
+    def hedge_delay(self, provider: Dict[str, Any]) -> Optional[float]:
+        """
+        How long to wait on a provider before also starting another one (its p95 latency)
+
+        None until the provider has LLM_HEDGE_MIN_SAMPLES samples: it is not hedged then.
+        """
+        if len(self.latencies.get(provider["name"], ())) < LLM_HEDGE_MIN_SAMPLES:
+            return None
+        delay = self._percentile(provider["name"], 95)
+        return max(LLM_HEDGE_MIN_DELAY_S, min(delay, provider["timeout"]))
+    
+    def _hedge_after(self, current: Dict[str, Any], remaining: List[Dict[str, Any]]) -> Optional[float]:
+        """Seconds to wait on `current` before hedging, or None if it may not be hedged"""
+        if not LLM_HEDGE_ENABLED:
+            return None
+        cost = current.get("cost_per_1k", 0.0)
+        if not any(p.get("cost_per_1k", 0.0) <= cost for p in remaining):
+            return None
+        return self.hedge_delay(current)
+    
+    def _take_provider(self, remaining: List[Dict[str, Any]], max_cost: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Remove and return the next provider whose breaker lets the request through (at most max_cost)"""
+        for provider in list(remaining):
+            if max_cost is not None and provider.get("cost_per_1k", 0.0) > max_cost:
+                continue
+            remaining.remove(provider)
+            if self.breakers[provider["name"]].allow_request():
+                return provider
+        return None
+    
+    def _track_loser(self, future) -> None:
+        """Count a losing sync call until its thread is released"""
+        with self._losers_lock:
+            self.sync_losers += 1
+        
+        def release(_):
+            with self._losers_lock:
+                self.sync_losers -= 1
+        future.add_done_callback(release)
+    
+    def _ordered_providers(self) -> List[Dict[str, Any]]:
+        """
+        Providers whose circuit is not open, fastest (latency EWMA) first
+
+        Providers without latency data keep their configured position, using
+        LLM_HEDGE_DELAY_S as their expected latency.
+        """
+        available = [p for p in self.providers if self.breakers[p["name"]].is_available()]
+        if LLM_PROVIDER_ORDER == "latency":
+            def expected_latency(p):
+                ewma = self.breakers[p["name"]].latency_ewma
+                return ewma if ewma is not None else LLM_HEDGE_DELAY_S
+            available.sort(key=expected_latency)  # stable: ties keep config order
+        return available
+    
+    def _record_success(self, provider: Dict[str, Any], call_time: float) -> None:
+        self.last_successful_provider = provider["name"]
+        self.latencies.setdefault(provider["name"], deque(maxlen=LATENCY_SAMPLES)).append(call_time)
+        self.breakers[provider["name"]].record_success(call_time)
+        logger.info(f"✅ Success with {provider['name']} in {call_time:.2f}s")
+    
+    def _record_failure(self, provider: Dict[str, Any], error: Exception) -> None:
+        error_msg = str(error)
+        logger.warning(f"❌ Provider {provider['name']} failed: {error_msg}")
+        
+        # Rate-limit and billing errors take the provider out for a while; others count towards the error rate
+        kind = classify_error(error)
+        if kind:
+            logger.info(f"🔄 {provider['name']} {kind.replace('_', ' ')} error, trying next provider...")
+        self.breakers[provider["name"]].record_failure(error_msg, cooldown=ERROR_COOLDOWNS.get(kind))
+    
+    def _timed_completion(self, provider: Dict[str, Any], messages: List[Dict], kwargs: Dict[str, Any]):
+        start_time = time.time()
+        response = completion(**self._call_params(provider, messages, kwargs))
+        return response, time.time() - start_time
+    
+    async def _atimed_completion(self, provider: Dict[str, Any], messages: List[Dict], kwargs: Dict[str, Any]):
+        start_time = time.time()
+        response = await asyncio.wait_for(
+            acompletion(**self._call_params(provider, messages, kwargs)),
+            timeout=kwargs.get("timeout", provider["timeout"])
+        )
+        return response, time.time() - start_time
+    
     def call_with_fallback(self, messages: List[Dict], **kwargs) -> Optional[Dict[str, Any]]:
+        """Call LLM with automatic provider fallback"""
+        return self._hedged_call(messages, kwargs)[0]
+    
+    async def acall_with_fallback(self, messages: List[Dict], **kwargs) -> Optional[Dict[str, Any]]:
+        """Async version of call_with_fallback with hedged requests"""
+        return (await self._ahedged_call(messages, kwargs))[0]
+    
+    def _hedged_call(self, messages: List[Dict], kwargs: Dict[str, Any]):
         """
-        Call LLM with automatic provider fallback
+        Returns (response, provider) from the first provider to succeed
         
-        Tries providers in order until one succeeds
+        Starts with the first provider; a failure moves on to the next one immediately,
+        and a provider that is slower than its p95 gets a provider of equal or lower cost
+        started alongside it. The first successful response wins. Losers cannot be
+        cancelled once running, so no hedge is started while LLM_MAX_SYNC_LOSERS of
+        them still hold worker threads.
         """
         if not self.providers:
             raise Exception("No LLM providers configured")
         
+        remaining = self._ordered_providers()
+        futures: Dict[Any, Dict[str, Any]] = {}
+        current = None
         last_error = None
         
-        # Try each provider
-        for i, provider in enumerate(self.providers):
-            try:
-                logger.info(f"Trying provider {provider['name']} (model: {provider['model']})")
-                
-                # Prepare call parameters
-                call_params = {
-                    "model": provider["model"],
-                    "messages": messages,
-                    "api_key": provider["api_key"],
-                    **kwargs
-                }
-                
-                if provider["base_url"]:
-                    call_params["base_url"] = provider["base_url"]
-                
-                # Make the call
-                start_time = time.time()
-                response = completion(**call_params)
-                call_time = time.time() - start_time
-                
-                # Success! 
-                self.last_successful_provider = provider["name"]
-                logger.info(f"✅ Success with {provider['name']} in {call_time:.2f}s")
-                
-                return response
-                
-            except Exception as e:
-                error_msg = str(e)
-                logger.warning(f"❌ Provider {provider['name']} failed: {error_msg}")
-                last_error = e
-                
-                # Check for specific quota/credit errors
-                if any(keyword in error_msg.lower() for keyword in [
-                    "quota", "rate limit", "insufficient", "credits", "billing", "exceeded"
-                ]):
-                    logger.info(f"🔄 {provider['name']} quota exhausted, trying next provider...")
-                    continue
-                    
-                # For other errors, try next provider after short delay
-                time.sleep(1)
+        def launch(max_cost: Optional[float] = None) -> bool:
+            """Start the next provider whose breaker lets the request through"""
+            nonlocal current
+            provider = self._take_provider(remaining, max_cost)
+            if provider is None:
+                return False
+            current = provider
+            logger.info(f"Trying provider {current['name']} (model: {current['model']})")
+            futures[self._executor.submit(self._timed_completion, current, messages, kwargs)] = current
+            return True
+        
+        if not launch():
+            raise Exception("All LLM providers unavailable (circuits open)")
+        while futures:
+            hedge_after = self._hedge_after(current, remaining) if self.sync_losers < LLM_MAX_SYNC_LOSERS else None
+            done, _ = wait(list(futures), timeout=hedge_after, return_when=FIRST_COMPLETED)
+            if not done:
+                if launch(max_cost=current.get("cost_per_1k", 0.0)):
+                    self.hedged_calls += 1
+                    logger.info(f"⏱️ Previous provider slower than its p95, hedging with {current['name']}")
                 continue
+            for future in done:
+                provider = futures.pop(future)
+                try:
+                    response, call_time = future.result()
+                except Exception as e:
+                    self._record_failure(provider, e)
+                    last_error = e
+                    continue
+                # Success! Not-yet-started losers are cancelled, running ones are counted until they finish
+                for other in futures:
+                    if not other.cancel():
+                        self._track_loser(other)
+                self._record_success(provider, call_time)
+                return response, provider
+            # A failure with nothing else in flight: move on to the next provider without waiting
+            if not futures:
+                launch()
+            else:
+                current = list(futures.values())[-1]
         
         # All providers failed
         logger.error("❌ All LLM providers failed!")
         raise Exception(f"All LLM providers failed. Last error: {last_error}")
     
+    async def _ahedged_call(self, messages: List[Dict], kwargs: Dict[str, Any]):
+        """
+        Async version of _hedged_call
+        
+        Losing in-flight requests are cancelled once one provider succeeds.
+        """
+        if not self.providers:
+            raise Exception("No LLM providers configured")
+        
+        remaining = self._ordered_providers()
+        tasks: Dict[asyncio.Task, Dict[str, Any]] = {}
+        current = None
+        last_error = None
+        
+        def launch(max_cost: Optional[float] = None) -> bool:
+            """Start the next provider whose breaker lets the request through"""
+            nonlocal current
+            provider = self._take_provider(remaining, max_cost)
+            if provider is None:
+                return False
+            current = provider
+            logger.info(f"Trying provider {current['name']} (model: {current['model']})")
+            tasks[asyncio.create_task(self._atimed_completion(current, messages, kwargs))] = current
+            return True
+        
+        if not launch():
+            raise Exception("All LLM providers unavailable (circuits open)")
+        try:
+            while tasks:
+                done, _ = await asyncio.wait(list(tasks), timeout=self._hedge_after(current, remaining),
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    if launch(max_cost=current.get("cost_per_1k", 0.0)):
+                        self.hedged_calls += 1
+                        logger.info(f"⏱️ Previous provider slower than its p95, hedging with {current['name']}")
+                    continue
+                for task in done:
+                    provider = tasks.pop(task)
+                    try:
+                        response, call_time = task.result()
+                    except Exception as e:
+                        self._record_failure(provider, e)
+                        last_error = e
+                        continue
+                    self._record_success(provider, call_time)
+                    return response, provider
+                if not tasks:
+                    launch()
+                else:
+                    current = list(tasks.values())[-1]
+        finally:
+            # Cancel the losers (and everything, if the caller was cancelled)
+            for task in tasks:
+                task.cancel()
+        
+        logger.error("❌ All LLM providers failed!")
+        raise Exception(f"All LLM providers failed. Last error: {last_error}")
+    
+    def _cache_key(self, prompt: str, system_prompt: str, kwargs: Dict[str, Any]) -> Optional[str]:
+        """Fingerprint for the completion cache (None when caching is off or bypassed)"""
+        use_cache = kwargs.pop("cache", True)
+        if not self.cache or not use_cache:
+            return None
+        params = {k: v for k, v in kwargs.items() if k not in ("temperature", "timeout", "model")}
+        # Without an explicit model any configured provider may answer, so the chain is the "model"
+        model = kwargs.get("model") or ",".join(p["model"] for p in self.providers)
+        return CompletionCache.fingerprint(model, system_prompt, prompt, kwargs.get("temperature"), params)
+    
+    def _store(self, key: Optional[str], response: Any, provider: Dict[str, Any], messages: List[Dict]) -> str:
+        """Extract the text and remember it along with what it cost to produce"""
+        text = response["choices"][0]["message"]["content"]
+        if key and text:
+            try:
+                tokens = int(response["usage"]["total_tokens"])
+            except (KeyError, TypeError, ValueError):
+                # Rough estimate: ~4 characters per token
+                tokens = (sum(len(m["content"]) for m in messages) + len(text)) // 4
+            self.cache.set(key, text, provider, tokens)
+        return text
+    
     def simple_completion(self, prompt: str, system_prompt: str = "", **kwargs) -> str:
         """
         Simple text completion with fallback
@@ -153,9 +660,33 @@ class LLMFallback:
             messages.append({"role": "system", "content": system_prompt})
         messages.append({"role": "user", "content": prompt})
         
+        key = self._cache_key(prompt, system_prompt, kwargs)
+        cached = self.cache.get(key) if key else None
+        if cached is not None:
+            return cached
+        
         try:
-            response = self.call_with_fallback(messages, **kwargs)
-            return response["choices"][0]["message"]["content"]
+            response, provider = self._hedged_call(messages, kwargs)
+            return self._store(key, response, provider, messages)
+        except Exception as e:
+            logger.error(f"Simple completion failed: {e}")
+            return f"Error: LLM completion failed - {str(e)}"
+    
+    async def asimple_completion(self, prompt: str, system_prompt: str = "", **kwargs) -> str:
+        """Async simple text completion with hedged fallback"""
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+        
+        key = self._cache_key(prompt, system_prompt, kwargs)
+        cached = self.cache.get(key) if key else None
+        if cached is not None:
+            return cached
+        
+        try:
+            response, provider = await self._ahedged_call(messages, kwargs)
+            return self._store(key, response, provider, messages)
         except Exception as e:
             logger.error(f"Simple completion failed: {e}")
             return f"Error: LLM completion failed - {str(e)}"
@@ -166,7 +697,23 @@ class LLMFallback:
             "providers_configured": len(self.providers),
             "provider_names": [p["name"] for p in self.providers],
             "last_successful": self.last_successful_provider,
-            "current_provider": self.providers[self.current_provider_index]["name"] if self.providers else None
+            "current_provider": self.providers[self.current_provider_index]["name"] if self.providers else None,
+            "hedging_enabled": LLM_HEDGE_ENABLED,
+            "hedged_calls": self.hedged_calls,
+            "sync_losers_in_flight": self.sync_losers,
+            "cache": self.cache.get_stats() if self.cache else {"enabled": False},
+            "provider_order": [p["name"] for p in self._ordered_providers()],
+            "providers": {
+                p["name"]: {
+                    "timeout": p["timeout"],
+                    "hedge_delay": round(self.hedge_delay(p), 3) if self.hedge_delay(p) is not None else None,
+                    "latency_p50": self._percentile(p["name"], 50),
+                    "latency_p95": self._percentile(p["name"], 95),
+                    "latency_p99": self._percentile(p["name"], 99),
+                    "breaker": self.breakers[p["name"]].get_status(),
+                }
+                for p in self.providers
+            }
         }
 
 # Global instance for easy access
@@ -177,6 +724,10 @@ def call_llm_with_fallback(prompt: str, system_prompt: str = "", **kwargs) -> st
     """Global function for easy LLM calling with fallback"""
     return fallback_llm.simple_completion(prompt, system_prompt, **kwargs)
 
+async def acall_llm_with_fallback(prompt: str, system_prompt: str = "", **kwargs) -> str:
+    """Async global function for LLM calling with hedged fallback"""
+    return await fallback_llm.asimple_completion(prompt, system_prompt, **kwargs)
+
 def get_fallback_status() -> Dict[str, Any]:
     """Get fallback system status"""
     return fallback_llm.get_status()
@@ -1,22 +1,63 @@
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse, JSONResponse, Response
+from fastapi.encoders import jsonable_encoder
 from fastapi import FastAPI, HTTPException, Header, Depends, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from typing import Dict, Any, Optional, List
-from datetime import datetime
-import httpx, os, logging, json
+from datetime import date, datetime, timedelta
+from contextlib import asynccontextmanager
+import httpx, os, logging, json, asyncio, base64, hashlib
+import numpy as np
+from health_scoring import columns, weekly_averages, recovery_assessment
+from health_trends import RollingAggregate, trend_lines
+from upstream_clients import upstream_clients
+from upstream_health import UpstreamHealthMonitor
+from single_flight import SingleFlight
+from cache_manager import canonicalize_query
 
 # ----------------- App setup -----------------
 log = logging.getLogger("health")
-app = FastAPI(title="Health Tracker")
-app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
 
-# Serve a lightweight UI if you have static/index.html
-
-ROMA_BASE = os.getenv("ROMA_URL", "http://roma:5000") + "/api/simple"
+ROMA_URL = os.getenv("ROMA_URL", "http://roma:5000")
+ROMA_BASE = ROMA_URL + "/api/simple"
 SEARCH_SERVICE_URL = os.getenv("SEARCH_SERVICE_URL", "http://search:5001")  # NEW
 
+# Research fan-out for /weekly-report: total deadline, parallel searches, expected per-query time
+RESEARCH_BUDGET_S = float(os.getenv("RESEARCH_BUDGET_S", "20"))
+RESEARCH_CONCURRENCY = int(os.getenv("RESEARCH_CONCURRENCY", "4"))
+RESEARCH_QUERY_EST_S = float(os.getenv("RESEARCH_QUERY_EST_S", "10"))
+WEEKLY_BATCH_MAX_USERS = int(os.getenv("WEEKLY_BATCH_MAX_USERS", "5000"))
+WEEKLY_BATCH_CHUNK = int(os.getenv("WEEKLY_BATCH_CHUNK", "100"))            # users computed, saved and streamed per step
+METRICS_INGEST_MAX_SAMPLES = int(os.getenv("METRICS_INGEST_MAX_SAMPLES", "50000"))
+REPORTS_MAX_PAGE = int(os.getenv("REPORTS_MAX_PAGE", "1000"))
+
+# Pooled keep-alive clients, one per upstream (limits overridable via ROMA_*/SEARCH_* env)
+upstream_clients.register("roma", ROMA_URL, timeout=30, max_connections=50, max_keepalive=20)
+upstream_clients.register("search", SEARCH_SERVICE_URL, timeout=30, max_connections=50, max_keepalive=20)
+
+# Cached liveness per upstream; handlers read it without I/O (probes registered below)
+health_monitor = UpstreamHealthMonitor(
+    interval=float(os.getenv("UPSTREAM_PROBE_INTERVAL_S", "10")),
+    ttl=float(os.getenv("UPSTREAM_HEALTH_TTL_S", "30")),
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await upstream_clients.start()
+    await health_monitor.start()
+    try:
+        yield
+    finally:
+        await health_monitor.stop()
+        await upstream_clients.aclose()
+
+app = FastAPI(title="Health Tracker", lifespan=lifespan)
+app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"],
+                   expose_headers=["ETag", "X-Next-Cursor"])
+
+# Serve a lightweight UI if you have static/index.html
+
 # Optional API key (protect /health and /reports, and you can enable for others)
 API_KEY = os.getenv("API_KEY", "")  # set in .env to activate protection
 
@@ -26,8 +67,10 @@ def require_api_key(x_api_key: str = Header(default=None, alias="X-API-Key")):
     return True
 
 # ----------------- DB (SQLite via SQLAlchemy) -----------------
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime
+from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Date, Float, Index, select, func, and_, or_
 from sqlalchemy.orm import sessionmaker, declarative_base, Session
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 DB_URL = os.getenv("DB_URL", "sqlite:///./health.db")
 engine = create_engine(DB_URL, connect_args={"check_same_thread": False} if DB_URL.startswith("sqlite") else {})
@@ -42,8 +85,37 @@ class ReportDB(Base):
     input_json = Column(Text, nullable=True)            # raw input
     output_text = Column(Text, nullable=True)           # narrative/text
     metrics_json = Column(Text, nullable=True)          # computed metrics JSON
+    __table_args__ = (
+        # Keyset pagination: newest-first listing, optionally per kind
+        Index("ix_reports_created_id", "created_at", "id"),
+        Index("ix_reports_kind_created_id", "kind", "created_at", "id"),
+    )
+
+class MetricSampleDB(Base):
+    """One value per (user, metric, day), e.g. ("u1", "hrv", 2025-01-06, 58.0)"""
+    __tablename__ = "metric_samples"
+    user_id = Column(String(100), primary_key=True)
+    metric = Column(String(50), primary_key=True)       # "steps", "sleep_hours", "hrv", "resting_hr", ...
+    day = Column(Date, primary_key=True)
+    week_start = Column(Date, nullable=False)           # Monday of `day`, stored so weekly GROUP BY stays in the index
+    value = Column(Float, nullable=False)
+    __table_args__ = (
+        # Covering: trend and weekly queries are range scans that never touch the table
+        Index("ix_metric_samples_covering", "user_id", "metric", "day", "week_start", "value"),
+    )
+
+class MetricRollupDB(Base):
+    """Incremental trend state per (user, metric), see health_trends.RollingAggregate"""
+    __tablename__ = "metric_rollups"
+    user_id = Column(String(100), primary_key=True)
+    metric = Column(String(50), primary_key=True)
+    state_json = Column(Text, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 Base.metadata.create_all(bind=engine)
+# create_all skips tables that already exist; add indexes introduced since
+for _index in ReportDB.__table__.indexes:
+    _index.create(bind=engine, checkfirst=True)
 
 def get_db():
     db: Session = SessionLocal()
@@ -55,10 +127,27 @@ def get_db():
 # ----------------- Schemas -----------------
 class HealthData(BaseModel):
     data: Dict[str, Any]
+    user_id: Optional[str] = None                       # adds stored trends (see /metrics) to the report
+
+class BatchUser(BaseModel):
+    user_id: Optional[str] = None
+    data: Dict[str, Any]
+
+class WeeklyBatch(BaseModel):
+    users: List[BatchUser]
+
+class DailySample(BaseModel):
+    day: date
+    values: Dict[str, float]                            # metric -> value for that day
+
+class MetricSamplesIn(BaseModel):
+    user_id: str
+    samples: List[DailySample]
 
 class ChatMessage(BaseModel):
     message: str
     save: Optional[bool] = False  # save chat as a report?
+    user_id: Optional[str] = None  # adds stored trends to the coaching prompt
 
 class ResearchRequest(BaseModel):  # NEW
     query: str
@@ -77,125 +166,182 @@ async def _roma_analysis(data: Dict[str, Any], desc: str, goal: Optional[str] =
     if goal:
         payload["goal"] = goal
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
-            r = await client.post(f"{ROMA_BASE}/analysis", json=payload)
-            if r.status_code == 200:
-                js = r.json()
-                if isinstance(js, dict):
-                    out = js.get("final_output") or js.get("analysis") or js.get("summary")
-                    if isinstance(out, str) and not _bad(out):
-                        return out
-                    if out and not isinstance(out, str):
-                        return str(out)
+        r = await upstream_clients.get("roma").post(f"{ROMA_BASE}/analysis", json=payload)
+        _report_call("roma", r)
+        if r.status_code == 200:
+            js = r.json()
+            if isinstance(js, dict):
+                out = js.get("final_output") or js.get("analysis") or js.get("summary")
+                if isinstance(out, str) and not _bad(out):
+                    return out
+                if out and not isinstance(out, str):
+                    return str(out)
     except Exception as e:
+        health_monitor.mark_failure("roma", str(e))
         log.debug(f"/analysis failed: {e}")
     return None
 
 async def _roma_execute(goal: str) -> Optional[str]:
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
-            r = await client.post(f"{ROMA_BASE}/execute", json={"goal": goal})
-            if r.status_code == 200:
-                js = r.json()
-                out = js.get("final_output")
-                if isinstance(out, str) and not _bad(out):
-                    return out
+        r = await upstream_clients.get("roma").post(f"{ROMA_BASE}/execute", json={"goal": goal})
+        _report_call("roma", r)
+        if r.status_code == 200:
+            js = r.json()
+            out = js.get("final_output")
+            if isinstance(out, str) and not _bad(out):
+                return out
     except Exception as e:
+        health_monitor.mark_failure("roma", str(e))
         log.debug(f"/execute failed: {e}")
     return None
 
 # ----------------- NEW: Search Service Helpers -----------------
+# Bursts of the same (canonicalized) question collapse to one upstream call
+search_flight = SingleFlight("search")
+
 async def _search_health_info(query: str, deep_mode: bool = False) -> Optional[Dict[str, Any]]:
     """
     Call the OpenDeepSearch microservice for health research
     """
+    key = f"{canonicalize_query(query)}:{deep_mode}"
+    return await search_flight.do(key, lambda: _fetch_health_info(query, deep_mode))
+
+async def _fetch_health_info(query: str, deep_mode: bool) -> Optional[Dict[str, Any]]:
     try:
-        async with httpx.AsyncClient(timeout=60 if deep_mode else 30) as client:
-            r = await client.post(
-                f"{SEARCH_SERVICE_URL}/search",
-                json={"query": query, "deep_mode": deep_mode}
-            )
-            if r.status_code == 200:
-                return r.json()
-            else:
-                log.warning(f"Search service returned {r.status_code}")
-                return None
+        r = await upstream_clients.get("search").post(
+            f"{SEARCH_SERVICE_URL}/search",
+            json={"query": query, "deep_mode": deep_mode},
+            timeout=60 if deep_mode else 30
+        )
+        _report_call("search", r)
+        if r.status_code == 200:
+            return r.json()
+        else:
+            log.warning(f"Search service returned {r.status_code}")
+            return None
     except Exception as e:
+        health_monitor.mark_failure("search", str(e))
         log.error(f"Search service error: {e}")
         return None
 
 async def _check_search_service() -> bool:
-    """Check if search service is available"""
+    """Probe the search service (used by the health monitor, not on the request path)"""
     try:
-        async with httpx.AsyncClient(timeout=5) as client:
-            r = await client.get(f"{SEARCH_SERVICE_URL}/health")
-            return r.status_code == 200 and r.json().get("initialized", False)
+        r = await upstream_clients.get("search").get(f"{SEARCH_SERVICE_URL}/health", timeout=5)
+        return r.status_code == 200 and r.json().get("initialized", False)
     except:
         return False
 
+async def _check_roma_service() -> bool:
+    """Probe ROMA liveness via its /health route (/api/simple/status would call the LLM)"""
+    try:
+        r = await upstream_clients.get("roma").get(f"{ROMA_URL}/health", timeout=5)
+        return r.status_code == 200
+    except Exception:
+        return False
+
+health_monitor.register("search", _check_search_service)
+health_monitor.register("roma", _check_roma_service)
+
+def _report_call(upstream: str, r: httpx.Response) -> None:
+    """Passive health detection from a real call's response (a 504 deadline is slow, not down)"""
+    if r.status_code >= 500 and r.status_code != 504:
+        health_monitor.mark_failure(upstream, f"HTTP {r.status_code}")
+    else:
+        health_monitor.mark_success(upstream)
+
+def _research_topic_limit(budget_s: float = RESEARCH_BUDGET_S) -> int:
+    """How many topics fit in the budget: parallel slots x sequential rounds per slot"""
+    rounds = max(1, int(budget_s // max(RESEARCH_QUERY_EST_S, 0.1)))
+    return max(1, RESEARCH_CONCURRENCY * rounds)
+
+async def _research_fanout(queries: List[str], budget_s: float = RESEARCH_BUDGET_S) -> List[Dict[str, Any]]:
+    """
+    Run searches concurrently (bounded by RESEARCH_CONCURRENCY) under one total deadline.
+    Returns insights for whatever finished in time, in the original query order.
+    """
+    queries = queries[:_research_topic_limit(budget_s)]
+    if not queries:
+        return []
+    sem = asyncio.Semaphore(max(1, RESEARCH_CONCURRENCY))
+
+    async def one(query: str) -> Optional[Dict[str, Any]]:
+        async with sem:
+            log.info(f"Researching for weekly report: {query}")
+            return await _search_health_info(query, deep_mode=False)
+
+    tasks = [asyncio.create_task(one(q)) for q in queries]
+    done, pending = await asyncio.wait(tasks, timeout=budget_s)
+    for t in pending:
+        t.cancel()
+    if pending:
+        log.warning(f"Research budget {budget_s}s exhausted, returning {len(done)}/{len(tasks)} topics")
+
+    insights = []
+    for query, t in zip(queries, tasks):
+        if t not in done or t.cancelled() or t.exception():
+            continue
+        search_result = t.result()
+        if search_result and search_result.get("result"):
+            insights.append({"topic": query, "insight": search_result["result"]})
+    return insights
+
 # ----------------- Local analysis helpers -----------------
+RHR_INSIGHTS = [
+    "Very low resting HR; could be athletic or bradycardia—interpret in context.",
+    "Excellent resting HR (well-trained range).",
+    "Good resting HR.",
+    "Slightly elevated resting HR—watch stress, sleep, hydration.",
+    "High resting HR—consider recovery, hydration, or check with a clinician if persistent.",
+]
+HRV_INSIGHTS = [
+    "HRV looks strong—good recovery signal.",
+    "HRV is moderate—keep sleep and stress in check.",
+    "Low HRV—prioritize sleep, light activity, and hydration.",
+]
+RECOVERY_FIELDS = ["resting_hr", "hrv", "calories", "runs"]
+
 def analyze_health_locally(d: dict) -> dict:
     """Return structured insights for typical metrics."""
     out = {"insights": [], "flags": [], "summary": {}}
+    cols = columns([d], RECOVERY_FIELDS, default=np.nan)
+    assessment = recovery_assessment(*(cols[f] for f in RECOVERY_FIELDS))
+    flags = {name: bool(v[0]) for name, v in assessment["flags"].items()}
 
     # Resting heart rate (rHR)
-    rhr = d.get("resting_hr")
-    if isinstance(rhr, (int, float)):
-        if rhr < 50:
-            out["insights"].append("Very low resting HR; could be athletic or bradycardia—interpret in context.")
-        elif 50 <= rhr <= 60:
-            out["insights"].append("Excellent resting HR (well-trained range).")
-        elif 61 <= rhr <= 70:
-            out["insights"].append("Good resting HR.")
-        elif 71 <= rhr <= 80:
-            out["insights"].append("Slightly elevated resting HR—watch stress, sleep, hydration.")
-        else:
-            out["insights"].append("High resting HR—consider recovery, hydration, or check with a clinician if persistent.")
+    rhr_band = int(assessment["rhr_band"][0])
+    if rhr_band >= 0:
+        out["insights"].append(RHR_INSIGHTS[rhr_band])
+        if flags["resting_hr_high"]:
             out["flags"].append("resting_hr_high")
-        out["summary"]["resting_hr"] = rhr
+        out["summary"]["resting_hr"] = d.get("resting_hr")
 
     # HRV
-    hrv = d.get("hrv")
-    if isinstance(hrv, (int, float)):
-        if hrv >= 70:
-            out["insights"].append("HRV looks strong—good recovery signal.")
-        elif 50 <= hrv < 70:
-            out["insights"].append("HRV is moderate—keep sleep and stress in check.")
-        else:
-            out["insights"].append("Low HRV—prioritize sleep, light activity, and hydration.")
+    hrv_band = int(assessment["hrv_band"][0])
+    if hrv_band >= 0:
+        out["insights"].append(HRV_INSIGHTS[hrv_band])
+        if flags["hrv_low"]:
             out["flags"].append("hrv_low")
-        out["summary"]["hrv"] = hrv
+        out["summary"]["hrv"] = d.get("hrv")
 
     # Calories
-    cals = d.get("calories")
-    if isinstance(cals, (int, float)):
-        out["summary"]["calories_week"] = cals
-        if cals < 10000:
+    if not np.isnan(cols["calories"][0]):
+        out["summary"]["calories_week"] = d.get("calories")
+        if flags["calories_low"]:
             out["insights"].append("Weekly calorie burn seems low—more daily movement or longer sessions could help.")
             out["flags"].append("calories_low")
 
     # Runs
-    runs = d.get("runs")
-    if isinstance(runs, (int, float)):
-        runs = int(runs)
-        out["summary"]["runs"] = runs
-        if runs >= 3:
-            out["insights"].append("Great running frequency—maintain 1 easy + 1 quality + 1 long structure.")
-        else:
+    if not np.isnan(cols["runs"][0]):
+        out["summary"]["runs"] = int(cols["runs"][0])
+        if flags["runs_low"]:
             out["insights"].append("Consider aiming for 3 runs/week (easy, quality, long).")
             out["flags"].append("runs_low")
+        else:
+            out["insights"].append("Great running frequency—maintain 1 easy + 1 quality + 1 long structure.")
 
     # Score: reward positives, penalize flags
-    positives = 0
-    if isinstance(rhr, (int, float)) and 50 <= rhr <= 60:
-        positives += 1
-    if isinstance(hrv, (int, float)) and hrv >= 70:
-        positives += 1
-    if isinstance(runs, int) and runs >= 3:
-        positives += 1
-    score = 70 + 5 * positives - 10 * len(out["flags"])
-    score = max(0, min(100, score))
-    out["score"] = score
+    out["score"] = int(assessment["score"][0])
 
     # Recommendations: fill to 3 unique lines
     recs = []
@@ -257,38 +403,41 @@ def _fallback_weekly(data: Dict[str, Any]) -> str:
 # ----------------- Endpoints -----------------
 @app.get("/health", dependencies=[Depends(require_api_key)] if API_KEY else None)
 async def health():
-    try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            r = await client.get(f"{ROMA_BASE}/status")
-            roma_ok = r.status_code == 200
-    except Exception:
-        roma_ok = False
-    
-    # NEW: Check search service
-    search_ok = await _check_search_service()
-    
+    # Cached by the background monitor; no upstream round-trips here
     return {
         "status": "healthy",
-        "roma_available": roma_ok,
-        "search_available": search_ok,  # NEW
+        "roma_available": health_monitor.is_available("roma"),
+        "search_available": health_monitor.is_available("search"),  # NEW
+        "upstreams": health_monitor.get_status(),
         "timestamp": datetime.utcnow().isoformat()
     }
 
-@app.post("/weekly-report")
-async def weekly_report(request: HealthData, save: bool = Query(False), db: Session = Depends(get_db)):
-    d = request.data
-    
-    # Calculate metrics first
-    metrics = {
-        "daily_steps_avg": round(d.get("steps", 0)/7, 0) if d.get("steps") else 0,
-        "daily_sleep_avg": round(d.get("sleep_hours", 0)/7, 1) if d.get("sleep_hours") else 0.0,
-        "workouts": int(d.get("workouts", 0) or 0),
-        "water_liters": float(d.get("water_liters", 0) or 0.0),
-        "resting_hr": d.get("resting_hr"),
-        "hrv": d.get("hrv")
-    }
-    
-    # Identify areas needing research
+WEEKLY_FIELDS = ["steps", "sleep_hours", "workouts", "water_liters"]
+
+def _weekly_metrics(d: Dict[str, Any]) -> Dict[str, Any]:
+    return _weekly_metrics_batch([d])[0]
+
+def _weekly_metrics_batch(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Weekly metrics for many users at once, vectorized over the metric columns"""
+    if not rows:
+        return []
+    cols = columns(rows, WEEKLY_FIELDS)
+    avgs = weekly_averages(cols["steps"], cols["sleep_hours"])
+    workouts = np.trunc(cols["workouts"]).astype(int)
+    return [
+        {
+            "daily_steps_avg": float(avgs["daily_steps_avg"][i]),
+            "daily_sleep_avg": float(avgs["daily_sleep_avg"][i]),
+            "workouts": int(workouts[i]),
+            "water_liters": float(cols["water_liters"][i]),
+            "resting_hr": r.get("resting_hr"),
+            "hrv": r.get("hrv")
+        }
+        for i, r in enumerate(rows)
+    ]
+
+def _research_queries(metrics: Dict[str, Any]) -> List[str]:
+    """Identify areas needing research"""
     research_queries = []
     
     if metrics["daily_sleep_avg"] < 7:
@@ -305,19 +454,9 @@ async def weekly_report(request: HealthData, save: bool = Query(False), db: Sess
     
     if metrics["water_liters"] < 14:
         research_queries.append("daily water intake recommendations")
-    
-    # Fetch research for identified areas
-    research_insights = []
-    if research_queries and await _check_search_service():
-        for query in research_queries[:2]:  # Limit to 2 queries
-            log.info(f"Researching for weekly report: {query}")
-            search_result = await _search_health_info(query, deep_mode=False)
-            if search_result and search_result.get("result"):
-                research_insights.append({
-                    "topic": query,
-                    "insight": search_result["result"]
-                })
-    
+    return research_queries
+
+def _weekly_text(metrics: Dict[str, Any], research_insights: List[Dict[str, Any]]) -> str:
     # Build report directly without ROMA confusion
     text = f"""## Weekly Health Summary
 
@@ -326,7 +465,6 @@ async def weekly_report(request: HealthData, save: bool = Query(False), db: Sess
 - Daily Sleep: {metrics['daily_sleep_avg']:.1f} hours (Target: 7-9h)
 - Workouts: {metrics['workouts']} sessions this week
 - Water Intake: {metrics['water_liters']:.1f}L total"""
-    
     if metrics['resting_hr']:
         text += f"\n- Resting Heart Rate: {metrics['resting_hr']} bpm"
     if metrics['hrv']:
@@ -356,6 +494,11 @@ async def weekly_report(request: HealthData, save: bool = Query(False), db: Sess
         assessments.append("⚠ Low workout frequency - aim for 3-5 sessions weekly")
     
     text += "\n".join(assessments)
+
+    # Trends from stored daily history (only when the report is for a known user)
+    lines = trend_lines(metrics.get("trends") or {})
+    if lines:
+        text += "\n\n**Trends:**\n" + "\n".join(f"- {line}" for line in lines)
     
     # Add research insights
     if research_insights:
@@ -396,20 +539,43 @@ async def weekly_report(request: HealthData, save: bool = Query(False), db: Sess
         recs.append(generic[len(recs) % len(generic)])
     
     text += "\n".join(recs[:3])
+    return text
+
+def _weekly_record(d: Dict[str, Any], text: str, metrics: Dict[str, Any],
+                   research_insights: List[Dict[str, Any]]) -> ReportDB:
+    # Include research insights in saved report
+    metrics_with_research = metrics.copy()
+    if research_insights:
+        metrics_with_research["research_insights"] = research_insights
+    return ReportDB(
+        kind="weekly",
+        input_json=json.dumps(d),
+        output_text=text,
+        metrics_json=json.dumps(metrics_with_research)
+    )
+
+@app.post("/weekly-report")
+async def weekly_report(request: HealthData, save: bool = Query(False), db: Session = Depends(get_db)):
+    d = request.data
+    
+    # Calculate metrics first
+    metrics = _weekly_metrics(d)
+    if request.user_id:
+        metrics["trends"] = _user_trends(db, [request.user_id]).get(request.user_id, {})
+    research_queries = _research_queries(metrics)
+    
+    # Fetch research for identified areas
+    research_insights = []
+    if research_queries and health_monitor.is_available("search"):
+        # Concurrent fan-out; topic count and wait are bounded by RESEARCH_BUDGET_S
+        research_insights = await _research_fanout(research_queries)
+    
+    text = _weekly_text(metrics, research_insights)
     
     # Save report
     report_id = None
     if save:
-        metrics_with_research = metrics.copy()
-        if research_insights:
-            metrics_with_research["research_insights"] = research_insights
-        
-        rec = ReportDB(
-            kind="weekly",
-            input_json=json.dumps(d),
-            output_text=text,
-            metrics_json=json.dumps(metrics_with_research)
-        )
+        rec = _weekly_record(d, text, metrics, research_insights)
         db.add(rec)
         db.commit()
         db.refresh(rec)
@@ -424,33 +590,71 @@ async def weekly_report(request: HealthData, save: bool = Query(False), db: Sess
         "research_used": len(research_insights) > 0,
         "research_topics": [item["topic"] for item in research_insights]
     }
-    report_id = None
-    if save:
-        # Include research insights in saved report
-        metrics_with_research = metrics.copy()
-        if research_insights:
-            metrics_with_research["research_insights"] = research_insights
-        
-        rec = ReportDB(
-            kind="weekly",
-            input_json=json.dumps(d),
-            output_text=text,
-            metrics_json=json.dumps(metrics_with_research)
-        )
-        db.add(rec)
-        db.commit()
-        db.refresh(rec)
-        report_id = rec.id
 
-    return {
-        "status": "success", 
-        "report": text, 
-        "metrics": metrics, 
-        "data_analyzed": d, 
-        "report_id": report_id,
-        "research_used": len(research_insights) > 0,
-        "research_topics": [item["topic"] for item in research_insights]
-    }
+@app.post("/weekly-report/batch")
+async def weekly_report_batch(request: WeeklyBatch, save: bool = Query(False)):
+    """
+    Weekly reports for many users in one call, streamed back as NDJSON (one line per user).
+
+    Users are processed WEEKLY_BATCH_CHUNK at a time and each chunk's lines are sent
+    as soon as it is done, so only one chunk's reports are held in memory. Within a
+    chunk metrics are computed column-wise and saved reports go in with one commit;
+    each distinct research topic is searched once for the whole batch.
+    """
+    users = request.users
+    if len(users) > WEEKLY_BATCH_MAX_USERS:
+        raise HTTPException(413, f"At most {WEEKLY_BATCH_MAX_USERS} users per batch")
+
+    async def lines():
+        insight_by_topic: Dict[str, Optional[Dict[str, Any]]] = {}
+        db = SessionLocal()
+        try:
+            for start in range(0, len(users), WEEKLY_BATCH_CHUNK):
+                chunk = users[start:start + WEEKLY_BATCH_CHUNK]
+                rows = [u.data for u in chunk]
+                all_metrics = _weekly_metrics_batch(rows)
+                trends = _user_trends(db, [u.user_id for u in chunk if u.user_id])
+                for user, metrics in zip(chunk, all_metrics):
+                    if user.user_id:
+                        metrics["trends"] = trends.get(user.user_id, {})
+                queries_per_user = [_research_queries(m) for m in all_metrics]
+
+                # Research topics not already searched for an earlier chunk
+                new_queries = [q for q in dict.fromkeys(q for qs in queries_per_user for q in qs) if q not in insight_by_topic]
+                if new_queries and health_monitor.is_available("search"):
+                    insight_by_topic.update(dict.fromkeys(new_queries))
+                    for item in await _research_fanout(new_queries):
+                        insight_by_topic[item["topic"]] = item
+
+                reports = []
+                for d, metrics, queries in zip(rows, all_metrics, queries_per_user):
+                    research_insights = [insight_by_topic[q] for q in queries if insight_by_topic.get(q)]
+                    reports.append((d, metrics, research_insights, _weekly_text(metrics, research_insights)))
+
+                # One bulk insert per chunk; flush assigns ids without a refresh per row
+                report_ids: List[Optional[int]] = [None] * len(reports)
+                if save and reports:
+                    recs = [_weekly_record(d, text, metrics, insights) for d, metrics, insights, text in reports]
+                    db.add_all(recs)
+                    db.flush()
+                    report_ids = [rec.id for rec in recs]
+                    db.commit()
+
+                for offset, (user, (d, metrics, research_insights, text)) in enumerate(zip(chunk, reports)):
+                    yield json.dumps({
+                        "index": start + offset,
+                        "user_id": user.user_id,
+                        "status": "success",
+                        "report": text,
+                        "metrics": metrics,
+                        "report_id": report_ids[offset],
+                        "research_used": len(research_insights) > 0,
+                        "research_topics": [item["topic"] for item in research_insights]
+                    }) + "\n"
+        finally:
+            db.close()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 
 @app.post("/analyze")
 async def analyze(request: HealthData, save: bool = Query(False), db: Session = Depends(get_db)):
@@ -475,36 +679,96 @@ async def analyze(request: HealthData, save: bool = Query(False), db: Session =
     return {"status": "success", "analysis": text if isinstance(text, str) else str(text), "report_id": report_id}
 
 # -------- /chat (AI coaching with optional research) --------
-@app.post("/chat")
-async def chat(msg: ChatMessage, save: bool = Query(False), db: Session = Depends(get_db)):
-    # Enhanced health keyword detection
-    health_keywords = [
-        "what is", "what causes", "why do", "how to", "benefits of",
-        "symptoms", "treatment", "causes of", "advice for", "best way",
-        "guidelines", "research", "studies", "heart rate", "hrv",
-        "resting hr", "blood pressure", "fatigue", "sleep", "recovery",
-        "what does", "mean", "normal", "should i", "is it", "signs of",
-        "overtraining", "my resting", "my hrv"
-    ]
-    
-    message_lower = msg.message.lower()
-    needs_research = any(keyword in message_lower for keyword in health_keywords)
-    
-    research_context = ""
-    if needs_research and await _check_search_service():
-        log.info(f"Triggering research for: {msg.message}")
-        search_result = await _search_health_info(msg.message, deep_mode=False)
+# Enhanced health keyword detection
+HEALTH_KEYWORDS = [
+    "what is", "what causes", "why do", "how to", "benefits of",
+    "symptoms", "treatment", "causes of", "advice for", "best way",
+    "guidelines", "research", "studies", "heart rate", "hrv",
+    "resting hr", "blood pressure", "fatigue", "sleep", "recovery",
+    "what does", "mean", "normal", "should i", "is it", "signs of",
+    "overtraining", "my resting", "my hrv"
+]
+CHAT_FALLBACK_REPLY = "I'm here to help. Can you clarify your health goal (sleep, steps, workouts, or recovery)?"
+
+async def _chat_research(message: str) -> Optional[str]:
+    """Search result text for health questions, if the search service is up"""
+    message_lower = message.lower()
+    needs_research = any(keyword in message_lower for keyword in HEALTH_KEYWORDS)
+    if needs_research and health_monitor.is_available("search"):
+        log.info(f"Triggering research for: {message}")
+        search_result = await _search_health_info(message, deep_mode=False)
         if search_result and search_result.get("result"):
-            research_context = f"\n\nBased on current medical information:\n{search_result['result']}\n"
-    
-    prompt = (
+            return search_result["result"]
+    return None
+
+def _chat_prompt(message: str, research: Optional[str], trends: Optional[List[str]] = None) -> str:
+    research_context = f"\n\nBased on current medical information:\n{research}\n" if research else ""
+    trends_context = "\n\nUser's recent trends:\n" + "\n".join(f"- {t}" for t in trends) + "\n" if trends else ""
+    return (
         "You are a supportive, knowledgeable health coach. Provide helpful, "
         "evidence-based advice in 2-4 clear sentences. "
         f"{research_context}"
-        f"User question: {msg.message}"
+        f"{trends_context}"
+        f"User question: {message}"
     )
-    out = await _roma_execute(prompt)
-    reply = out or "I'm here to help. Can you clarify your health goal (sleep, steps, workouts, or recovery)?"
+
+def _chat_trends(db: Session, user_id: Optional[str]) -> List[str]:
+    return trend_lines(_user_trends(db, [user_id]).get(user_id, {})) if user_id else []
+
+def _sse(event: str, data: Any) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _snippets(text: str, limit: int = 5) -> List[str]:
+    """Split research text into paragraph-sized snippets for streaming"""
+    parts = [p.strip() for p in text.split("\n\n") if p.strip()]
+    return parts[:limit] if parts else [text]
+
+class StreamInterrupted(Exception):
+    """An upstream stream broke after some of its chunks were already passed on"""
+
+async def _roma_execute_stream(goal: str):
+    """
+    Yield reply chunks from ROMA's streaming execute endpoint as they arrive.
+    Falls back to the blocking endpoint if streaming is unavailable; raises
+    StreamInterrupted if the stream breaks (or ends without [DONE]) mid-reply.
+    """
+    streamed = False
+    completed = False
+    try:
+        async with upstream_clients.get("roma").stream(
+            "POST", f"{ROMA_BASE}/execute/stream", json={"goal": goal}, timeout=60
+        ) as r:
+            _report_call("roma", r)
+            if r.status_code == 200:
+                async for line in r.aiter_lines():
+                    if not line.startswith("data: "):
+                        continue
+                    chunk = line[len("data: "):]
+                    if chunk == "[DONE]":
+                        completed = True
+                        break
+                    token = json.loads(chunk).get("token")
+                    if token:
+                        streamed = True
+                        yield token
+    except Exception as e:
+        if not streamed:
+            health_monitor.mark_failure("roma", str(e))
+        log.debug(f"/execute/stream failed: {e}")
+    if streamed and not completed:
+        raise StreamInterrupted("ROMA stream ended before [DONE]")
+    if not streamed:
+        out = await _roma_execute(goal)
+        if out:
+            yield out
+
+@app.post("/chat")
+async def chat(msg: ChatMessage, save: bool = Query(False), db: Session = Depends(get_db)):
+    research = await _chat_research(msg.message)
+    research_context = research or ""
+    out = await _roma_execute(_chat_prompt(msg.message, research, _chat_trends(db, msg.user_id)))
+    reply = out or CHAT_FALLBACK_REPLY
 
     report_id = None
     if save or msg.save:
@@ -513,7 +777,62 @@ async def chat(msg: ChatMessage, save: bool = Query(False), db: Session = Depend
 
     return {"status": "success", "reply": reply, "research_used": bool(research_context), "report_id": report_id}
 
+@app.post("/chat/stream")
+async def chat_stream(msg: ChatMessage, save: bool = Query(False)):
+    """
+    Streaming /chat (server-sent events): `research` snippets first, then the
+    coaching reply as `token` events, then `done` with the full reply.
+
+    If the upstream stream breaks mid-reply (or the reply is unusable), a `reset`
+    event tells the client to discard the tokens so far before the fallback reply.
+    """
+    async def events():
+        yield _sse("status", {"stage": "researching"})
+        research = await _chat_research(msg.message)
+        if research:
+            for snippet in _snippets(research):
+                yield _sse("research", {"snippet": snippet})
+
+        yield _sse("status", {"stage": "coaching"})
+        trends: List[str] = []
+        if msg.user_id:
+            db = SessionLocal()
+            try:
+                trends = _chat_trends(db, msg.user_id)
+            finally:
+                db.close()
+        parts = []
+        interrupted = False
+        try:
+            async for token in _roma_execute_stream(_chat_prompt(msg.message, research, trends)):
+                parts.append(token)
+                yield _sse("token", {"text": token})
+        except StreamInterrupted as e:
+            log.warning(f"/chat/stream: {e}")
+            interrupted = True
+        reply = "".join(parts).strip()
+        if interrupted or _bad(reply):
+            if parts:
+                yield _sse("reset", {"reason": "upstream stream interrupted" if interrupted else "unusable reply"})
+            reply = CHAT_FALLBACK_REPLY
+            yield _sse("token", {"text": reply})
+
+        report_id = None
+        if save or msg.save:
+            db = SessionLocal()
+            try:
+                rec = ReportDB(kind="chat", input_json=json.dumps({"message": msg.message}), output_text=reply, metrics_json=None)
+                db.add(rec); db.commit(); db.refresh(rec); report_id = rec.id
+            finally:
+                db.close()
+
+        yield _sse("done", {"status": "success", "reply": reply, "research_used": bool(research), "report_id": report_id})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 # -------- NEW: /research endpoint --------
+RESEARCH_DISCLAIMER = "⚠️ This information is for educational purposes only. Always consult a qualified healthcare professional for medical advice."
+
 @app.post("/research")
 async def research_health_topic(request: ResearchRequest, db: Session = Depends(get_db)):
     """
@@ -524,7 +843,7 @@ async def research_health_topic(request: ResearchRequest, db: Session = Depends(
     - save: Save the research as a report
     """
     # Check if search service is available
-    if not await _check_search_service():
+    if not health_monitor.is_available("search"):
         raise HTTPException(
             status_code=503,
             detail="Search service is not available. Please ensure the search microservice is running."
@@ -560,18 +879,64 @@ async def research_health_topic(request: ResearchRequest, db: Session = Depends(
         "research": result_text,
         "mode": search_result.get("mode", "unknown"),
         "report_id": report_id,
-        "disclaimer": "⚠️ This information is for educational purposes only. Always consult a qualified healthcare professional for medical advice."
+        "disclaimer": RESEARCH_DISCLAIMER
     }
 
+@app.post("/research/stream")
+async def research_health_topic_stream(request: ResearchRequest):
+    """
+    Streaming /research (server-sent events): a `status` event right away,
+    then the result as `research` snippets, then `done`
+    """
+    if not health_monitor.is_available("search"):
+        raise HTTPException(
+            status_code=503,
+            detail="Search service is not available. Please ensure the search microservice is running."
+        )
+
+    async def events():
+        yield _sse("status", {"stage": "searching", "query": request.query, "deep_mode": request.deep_mode})
+        search_result = await _search_health_info(request.query, request.deep_mode)
+        if not search_result:
+            yield _sse("error", {"status": "error", "detail": "Failed to retrieve search results. Please try again."})
+            return
+
+        result_text = search_result.get("result", "No results found.")
+        for snippet in _snippets(result_text, limit=50):
+            yield _sse("research", {"snippet": snippet})
+
+        report_id = None
+        if request.save:
+            db = SessionLocal()
+            try:
+                rec = ReportDB(
+                    kind="research",
+                    input_json=json.dumps({"query": request.query, "deep_mode": request.deep_mode}),
+                    output_text=result_text,
+                    metrics_json=json.dumps({"mode": search_result.get("mode", "unknown")})
+                )
+                db.add(rec); db.commit(); db.refresh(rec); report_id = rec.id
+            finally:
+                db.close()
+
+        yield _sse("done", {
+            "status": "success",
+            "query": request.query,
+            "mode": search_result.get("mode", "unknown"),
+            "report_id": report_id,
+            "disclaimer": RESEARCH_DISCLAIMER
+        })
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 # -------- NEW: /search-info endpoint --------
 @app.get("/search-info")
 async def search_service_info():
     """Get information about the search service capabilities"""
     try:
-        async with httpx.AsyncClient(timeout=5) as client:
-            r = await client.get(f"{SEARCH_SERVICE_URL}/info")
-            if r.status_code == 200:
-                return r.json()
+        r = await upstream_clients.get("search").get(f"{SEARCH_SERVICE_URL}/info", timeout=5)
+        if r.status_code == 200:
+            return r.json()
     except Exception as e:
         log.error(f"Failed to get search service info: {e}")
     
@@ -596,6 +961,28 @@ class ReportOut(BaseModel):
     output_text: Optional[str]
     metrics: Optional[Dict[str, Any]]
 
+class ReportFieldsOut(BaseModel):
+    """A /reports list item: only the fields requested with `fields=` are present"""
+    id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    kind: Optional[str] = None
+    input: Optional[Dict[str, Any]] = None
+    output_text: Optional[str] = None
+    metrics: Optional[Dict[str, Any]] = None
+
+REPORTS_LIST_RESPONSES = {
+    200: {
+        "model": List[ReportFieldsOut],
+        "description": "Reports, newest first, projected to the requested fields",
+        "headers": {
+            "X-Next-Cursor": {"description": "Pass as `cursor` for the next page; absent on the last page",
+                              "schema": {"type": "string"}},
+            "ETag": {"description": "Weak validator of this page", "schema": {"type": "string"}},
+        },
+    },
+    304: {"description": "Page unchanged since the If-None-Match ETag"},
+}
+
 def _to_out(rec: ReportDB) -> ReportOut:
     return ReportOut(
         id=rec.id,
@@ -606,13 +993,80 @@ def _to_out(rec: ReportDB) -> ReportOut:
         metrics=json.loads(rec.metrics_json) if rec.metrics_json else None,
     )
 
-@app.get("/reports", response_model=List[ReportOut], dependencies=[Depends(require_api_key)] if API_KEY else None)
-def list_reports(limit: int = 20, offset: int = 0, kind: Optional[str] = None, db: Session = Depends(get_db)):
-    q = db.query(ReportDB).order_by(ReportDB.created_at.desc())
+# Output field -> column; "input"/"metrics" are JSON-decoded, unrequested columns are never loaded
+REPORT_FIELDS = {
+    "id": ReportDB.id,
+    "created_at": ReportDB.created_at,
+    "kind": ReportDB.kind,
+    "input": ReportDB.input_json,
+    "output_text": ReportDB.output_text,
+    "metrics": ReportDB.metrics_json,
+}
+REPORT_JSON_FIELDS = {"input", "metrics"}
+
+def _report_fields(fields: Optional[str]) -> List[str]:
+    if not fields:
+        return list(REPORT_FIELDS)
+    names = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [n for n in names if n not in REPORT_FIELDS]
+    if unknown:
+        raise HTTPException(400, f"Unknown fields: {', '.join(unknown)} (allowed: {', '.join(REPORT_FIELDS)})")
+    return names
+
+def _encode_cursor(created_at: datetime, report_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{report_id}".encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, report_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(report_id)
+    except ValueError:
+        raise HTTPException(400, "Invalid cursor")
+
+@app.get("/reports", response_model=None, responses=REPORTS_LIST_RESPONSES,
+         dependencies=[Depends(require_api_key)] if API_KEY else None)
+def list_reports(limit: int = Query(20, ge=1, le=REPORTS_MAX_PAGE), offset: int = 0, kind: Optional[str] = None,
+                 cursor: Optional[str] = None, fields: Optional[str] = None,
+                 if_none_match: Optional[str] = Header(default=None), db: Session = Depends(get_db)):
+    """
+    Reports, newest first.
+
+    - cursor: continue after the previous page (from its X-Next-Cursor header); preferred over offset
+    - fields: comma-separated subset of the report fields, e.g. `fields=id,kind,created_at`
+    - sends a weak ETag and answers 304 to a matching If-None-Match
+    """
+    names = _report_fields(fields)
+    # id and created_at are always read: they make the cursor and the ETag
+    selected = list(dict.fromkeys(["id", "created_at", *names]))
+    q = select(*[REPORT_FIELDS[n].label(n) for n in selected]).order_by(ReportDB.created_at.desc(), ReportDB.id.desc())
     if kind:
-        q = q.filter(ReportDB.kind == kind)
-    rows = q.offset(offset).limit(limit).all()
-    return [_to_out(r) for r in rows]
+        q = q.where(ReportDB.kind == kind)
+    if cursor:
+        created_at, report_id = _decode_cursor(cursor)
+        q = q.where(or_(ReportDB.created_at < created_at,
+                        and_(ReportDB.created_at == created_at, ReportDB.id < report_id)))
+    elif offset:
+        q = q.offset(offset)
+    rows = db.execute(q.limit(limit)).all()
+
+    headers = {}
+    if len(rows) == limit:
+        headers["X-Next-Cursor"] = _encode_cursor(rows[-1].created_at, rows[-1].id)
+    # Reports are never modified in place, so the page's ids and the projection identify its body
+    page_key = json.dumps([names, [(r.id, r.created_at.isoformat()) for r in rows]])
+    headers["ETag"] = f'W/"{hashlib.sha1(page_key.encode()).hexdigest()}"'
+    if if_none_match and headers["ETag"] in [t.strip() for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    items = []
+    for r in rows:
+        m = r._mapping
+        items.append({
+            n: (json.loads(m[n]) if m[n] else None) if n in REPORT_JSON_FIELDS else m[n]
+            for n in names
+        })
+    return JSONResponse(jsonable_encoder(items), headers=headers)
 
 @app.get("/reports/{report_id}", response_model=ReportOut, dependencies=[Depends(require_api_key)] if API_KEY else None)
 def get_report(report_id: int, db: Session = Depends(get_db)):
@@ -638,6 +1092,140 @@ def delete_report(report_id: int, db: Session = Depends(get_db)):
     db.delete(rec); db.commit()
     return {"status": "deleted", "id": report_id}
 
+# -------- /metrics (daily time series, protected) --------
+def _week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+def _upsert_samples(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """Insert or overwrite samples in one executemany (last value for a day wins)"""
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        insert = sqlite_insert if dialect == "sqlite" else pg_insert
+        stmt = insert(MetricSampleDB)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "metric", "day"],
+            set_={"value": stmt.excluded.value},
+        )
+        db.execute(stmt, rows)
+    else:
+        for row in rows:
+            db.merge(MetricSampleDB(**row))
+
+def _weekly_aggregates(db: Session, user_id: str, metrics: Optional[List[str]], since: date) -> List[Dict[str, Any]]:
+    """
+    Per-(metric, week) aggregates, plus week-over-week change and a 4-week rolling
+    mean via window functions; one index range scan from `since`
+    """
+    s = MetricSampleDB
+    filters = [s.user_id == user_id, s.day >= since]
+    if metrics:
+        filters.append(s.metric.in_(metrics))
+    weekly = (
+        select(
+            s.metric,
+            s.week_start,
+            func.count().label("days"),
+            func.sum(s.value).label("total"),
+            func.avg(s.value).label("mean"),
+            func.min(s.value).label("min"),
+            func.max(s.value).label("max"),
+        )
+        .where(*filters)
+        .group_by(s.metric, s.week_start)
+        .subquery()
+    )
+    by_metric = {"partition_by": weekly.c.metric, "order_by": weekly.c.week_start}
+    q = select(
+        weekly,
+        (weekly.c.mean - func.lag(weekly.c.mean).over(**by_metric)).label("mean_change"),
+        func.avg(weekly.c.mean).over(rows=(-3, 0), **by_metric).label("rolling_4w_mean"),
+    ).order_by(weekly.c.metric, weekly.c.week_start)
+    return [dict(row._mapping) for row in db.execute(q)]
+
+def _update_rollups(db: Session, user_id: str, rows: List[Dict[str, Any]]) -> None:
+    """
+    Fold new samples into each metric's trend state (O(1) per sample, no history scan)
+
+    Read-modify-write under a row lock: missing rows are created with INSERT ... ON
+    CONFLICT DO NOTHING (so concurrent first inserts cannot collide), then read
+    with SELECT ... FOR UPDATE. SQLite has no row locks, but the inserts already
+    hold its database write lock until commit, which serializes the same way.
+    """
+    metrics = sorted({row["metric"] for row in rows})
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        insert = sqlite_insert if dialect == "sqlite" else pg_insert
+        stmt = insert(MetricRollupDB).on_conflict_do_nothing(index_elements=["user_id", "metric"])
+        db.execute(stmt, [{"user_id": user_id, "metric": m, "state_json": "{}"} for m in metrics])
+    recs = {r.metric: r for r in db.execute(
+        select(MetricRollupDB)
+        .where(MetricRollupDB.user_id == user_id, MetricRollupDB.metric.in_(metrics))
+        .order_by(MetricRollupDB.metric)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    ).scalars()}
+    aggs = {m: RollingAggregate(m, json.loads(recs[m].state_json) if m in recs else None) for m in metrics}
+    for row in sorted(rows, key=lambda r: r["day"]):
+        aggs[row["metric"]].update(row["day"], row["value"])
+    for metric, agg in aggs.items():
+        rec = recs.get(metric)
+        if rec is None:
+            rec = MetricRollupDB(user_id=user_id, metric=metric)
+            db.add(rec)
+        rec.state_json = json.dumps(agg.to_state())
+
+def _user_trends(db: Session, user_ids: List[str]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """user_id -> metric -> trend snapshot, read from the rollups in one query"""
+    out: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    if not user_ids:
+        return out
+    for rec in db.query(MetricRollupDB).filter(MetricRollupDB.user_id.in_(set(user_ids))):
+        out.setdefault(rec.user_id, {})[rec.metric] = RollingAggregate(rec.metric, json.loads(rec.state_json)).snapshot()
+    return out
+
+@app.post("/metrics/samples", dependencies=[Depends(require_api_key)] if API_KEY else None)
+def ingest_samples(body: MetricSamplesIn, db: Session = Depends(get_db)):
+    rows: Dict[tuple, Dict[str, Any]] = {}
+    for sample in body.samples:
+        for metric, value in sample.values.items():
+            rows[(metric, sample.day)] = {
+                "user_id": body.user_id, "metric": metric, "day": sample.day,
+                "week_start": _week_start(sample.day), "value": value,
+            }
+    if len(rows) > METRICS_INGEST_MAX_SAMPLES:
+        raise HTTPException(413, f"At most {METRICS_INGEST_MAX_SAMPLES} metric values per request")
+    if rows:
+        _upsert_samples(db, list(rows.values()))
+        _update_rollups(db, body.user_id, list(rows.values()))
+        db.commit()
+    return {"status": "ok", "user_id": body.user_id, "stored": len(rows)}
+
+@app.get("/metrics/{user_id}/trends", dependencies=[Depends(require_api_key)] if API_KEY else None)
+def user_trends(user_id: str, db: Session = Depends(get_db)):
+    """Rolling 7/28-day means, week-over-week deltas and rHR/HRV baselines, as of each metric's newest sample"""
+    trends = _user_trends(db, [user_id]).get(user_id, {})
+    return {"user_id": user_id, "trends": trends, "summary": trend_lines(trends)}
+
+@app.get("/metrics/{user_id}/daily", dependencies=[Depends(require_api_key)] if API_KEY else None)
+def daily_series(user_id: str, metric: str, days: int = Query(84, ge=1, le=3660), db: Session = Depends(get_db)):
+    since = datetime.utcnow().date() - timedelta(days=days - 1)
+    s = MetricSampleDB
+    q = (select(s.day, s.value)
+         .where(s.user_id == user_id, s.metric == metric, s.day >= since)
+         .order_by(s.day))
+    return {"user_id": user_id, "metric": metric,
+            "series": [{"day": day, "value": value} for day, value in db.execute(q)]}
+
+@app.get("/metrics/{user_id}/weekly", dependencies=[Depends(require_api_key)] if API_KEY else None)
+def weekly_series(user_id: str, metric: Optional[List[str]] = Query(None), weeks: int = Query(12, ge=1, le=520),
+                  db: Session = Depends(get_db)):
+    """Last `weeks` calendar weeks (Monday-based, current week included) per metric"""
+    since = _week_start(datetime.utcnow().date()) - timedelta(weeks=weeks - 1)
+    out: Dict[str, List[Dict[str, Any]]] = {}
+    for row in _weekly_aggregates(db, user_id, metric, since):
+        out.setdefault(row.pop("metric"), []).append(row)
+    return {"user_id": user_id, "since": since, "metrics": out}
+
 # Serve frontend
 @app.get("/")
 async def read_root():
@@ -1,6 +1,6 @@
 from __future__ import annotations
 from typing import Any, Dict, List
-import statistics
+from health_scoring import target_scores
 
 def _weekly_summary(raw: Dict[str, Any]) -> Dict[str, Any]:
     steps = raw.get("steps", 0)
@@ -33,30 +33,11 @@ class MetricsAnalysisExecutor:
         norm = task.get("normalized") or task.get("data")
         if not norm:
             raise ValueError("No normalized data provided to metrics executor.")
-        steps = norm["steps"]
-        sleep = norm["sleep_hours"]
-        workouts = norm["workouts"]
-        water = norm["water_liters"]
-
-        step_target = 70000.0    # ~10k/day
-        sleep_target = 56.0      # 8h/day
-        workout_target = 4.0     # 4/week
-        water_target = 14.0      # 2L/day
-
-        step_score = min(100, int((steps / step_target) * 100)) if step_target else 0
-        sleep_score = min(100, int((sleep / sleep_target) * 100)) if sleep_target else 0
-        workout_score = min(100, int((workouts / workout_target) * 100)) if workout_target else 0
-        hydration_score = min(100, int((water / water_target) * 100)) if water_target else 0
-        total = int(statistics.mean([step_score, sleep_score, workout_score, hydration_score]))
+        # Targets: ~10k steps/day, 8h sleep/day, 4 workouts/week, 2L water/day
+        scores = target_scores(norm["steps"], norm["sleep_hours"], norm["workouts"], norm["water_liters"])
 
         return {
-            "scores": {
-                "steps": step_score,
-                "sleep": sleep_score,
-                "workouts": workout_score,
-                "hydration": hydration_score,
-                "overall": total,
-            },
+            "scores": {name: int(v) for name, v in scores.items()},
             "normalized": norm,
         }
 
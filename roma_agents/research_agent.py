@@ -2,10 +2,39 @@
 import requests
 import os
 import logging
+import threading
 from typing import Dict, Any
+from upstream_health import UpstreamHealthMonitor
+from roma_engine.deadline import DeadlineExceeded, timeout_for
 
 logger = logging.getLogger(__name__)
 
+# One monitor (and probe thread) per search service URL, shared by every ResearchAgent in the process
+_search_monitors: Dict[str, UpstreamHealthMonitor] = {}
+_search_monitors_lock = threading.Lock()
+
+def search_health_monitor(search_service_url: str) -> UpstreamHealthMonitor:
+    """Process-wide liveness monitor for the search service at this URL (started on first use)"""
+    with _search_monitors_lock:
+        monitor = _search_monitors.get(search_service_url)
+        if monitor is None:
+            monitor = UpstreamHealthMonitor(
+                interval=float(os.getenv("UPSTREAM_PROBE_INTERVAL_S", "10")),
+                ttl=float(os.getenv("UPSTREAM_HEALTH_TTL_S", "30")),
+            )
+            monitor.register("search", lambda: _probe_search_service(search_service_url))
+            monitor.start_thread()
+            _search_monitors[search_service_url] = monitor
+        return monitor
+
+def _probe_search_service(search_service_url: str) -> bool:
+    """Hit the search service /health endpoint (background thread only)"""
+    try:
+        response = requests.get(f"{search_service_url}/health", timeout=5)
+        return response.status_code == 200 and response.json().get("initialized", False)
+    except:
+        return False
+
 class ResearchAgent:
     """
     Health Research Agent that uses OpenDeepSearch microservice
@@ -15,14 +44,12 @@ class ResearchAgent:
     def __init__(self):
         self.search_service_url = os.getenv("SEARCH_SERVICE_URL", "http://search:5001")
         self.name = "ResearchAgent"
-        
+        # Liveness is probed in the background; search() only reads the cached flag
+        self.health = search_health_monitor(self.search_service_url)
+    
     def is_service_available(self) -> bool:
-        """Check if search service is available"""
-        try:
-            response = requests.get(f"{self.search_service_url}/health", timeout=5)
-            return response.status_code == 200 and response.json().get("initialized", False)
-        except:
-            return False
+        """Check if search service is available (cached, no I/O)"""
+        return self.health.is_available("search")
     
     def search(self, query: str, deep_mode: bool = False) -> Dict[str, Any]:
         """
@@ -35,6 +62,8 @@ class ResearchAgent:
         Returns:
             Dict with search results
         """
+        default_timeout = 30 if not deep_mode else 60
+        timeout = default_timeout
         try:
             if not self.is_service_available():
                 logger.warning("Search service not available, returning fallback")
@@ -44,12 +73,19 @@ class ResearchAgent:
                     "fallback": True
                 }
             
+            # Capped by the remaining request budget when called inside ROMARunner
+            timeout = timeout_for(default_timeout)
             response = requests.post(
                 f"{self.search_service_url}/search",
                 json={"query": query, "deep_mode": deep_mode},
-                timeout=30 if not deep_mode else 60
+                timeout=timeout
             )
             
+            if response.status_code >= 500:
+                self.health.mark_failure("search", f"HTTP {response.status_code}")
+            else:
+                self.health.mark_success("search")
+            
             if response.status_code == 200:
                 data = response.json()
                 return {
@@ -67,13 +103,31 @@ class ResearchAgent:
                     "fallback": True
                 }
                 
+        except DeadlineExceeded:
+            logger.warning("Skipping search: request deadline exceeded")
+            return {
+                "success": False,
+                "result": "Search skipped: out of time for this request.",
+                "fallback": True
+            }
         except requests.Timeout:
+            # Running out of our own budget says nothing about the upstream
+            if timeout >= default_timeout:
+                self.health.mark_failure("search", "timeout")
             logger.error("Search request timed out")
             return {
                 "success": False,
                 "result": "Search timed out. Please try a simpler query.",
                 "fallback": True
             }
+        except requests.RequestException as e:
+            self.health.mark_failure("search", str(e))
+            logger.error(f"Research error: {e}")
+            return {
+                "success": False,
+                "result": "Error conducting research. Please try again.",
+                "fallback": True
+            }
         except Exception as e:
             logger.error(f"Research error: {e}")
             return {
@@ -4,30 +4,56 @@ REAL Sentient ROMA Health Agents with LLM Fallback Support
 Updated to use the LLM fallback system for reliable AI calls
 """
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import os, json
+import asyncio
+import copy
+from abc import ABC, abstractmethod
 from datetime import datetime
 from storage.db import save_report
+from roma_engine.deadline import remaining
+from health_scoring import weekly_scores
+
+LLM_TIMEOUT_S = float(os.getenv("LLM_TIMEOUT_S", "30"))
 
 # Import the fallback system
 try:
-    from llm_fallback import call_llm_with_fallback
+    from llm_fallback import call_llm_with_fallback, acall_llm_with_fallback
     FALLBACK_AVAILABLE = True
 except ImportError:
     FALLBACK_AVAILABLE = False
     # Fallback to direct litellm if module not available
-    from litellm import completion
+    from litellm import completion, acompletion
     
     OPENROUTER_KEY = os.getenv("OPENROUTER_API_KEY")
     MODEL = os.getenv("DEFAULT_MODEL", "gpt-3.5-turbo")
 
+def _llm_timeout() -> Optional[Dict[str, Any]]:
+    """Extra call kwargs so the call cannot outlive the request's deadline (None once it has passed)"""
+    budget = remaining()
+    if budget is not None and budget <= 0:
+        return None
+    return {"timeout": min(budget, LLM_TIMEOUT_S)} if budget is not None else {}
+
+def _messages(prompt: str, system_prompt: str) -> List[Dict[str, str]]:
+    messages = []
+    if system_prompt:
+        messages.append({"role": "system", "content": system_prompt})
+    messages.append({"role": "user", "content": prompt})
+    return messages
+
 def _ask_llm(prompt: str, system_prompt: str = "") -> str:
     """Helper to call LLM with automatic fallback support"""
     
+    # Inside a ROMA request the call may not outlive the request's deadline
+    extra = _llm_timeout()
+    if extra is None:
+        return "LLM skipped: deadline exceeded"
+    
     if FALLBACK_AVAILABLE:
         # Use the fallback system (preferred)
         try:
-            return call_llm_with_fallback(prompt, system_prompt, temperature=0.7)
+            return call_llm_with_fallback(prompt, system_prompt, temperature=0.7, **extra)
         except Exception as e:
             return f"LLM fallback error: {e}"
     else:
@@ -36,27 +62,123 @@ def _ask_llm(prompt: str, system_prompt: str = "") -> str:
             return "Error: No LLM provider configured"
         
         try:
-            messages = []
-            if system_prompt:
-                messages.append({"role": "system", "content": system_prompt})
-            messages.append({"role": "user", "content": prompt})
-            
             resp = completion(
                 model=MODEL,
-                messages=messages,
+                messages=_messages(prompt, system_prompt),
                 api_key=OPENROUTER_KEY,
                 base_url="https://openrouter.ai/api/v1",
-                temperature=0.7
+                temperature=0.7,
+                **extra
             )
             return resp["choices"][0]["message"]["content"]
         except Exception as e:
             return f"LLM error: {e}"
 
-# Rest of your existing agent classes remain the same...
+async def _aask_llm(prompt: str, system_prompt: str = "") -> str:
+    """Awaitable _ask_llm: does not block the event loop while the provider answers"""
+    extra = _llm_timeout()
+    if extra is None:
+        return "LLM skipped: deadline exceeded"
+    
+    if FALLBACK_AVAILABLE:
+        try:
+            return await acall_llm_with_fallback(prompt, system_prompt, temperature=0.7, **extra)
+        except Exception as e:
+            return f"LLM fallback error: {e}"
+    else:
+        if not OPENROUTER_KEY:
+            return "Error: No LLM provider configured"
+        
+        try:
+            resp = await acompletion(
+                model=MODEL,
+                messages=_messages(prompt, system_prompt),
+                api_key=OPENROUTER_KEY,
+                base_url="https://openrouter.ai/api/v1",
+                temperature=0.7,
+                **extra
+            )
+            return resp["choices"][0]["message"]["content"]
+        except Exception as e:
+            return f"LLM error: {e}"
+
+# Standard health analysis pipeline. Subtasks without "data" get the task's data.
+STANDARD_HEALTH_PLAN: List[Dict[str, Any]] = [
+    {
+        "id": "data_validation",
+        "kind": "ingest", 
+        "description": "Validate and normalize health data",
+        "depends_on": [],
+        "priority": 1
+    },
+    {
+        "id": "health_metrics",
+        "kind": "metrics",
+        "description": "Calculate comprehensive health metrics",
+        "depends_on": ["data_validation"],
+        "priority": 2
+    },
+    {
+        "id": "personalized_coaching", 
+        "kind": "coach",
+        "description": "Generate personalized health recommendations",
+        # Only ingest output (normalized_data) is passed to dependents,
+        # so coaching and reporting can run alongside metrics
+        "depends_on": ["data_validation"],
+        "priority": 3,
+        "data": {"message": "Provide weekly health coaching based on metrics"}
+    },
+    {
+        "id": "comprehensive_report",
+        "kind": "report",
+        "description": "Create comprehensive health report",
+        "depends_on": ["data_validation"],
+        "priority": 4
+    }
+]
+
+class HealthExecutor(ABC):
+    """
+    Base for ROMA executors: `_prepare` builds the LLM request, `_complete` parses it
+
+    Subclasses get both a blocking `run()` and an awaitable `arun()` from the same
+    prompt and parsing code. `_prepare` may return {"result": ...} to skip the LLM.
+    """
+    
+    @abstractmethod
+    def _prepare(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        """{"prompt", "system_prompt", ...} for the LLM, or {"result": ...} to skip it"""
+    
+    @abstractmethod
+    def _complete(self, ctx: Dict[str, Any], response: str) -> Dict[str, Any]:
+        """Build the agent's result from the `_prepare` context and the LLM response"""
+    
+    def run(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        ctx = self._prepare(task)
+        if "result" in ctx:
+            return ctx["result"]
+        return self._complete(ctx, _ask_llm(ctx["prompt"], ctx["system_prompt"]))
+    
+    async def arun(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        ctx = self._prepare(task)
+        if "result" in ctx:
+            return ctx["result"]
+        return self._complete(ctx, await _aask_llm(ctx["prompt"], ctx["system_prompt"]))
+
 class HealthAtomizer:
     """ROMA Atomizer with LLM fallback support"""
     
     def is_atomic(self, task: Dict[str, Any]) -> bool:
+        return self._parse(_ask_llm(*self._prompts(task)))[0]
+    
+    async def ais_atomic(self, task: Dict[str, Any]) -> bool:
+        return (await self.ais_atomic_decision(task))[0]
+    
+    async def ais_atomic_decision(self, task: Dict[str, Any]) -> Tuple[bool, bool]:
+        """(is_atomic, from_llm): from_llm is False when the COMPLEX default was used"""
+        return self._parse(await _aask_llm(*self._prompts(task)))
+    
+    def _prompts(self, task: Dict[str, Any]):
         task_description = task.get("description", str(task))
         task_data = task.get("data", {})
         
@@ -87,24 +209,37 @@ Respond with JSON: {"is_atomic": boolean, "reasoning": "explanation"}"""
         
         Is this atomic (single agent) or complex (needs decomposition)?
         """
-        
+        return prompt, system_prompt
+    
+    def _parse(self, response: str) -> Tuple[bool, bool]:
         try:
-            response = _ask_llm(prompt, system_prompt)
             result = json.loads(response)
             
-            is_atomic = result.get("is_atomic", False)
+            is_atomic = result["is_atomic"]
+            if not isinstance(is_atomic, bool):
+                raise ValueError(f"is_atomic is not a boolean: {is_atomic!r}")
             reasoning = result.get("reasoning", "No reasoning provided")
             
             print(f"🔍 Atomizer: Task is {'ATOMIC' if is_atomic else 'COMPLEX'} - {reasoning}")
-            return is_atomic
+            return is_atomic, True
             
         except Exception as e:
             print(f"⚠️ Atomizer failed, defaulting to COMPLEX: {e}")
-            return False
+            return False, False
 
 class HealthPlanner:
     """ROMA Planner with LLM fallback support"""
     def plan(self, task: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return self._parse(task, _ask_llm(*self._prompts(task)))[0]
+    
+    async def aplan(self, task: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return (await self.aplan_decision(task))[0]
+    
+    async def aplan_decision(self, task: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], bool]:
+        """(subtasks, from_llm): from_llm is False when the fallback plan was used"""
+        return self._parse(task, await _aask_llm(*self._prompts(task)))
+    
+    def _prompts(self, task: Dict[str, Any]):
         task_description = task.get("description", str(task))
         task_data = task.get("data", {})
         system_prompt = """You are the Planner in a ROMA health analysis system.        
@@ -135,12 +270,16 @@ Respond with JSON: {"subtasks": [{"id": "unique_id", "kind": "agent_type", "desc
         Break this into subtasks that specialized agents can handle.
         Consider dependencies - data before metrics, metrics before coaching.
         """
-        
+        return prompt, system_prompt
+    
+    def _parse(self, task: Dict[str, Any], response: str) -> Tuple[List[Dict[str, Any]], bool]:
+        task_data = task.get("data", {})
         try:
-            response = _ask_llm(prompt, system_prompt)
             result = json.loads(response)
             
             subtasks = result.get("subtasks", [])
+            if not isinstance(subtasks, list) or not all(isinstance(s, dict) for s in subtasks):
+                raise ValueError("subtasks is not a list of objects")
             reasoning = result.get("reasoning", "No planning reasoning")
             
             print(f"🗺️ Planner: Created {len(subtasks)} subtasks - {reasoning}")
@@ -156,59 +295,26 @@ Respond with JSON: {"subtasks": [{"id": "unique_id", "kind": "agent_type", "desc
                 if "priority" not in subtask:
                     subtask["priority"] = 3
             
-            return subtasks
+            return subtasks, True
             
         except Exception as e:
             print(f"⚠️ Planner failed, using fallback plan: {e}")
             # Fallback to standard health analysis pipeline
-            return [
-                {
-                    "id": "data_validation",
-                    "kind": "ingest", 
-                    "description": "Validate and normalize health data",
-                    "depends_on": [],
-                    "priority": 1,
-                    "data": task_data
-                },
-                {
-                    "id": "health_metrics",
-                    "kind": "metrics",
-                    "description": "Calculate comprehensive health metrics",
-                    "depends_on": ["data_validation"],
-                    "priority": 2,
-                    "data": task_data
-                },
-                {
-                    "id": "personalized_coaching", 
-                    "kind": "coach",
-                    "description": "Generate personalized health recommendations",
-                    "depends_on": ["health_metrics"],
-                    "priority": 3,
-                    "data": {"message": "Provide weekly health coaching based on metrics"}
-                },
-                {
-                    "id": "comprehensive_report",
-                    "kind": "report",
-                    "description": "Create comprehensive health report",
-                    "depends_on": ["health_metrics", "personalized_coaching"],
-                    "priority": 4,
-                    "data": task_data
-                }
-            ]
-
-class DataIngestionAgent:
+            return [dict(subtask, data=subtask.get("data", task_data)) for subtask in copy.deepcopy(STANDARD_HEALTH_PLAN)], False
+
+class DataIngestionAgent(HealthExecutor):
     """ROMA Executor: Data validation with LLM fallback"""
     
-    def run(self, task: Dict[str, Any]) -> Dict[str, Any]:
+    def _prepare(self, task: Dict[str, Any]) -> Dict[str, Any]:
         data = task.get("data", {})
         
         if not isinstance(data, dict) or not data:
-            return {
+            return {"result": {
                 "stage": "ingest",
                 "ok": False, 
                 "error": "No or invalid input data",
                 "agent": "DataIngestionAgent"
-            }
+            }}
         
         # Extract basic health metrics
         steps = int(data.get("steps", 0) or 0)
@@ -250,8 +356,11 @@ Provide practical validation insights, not medical diagnosis."""
         }}
         """
         
-        ai_validation = _ask_llm(prompt, system_prompt)
-        
+        return {"prompt": prompt, "system_prompt": system_prompt,
+                "data": data, "validation_summary": validation_summary}
+    
+    def _complete(self, ctx: Dict[str, Any], ai_validation: str) -> Dict[str, Any]:
+        data, validation_summary = ctx["data"], ctx["validation_summary"]
         try:
             validation_result = json.loads(ai_validation)
         except:
@@ -274,10 +383,10 @@ Provide practical validation insights, not medical diagnosis."""
             "normalized_data": validation_result.get("normalized_data", validation_summary)
         }
 
-class MetricsAnalysisAgent:
+class MetricsAnalysisAgent(HealthExecutor):
     """ROMA Executor: Health metrics with LLM fallback"""
     
-    def run(self, task: Dict[str, Any]) -> Dict[str, Any]:
+    def _prepare(self, task: Dict[str, Any]) -> Dict[str, Any]:
         data = task.get("data", {})
         
         # Extract metrics
@@ -287,10 +396,11 @@ class MetricsAnalysisAgent:
         water_liters = float(data.get("water_liters", 0) or 0.0)
         
         # Calculate scores
-        activity_score = min(100, (steps / 10000) * 100 + workouts * 15)
-        hydration_score = min(100, (water_liters / 14.0) * 100)
-        sleep_score = min(100, (sleep_hours / 56.0) * 100)
-        overall_score = (activity_score + hydration_score + sleep_score) / 3
+        scores = weekly_scores(steps, sleep_hours, workouts, water_liters)
+        activity_score = float(scores["activity"])
+        hydration_score = float(scores["hydration"])
+        sleep_score = float(scores["sleep"])
+        overall_score = float(scores["overall"])
         
         metrics_summary = {
             "steps": steps,
@@ -309,6 +419,9 @@ class MetricsAnalysisAgent:
                 "daily_water": round(water_liters / 7, 1)
             }
         }
+        # Real trends from stored history, when the caller has them (see health_trends)
+        if data.get("trends"):
+            metrics_summary["recent_trends"] = data["trends"]
         
         # AI analysis with fallback
         system_prompt = """You are a health metrics analyst. Provide data-driven insights about:
@@ -337,8 +450,11 @@ Focus on objective analysis, avoid medical advice."""
         }}
         """
         
-        ai_analysis = _ask_llm(prompt, system_prompt)
-        
+        return {"prompt": prompt, "system_prompt": system_prompt,
+                "metrics_summary": metrics_summary, "overall_score": overall_score}
+    
+    def _complete(self, ctx: Dict[str, Any], ai_analysis: str) -> Dict[str, Any]:
+        metrics_summary, overall_score = ctx["metrics_summary"], ctx["overall_score"]
         try:
             analysis_result = json.loads(ai_analysis)
         except:
@@ -361,10 +477,10 @@ Focus on objective analysis, avoid medical advice."""
             "health_score": round(overall_score, 1)
         }
 
-class CoachingAgent:
+class CoachingAgent(HealthExecutor):
     """ROMA Executor: AI coaching with fallback"""
     
-    def run(self, task: Dict[str, Any]) -> Dict[str, Any]:
+    def _prepare(self, task: Dict[str, Any]) -> Dict[str, Any]:
         data = task.get("data", {})
         user_message = data.get("message", "Weekly health coaching")
         
@@ -375,6 +491,8 @@ class CoachingAgent:
             "workouts": data.get("workouts", 0),
             "water_liters": data.get("water_liters", 0)
         }
+        if data.get("trends"):
+            context_data["recent_trends"] = data["trends"]
         
         system_prompt = """You are an expert health and wellness coach. Provide:
 1. Personalized, actionable advice
@@ -403,8 +521,10 @@ Be warm, professional, and evidence-based. Avoid medical diagnosis."""
         }}
         """
         
-        coaching_response = _ask_llm(prompt, system_prompt)
-        
+        return {"prompt": prompt, "system_prompt": system_prompt, "user_message": user_message}
+    
+    def _complete(self, ctx: Dict[str, Any], coaching_response: str) -> Dict[str, Any]:
+        user_message = ctx["user_message"]
         try:
             coaching_result = json.loads(coaching_response)
         except:
@@ -426,10 +546,17 @@ Be warm, professional, and evidence-based. Avoid medical diagnosis."""
             "coaching_result": coaching_result
         }
 
-class ReportingAgent:
+class ReportingAgent(HealthExecutor):
     """ROMA Executor: Report generation with fallback"""
     
     def run(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        return self._save(super().run(task), task.get("data", {}))
+    
+    async def arun(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        # The database write is blocking; keep it off the event loop
+        return await asyncio.to_thread(self._save, await super().arun(task), task.get("data", {}))
+    
+    def _prepare(self, task: Dict[str, Any]) -> Dict[str, Any]:
         data = task.get("data", {})
         
         system_prompt = """You are a health report specialist. Create comprehensive reports that:
@@ -463,8 +590,9 @@ Make reports professional yet accessible."""
         }}
         """
         
-        report_content = _ask_llm(prompt, system_prompt)
-        
+        return {"prompt": prompt, "system_prompt": system_prompt}
+    
+    def _complete(self, ctx: Dict[str, Any], report_content: str) -> Dict[str, Any]:
         try:
             report_result = json.loads(report_content)
         except:
@@ -483,22 +611,23 @@ Make reports professional yet accessible."""
                 "long_term_recommendations": ["Build sustainable habits", "Focus on gradual improvement", "Regular progress reviews"]
             }
         
-        # Save report to database
-        try:
-            report_text = json.dumps(report_result, indent=2)
-            report_id = save_report(data, report_text)
-        except Exception as e:
-            report_id = None
-            print(f"Failed to save report: {e}")
-        
         return {
             "stage": "report",
             "ok": True,
             "agent": "ReportingAgent",
             "report_result": report_result,
-            "report_id": report_id,
+            "report_id": None,
             "generated_at": datetime.utcnow().isoformat()
         }
+    
+    def _save(self, result: Dict[str, Any], data: Dict[str, Any]) -> Dict[str, Any]:
+        # Save report to database
+        try:
+            report_text = json.dumps(result["report_result"], indent=2)
+            result["report_id"] = save_report(data, report_text)
+        except Exception as e:
+            print(f"Failed to save report: {e}")
+        return result
 
 class HealthAggregator:
     """ROMA Aggregator: Intelligent results integration with fallback"""
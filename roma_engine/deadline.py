@@ -0,0 +1,82 @@
+"""
+Deadline propagation for ROMA execution
+
+A Deadline carries the remaining time budget of one request down the recursion
+(_solve -> planner -> executors -> LLM / search calls). The current deadline
+lives in a ContextVar, so it is per-thread and per-asyncio-task: concurrent
+requests never share or clobber each other's budget, and nested scopes can only
+tighten it. asyncio tasks and asyncio.to_thread calls inherit it automatically.
+"""
+
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when work is started after its deadline has passed"""
+
+class Deadline:
+    """An absolute point in time (monotonic clock) by which work must finish"""
+
+    def __init__(self, seconds: float):
+        self.expires_at = time.monotonic() + max(0.0, seconds)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def child(self, seconds: Optional[float] = None) -> "Deadline":
+        """A deadline no later than this one (and at most `seconds` from now)"""
+        child = Deadline(0)
+        child.expires_at = self.expires_at if seconds is None else min(self.expires_at, time.monotonic() + seconds)
+        return child
+
+    def check(self, what: str = "operation") -> None:
+        if self.expired():
+            raise DeadlineExceeded(f"Deadline exceeded before {what}")
+
+    def __repr__(self) -> str:
+        return f"Deadline(remaining={self.remaining():.2f}s)"
+
+_current: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar("roma_deadline", default=None)
+
+def current_deadline() -> Optional[Deadline]:
+    return _current.get()
+
+@contextmanager
+def deadline_scope(seconds: Optional[float] = None, deadline: Optional[Deadline] = None) -> Iterator[Deadline]:
+    """
+    Run a block under a deadline; an enclosing deadline is never extended
+
+    Pass either a budget in `seconds` or an existing `deadline`.
+    """
+    parent = _current.get()
+    if deadline is None:
+        deadline = parent.child(seconds) if parent else Deadline(seconds if seconds is not None else float("inf"))
+    elif parent and parent.expires_at < deadline.expires_at:
+        deadline = parent
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+def remaining(default: Optional[float] = None) -> Optional[float]:
+    """Seconds left on the current deadline, or `default` when there is none"""
+    deadline = _current.get()
+    return deadline.remaining() if deadline else default
+
+def timeout_for(default: float) -> float:
+    """
+    Timeout for a blocking call: its usual timeout, capped by the remaining budget
+
+    Raises DeadlineExceeded instead of starting a call that cannot finish in time.
+    """
+    deadline = _current.get()
+    if deadline is None:
+        return default
+    deadline.check("outbound call")
+    return min(default, deadline.remaining())
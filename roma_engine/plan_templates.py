@@ -0,0 +1,130 @@
+"""
+Plan template registry for ROMA
+
+Most tasks arrive in a handful of shapes (e.g. a comprehensive weekly analysis of
+the usual steps/sleep/workouts/water dict) and the atomizer + planner LLM calls
+keep producing the same decomposition for them. The registry maps
+(task kind, data schema) to a known decision so `_solve` can skip both calls:
+
+- precomputed templates are registered for a kind, optionally requiring
+  certain data fields
+- decisions the LLM makes for novel shapes are remembered (bounded LRU with a
+  TTL); only the plan's structure is kept, never the data the LLM put in it,
+  since the next task with that shape may belong to another user
+"""
+
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+PLAN_TEMPLATES_ENABLED = os.getenv("ROMA_PLAN_TEMPLATES", "true").lower() == "true"
+PLAN_TEMPLATES_TTL_S = float(os.getenv("ROMA_PLAN_TEMPLATES_TTL_S", "3600"))  # lifetime of learned decisions
+
+def data_schema(data: Any) -> str:
+    """Schema signature of a task's data: its sorted top-level keys"""
+    if not isinstance(data, dict):
+        return type(data).__name__
+    return ",".join(sorted(str(k) for k in data))
+
+class PlanTemplateRegistry:
+    """
+    (kind, data schema) -> {"atomic": bool, "plan": [subtasks] or None}
+
+    Learned plans never carry any `data`: every subtask gets the current task's
+    data when the plan is instantiated. Registered templates may keep static
+    `data` on a subtask (e.g. the coach message); the others get the task's data.
+    """
+
+    def __init__(self, max_learned: int = 256, enabled: bool = PLAN_TEMPLATES_ENABLED,
+                 ttl_s: float = PLAN_TEMPLATES_TTL_S):
+        self.enabled = enabled
+        self.max_learned = max_learned
+        self.ttl_s = ttl_s
+        self.templates: Dict[str, List[Tuple[frozenset, Dict[str, Any]]]] = {}
+        self.learned: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _strip(plan: Optional[List[Dict[str, Any]]]) -> Optional[List[Dict[str, Any]]]:
+        """Plan structure without any subtask data"""
+        if plan is None:
+            return None
+        return [{k: copy.deepcopy(v) for k, v in subtask.items() if k != "data"} for subtask in plan]
+
+    @staticmethod
+    def _instantiate(entry: Dict[str, Any], task_data: Any) -> Dict[str, Any]:
+        plan = None
+        if entry["plan"] is not None:
+            plan = copy.deepcopy(entry["plan"])
+            for subtask in plan:
+                subtask.setdefault("data", task_data)
+        return {"atomic": entry["atomic"], "plan": plan, "source": entry["source"]}
+
+    def register(self, kind: str, plan: Optional[List[Dict[str, Any]]] = None,
+                 atomic: bool = False, requires: Iterable[str] = ()) -> None:
+        """Precomputed decision for `kind` whenever the data has all `requires` fields"""
+        entry = {"atomic": atomic, "plan": copy.deepcopy(plan), "source": "template"}
+        with self._lock:
+            self.templates.setdefault(kind, []).append((frozenset(requires), entry))
+            # Most specific templates first
+            self.templates[kind].sort(key=lambda t: -len(t[0]))
+
+    def lookup(self, task: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Known decision for this task's shape, or None if the LLM has to decide"""
+        if not self.enabled:
+            return None
+        kind = task.get("kind", "")
+        data = task.get("data", {})
+        key = (kind, data_schema(data))
+        with self._lock:
+            entry = self.learned.get(key)
+            if entry is not None and time.monotonic() - entry["learned_at"] >= self.ttl_s:
+                del self.learned[key]
+                entry = None
+            if entry is not None:
+                self.learned.move_to_end(key)
+            else:
+                fields = set(data) if isinstance(data, dict) else set()
+                entry = next((e for requires, e in self.templates.get(kind, ()) if requires <= fields), None)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return self._instantiate(entry, data)
+
+    def remember(self, task: Dict[str, Any], atomic: bool,
+                 plan: Optional[List[Dict[str, Any]]] = None) -> None:
+        """
+        Record what the atomizer/planner LLM decided for a novel task shape
+
+        Callers only pass decisions that came from a successful LLM response,
+        never heuristic or fallback ones.
+        """
+        if not self.enabled:
+            return
+        key = (task.get("kind", ""), data_schema(task.get("data", {})))
+        entry = {"atomic": atomic, "plan": self._strip(plan), "source": "learned",
+                 "learned_at": time.monotonic()}
+        with self._lock:
+            self.learned[key] = entry
+            self.learned.move_to_end(key)
+            while len(self.learned) > self.max_learned:
+                self.learned.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "templates": {kind: len(entries) for kind, entries in self.templates.items()},
+                "learned_shapes": len(self.learned),
+                "learned_ttl_s": self.ttl_s,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
@@ -4,19 +4,42 @@ REAL Sentient ROMA Engine with Safety Depth Limits
 Fixed version that prevents infinite recursion while maintaining true ROMA functionality.
 """
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import os
 import time
+from roma_engine.deadline import Deadline, current_deadline, deadline_scope
 from roma_agents.sentient_health_agents import (
     HealthAtomizer, HealthPlanner, HealthAggregator,
     DataIngestionAgent, MetricsAnalysisAgent, 
-    CoachingAgent, ReportingAgent
+    CoachingAgent, ReportingAgent, STANDARD_HEALTH_PLAN
 )
+from roma_engine.plan_templates import PlanTemplateRegistry
+
+MAX_SUBTASKS = 4
+SUBTASK_WORKERS = int(os.getenv("ROMA_SUBTASK_WORKERS", "4"))          # concurrent subtasks per plan
+SUBTASK_TIMEOUT_S = float(os.getenv("ROMA_SUBTASK_TIMEOUT_S", "30"))
+REQUEST_BUDGET_S = float(os.getenv("ROMA_REQUEST_BUDGET_S", "90"))       # whole run_weekly/analyze/chat call
+MIN_DECOMPOSE_BUDGET_S = float(os.getenv("ROMA_MIN_DECOMPOSE_BUDGET_S", "10"))
+
+def _run_sync(coro: Awaitable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Drive a coroutine from synchronous code (on a helper thread if this thread already runs a loop)"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
 
 class ROMARunner:
     """
     Real Sentient ROMA Implementation with Safety Limits
     
-    Prevents infinite recursion while maintaining true hierarchical intelligence
+    Prevents infinite recursion while maintaining true hierarchical intelligence.
+    The engine is async: `arun_weekly`, `aanalyze_single` and `achat` can serve many
+    concurrent analyses on one event loop; `run_weekly`, `analyze_single` and `chat`
+    are blocking shims for existing callers.
     """
     
     def __init__(self, max_depth: int = 3):
@@ -29,6 +52,13 @@ class ROMARunner:
         # SAFETY: Maximum recursion depth
         self.max_depth = max_depth
         
+        # Known task shapes skip the atomizer and planner LLM calls
+        self.plan_templates = PlanTemplateRegistry()
+        self.plan_templates.register(
+            "comprehensive_health_analysis", STANDARD_HEALTH_PLAN,
+            requires=["steps", "sleep_hours", "workouts", "water_liters"],
+        )
+        
         # Import ResearchAgent
         try:
             from roma_agents.research_agent import ResearchAgent
@@ -56,7 +86,7 @@ class ROMARunner:
             print("🔍 ResearchAgent integrated")
         print(f"🛡️  Safety: Maximum recursion depth = {max_depth}")
     
-    def _solve(self, task: Dict[str, Any], depth: int = 0) -> Dict[str, Any]:
+    async def _solve(self, task: Dict[str, Any], depth: int = 0) -> Dict[str, Any]:
         """
         THE CORE ROMA RECURSIVE FUNCTION with Safety Limits
         
@@ -65,166 +95,210 @@ class ROMARunner:
         indent = "  " * depth
         print(f"{indent}🔄 ROMA Solve (depth={depth}): {task.get('description', str(task)[:50])}...")
         
+        # The request's deadline (set by the public API methods) bounds everything below
+        deadline = current_deadline()
+        if deadline and deadline.expired():
+            print(f"{indent}⏰ Deadline exceeded, skipping task")
+            return {"ok": False, "error": "Deadline exceeded", "status": "timeout", "depth": depth}
+        
         # SAFETY CHECK: Prevent infinite recursion
         if depth >= self.max_depth:
             print(f"{indent}🛡️  SAFETY LIMIT: Max depth ({self.max_depth}) reached, executing atomically")
-            return self._execute(task, depth)
+            return await self._execute(task, depth)
         
-        # STEP 1: Atomizer - Check if task is atomic
-        print(f"{indent}📋 Step 1: Atomizer analyzing task...")
+        # Not enough budget left to plan and fan out: run the task directly
+        if deadline and deadline.remaining() < MIN_DECOMPOSE_BUDGET_S:
+            print(f"{indent}⏰ {deadline.remaining():.1f}s left, executing atomically")
+            return await self._execute(task, depth)
         
-        try:
-            # Enhanced atomizer check with depth awareness
-            is_atomic = self._smart_atomizer_check(task, depth)
-        except Exception as e:
-            print(f"{indent}⚠️  Atomizer failed: {str(e)}, defaulting to atomic")
-            is_atomic = True
+        # Known task shape: reuse its decision instead of asking the atomizer and planner
+        template = self.plan_templates.lookup(task) if depth == 0 else None
+        decided_by_llm = False
+        if template is not None:
+            print(f"{indent}📐 Plan template ({template['source']}) for '{task.get('kind', '')}' - skipping atomizer/planner")
+            is_atomic = template["atomic"]
+        else:
+            # STEP 1: Atomizer - Check if task is atomic
+            print(f"{indent}📋 Step 1: Atomizer analyzing task...")
+            
+            try:
+                # Enhanced atomizer check with depth awareness
+                is_atomic, decided_by_llm = await self._smart_atomizer_check(task, depth)
+                # Only LLM decisions are worth remembering; heuristics and fallbacks are not
+                if is_atomic and decided_by_llm and depth == 0:
+                    self.plan_templates.remember(task, atomic=True)
+            except Exception as e:
+                print(f"{indent}⚠️  Atomizer failed: {str(e)}, defaulting to atomic")
+                is_atomic = True
         
         if is_atomic:
             # STEP 2a: Direct execution for atomic tasks
             print(f"{indent}⚡ Task is ATOMIC - executing directly")
-            return self._execute(task, depth)
+            return await self._execute(task, depth)
         else:
             # STEP 2b: Complex task - decompose and recurse
             print(f"{indent}🗺️  Task is COMPLEX - planning decomposition")
             
             try:
                 # Plan the task into subtasks
-                subtasks = self.planner.plan(task)
-                print(f"{indent}📝 Planner created {len(subtasks)} subtasks")
+                planned_by_llm = False
+                if template is not None and template["plan"]:
+                    subtasks = template["plan"]
+                else:
+                    subtasks, planned_by_llm = await self.planner.aplan_decision(task)
+                    print(f"{indent}📝 Planner created {len(subtasks)} subtasks")
                 
                 # Safety: Limit number of subtasks
                 if not subtasks or len(subtasks) > 6:
                     print(f"{indent}⚠️  Invalid subtask count ({len(subtasks)}), executing atomically")
-                    return self._execute(task, depth)
+                    return await self._execute(task, depth)
+                if template is None and depth == 0 and decided_by_llm and planned_by_llm:
+                    self.plan_templates.remember(task, atomic=False, plan=subtasks)
                 
                 # STEP 3: Execute subtasks recursively with dependency management
                 print(f"{indent}🔗 Executing subtasks with dependencies...")
-                results = self._execute_subtasks_safely(subtasks, task, depth + 1)
+                results = await self._execute_subtasks_safely(subtasks, task, depth + 1)
                 
                 # STEP 4: Aggregate results
                 print(f"{indent}🔄 Aggregating {len(results)} subtask results...")
                 final_result = self.aggregator.combine(results, task)
+                if isinstance(final_result, dict):
+                    final_result["subtask_timings"] = {
+                        r["subtask_id"]: r.get("timing") for r in results
+                    }
                 
                 print(f"{indent}✅ ROMA recursion completed at depth {depth}")
                 return final_result
                 
             except Exception as e:
                 print(f"{indent}❌ Planning/execution failed: {str(e)}, falling back to atomic")
-                return self._execute(task, depth)
+                return await self._execute(task, depth)
     
-    def _smart_atomizer_check(self, task: Dict[str, Any], depth: int) -> bool:
+    async def _smart_atomizer_check(self, task: Dict[str, Any], depth: int) -> Tuple[bool, bool]:
         """
         Smart atomizer that considers depth and task complexity
         
-        Forces atomic execution for deeper levels and specific patterns
+        Forces atomic execution for deeper levels and specific patterns.
+        Returns (is_atomic, decided_by_llm).
         """
         # Force atomic execution for deeper recursion levels
         if depth >= 2:
             print(f"  🛡️  Depth {depth}: Forcing atomic for safety")
-            return True
+            return True, False
         
         # Check for specific atomic task types
         task_kind = task.get("kind", "")
         if task_kind in ["ingest", "metrics", "coach", "report"]:
             print(f"  ⚡ Known atomic task '{task_kind}'")
-            return True
+            return True, False
         
         # Check task description for atomic patterns
         desc = task.get("description", "").lower()
         atomic_patterns = ["single", "quick", "simple", "basic", "direct"]
         if any(pattern in desc for pattern in atomic_patterns):
             print(f"  ⚡ Atomic pattern detected in description")
-            return True
+            return True, False
         
         # Use AI atomizer for top-level tasks only
         if depth == 0:
             try:
-                return self.atomizer.is_atomic(task)
+                return await self.atomizer.ais_atomic_decision(task)
             except Exception as e:
                 print(f"  ⚠️  AI Atomizer failed: {str(e)}, defaulting to atomic")
-                return True
+                return True, False
         
         # Default to atomic for safety
-        return True
+        return True, False
     
-    def _execute_subtasks_safely(self, subtasks: List[Dict], original_task: Dict, depth: int) -> List[Dict[str, Any]]:
+    async def _execute_subtasks_safely(self, subtasks: List[Dict], original_task: Dict, depth: int) -> List[Dict[str, Any]]:
         """
-        Execute subtasks with safety limits and proper error handling
+        Execute subtasks as a dependency DAG with safety limits
+
+        A subtask starts as soon as everything in its `depends_on` has finished,
+        so independent branches run concurrently (at most SUBTASK_WORKERS at a
+        time). Results come back in plan order, each with a `timing` entry.
         """
         indent = "  " * depth
         print(f"{indent}🔗 Managing {len(subtasks)} subtasks safely...")
         
         # Safety: Limit number of subtasks
-        if len(subtasks) > 4:
-            print(f"{indent}🛡️  Safety: Limiting to first 4 subtasks (was {len(subtasks)})")
-            subtasks = subtasks[:4]
-        
-        results = []
-        completed_tasks = {}
+        if len(subtasks) > MAX_SUBTASKS:
+            print(f"{indent}🛡️  Safety: Limiting to first {MAX_SUBTASKS} subtasks (was {len(subtasks)})")
+            subtasks = subtasks[:MAX_SUBTASKS]
         
-        for i, subtask in enumerate(subtasks):
-            if i >= 4:  # Hard limit
-                print(f"{indent}🛡️  Safety: Stopping at 4 subtasks")
-                break
-                
-            subtask_id = subtask.get("id", f"task_{i}")
-            print(f"{indent}🔄 Executing subtask {i+1}/{len(subtasks)}: {subtask_id}")
-            
-            try:
-                # Prepare subtask with dependencies
-                enhanced_subtask = self._prepare_subtask_data(subtask, original_task, completed_tasks)
-                
-                # RECURSIVE CALL with timeout protection
-                subtask_result = self._solve_with_timeout(enhanced_subtask, depth)
-                
-                # Store result
-                completed_tasks[subtask_id] = subtask_result
-                results.append(subtask_result)
-                
-                status = subtask_result.get("ok", subtask_result.get("status") == "ok")
-                print(f"{indent}{'✅' if status else '⚠️'} Subtask {subtask_id} completed")
-                
-            except Exception as e:
-                print(f"{indent}❌ Subtask {subtask_id} failed: {str(e)}")
-                error_result = {
-                    "ok": False,
-                    "error": str(e),
-                    "subtask_id": subtask_id,
-                    "status": "failed"
-                }
-                completed_tasks[subtask_id] = error_result
-                results.append(error_result)
+        ids = [subtask.get("id") or f"task_{i}" for i, subtask in enumerate(subtasks)]
+        by_id = dict(zip(ids, subtasks))
+        # Only edges to subtasks in this plan count (unknown ids and self-loops are dropped)
+        deps = {
+            sid: {d for d in by_id[sid].get("depends_on", []) if d in by_id and d != sid}
+            for sid in ids
+        }
         
-        return results
-    
-    def _solve_with_timeout(self, task: Dict[str, Any], depth: int) -> Dict[str, Any]:
-        """
-        Execute solve with timeout protection to prevent hanging
-        """
-        import signal
+        completed_tasks: Dict[str, Dict[str, Any]] = {}
+        pending = list(ids)
+        running: Dict[asyncio.Task, str] = {}
+        parent = current_deadline()
+        slots = asyncio.Semaphore(SUBTASK_WORKERS)
+        t0 = time.time()
         
-        def timeout_handler(signum, frame):
-            raise TimeoutError("ROMA execution timed out")
+        async def run_one(subtask_id: str, subtask: Dict[str, Any]) -> Dict[str, Any]:
+            async with slots:
+                started = time.time()
+                # Each subtask gets SUBTASK_TIMEOUT_S, never more than the request has left
+                deadline = parent.child(SUBTASK_TIMEOUT_S) if parent else Deadline(SUBTASK_TIMEOUT_S)
+                try:
+                    with deadline_scope(deadline=deadline):
+                        result = await asyncio.wait_for(self._solve(subtask, depth), timeout=deadline.remaining())
+                except asyncio.TimeoutError:
+                    print(f"{indent}⏰ Subtask {subtask_id} timed out after {time.time() - started:.0f}s")
+                    result = {
+                        "ok": False,
+                        "error": f"Subtask timed out after {time.time() - started:.0f}s",
+                        "subtask_id": subtask_id,
+                        "status": "timeout"
+                    }
+                except Exception as e:
+                    print(f"{indent}❌ Subtask {subtask_id} failed: {str(e)}")
+                    result = {
+                        "ok": False,
+                        "error": str(e),
+                        "subtask_id": subtask_id,
+                        "status": "failed"
+                    }
+                duration = time.time() - started
+                result.setdefault("subtask_id", subtask_id)
+                result["timing"] = {
+                    "start_offset_s": round(started - t0, 3),
+                    "duration_s": round(duration, 3),
+                }
+                status = result.get("ok", result.get("status") == "ok")
+                print(f"{indent}{'✅' if status else '⚠️'} Subtask {subtask_id} completed in {duration:.2f}s")
+                return result
         
         try:
-            # Set 30-second timeout for subtask execution
-            signal.signal(signal.SIGALRM, timeout_handler)
-            signal.alarm(30)
-            
-            result = self._solve(task, depth)
-            
-            # Cancel timeout
-            signal.alarm(0)
-            return result
-            
-        except TimeoutError:
-            print(f"  ⏰ Subtask timed out after 30s, executing atomically")
-            signal.alarm(0)
-            return self._execute(task, depth)
-        except Exception as e:
-            signal.alarm(0)
-            raise e
+            while pending or running:
+                ready = [sid for sid in pending if deps[sid] <= completed_tasks.keys()]
+                if not ready and not running:
+                    # Dependency cycle: release the earliest remaining subtask
+                    print(f"{indent}⚠️  Dependency cycle among {pending}, running {pending[0]} anyway")
+                    ready = [pending[0]]
+                for subtask_id in ready:
+                    pending.remove(subtask_id)
+                    print(f"{indent}🔄 Executing subtask {ids.index(subtask_id) + 1}/{len(ids)}: {subtask_id}")
+                    # Prepare subtask with dependencies
+                    enhanced_subtask = self._prepare_subtask_data(by_id[subtask_id], original_task, completed_tasks)
+                    running[asyncio.create_task(run_one(subtask_id, enhanced_subtask))] = subtask_id
+                
+                done, _ = await asyncio.wait(list(running), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    completed_tasks[running.pop(task)] = task.result()
+        finally:
+            # Only non-empty if we were cancelled ourselves
+            for task in running:
+                task.cancel()
+        
+        print(f"{indent}⏱️  {len(ids)} subtasks finished in {time.time() - t0:.2f}s")
+        return [completed_tasks[sid] for sid in ids]
     
     def _prepare_subtask_data(self, subtask: Dict, original_task: Dict, completed_tasks: Dict) -> Dict[str, Any]:
         """
@@ -247,7 +321,7 @@ class ROMARunner:
         
         return enhanced_subtask
     
-    def _execute(self, task: Dict[str, Any], depth: int = 0) -> Dict[str, Any]:
+    async def _execute(self, task: Dict[str, Any], depth: int = 0) -> Dict[str, Any]:
         """
         Execute atomic task using appropriate specialized agent
         """
@@ -275,7 +349,11 @@ class ROMARunner:
         
         try:
             executor = self.executors[executor_name]
-            result = executor.run(task)
+            if hasattr(executor, "arun"):
+                result = await executor.arun(task)
+            else:
+                # Sync-only executor: keep it off the event loop (the deadline context is copied along)
+                result = await asyncio.to_thread(executor.run, task)
             
             # Ensure result structure
             if isinstance(result, dict):
@@ -297,9 +375,23 @@ class ROMARunner:
             }
     
     # Public API methods
-    def run_weekly(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    def run_weekly(self, data: Dict[str, Any], budget_s: Optional[float] = None) -> Dict[str, Any]:
+        """Blocking shim for arun_weekly"""
+        return _run_sync(self.arun_weekly(data, budget_s))
+    
+    def analyze_single(self, entry: Dict[str, Any], budget_s: Optional[float] = None) -> Dict[str, Any]:
+        """Blocking shim for aanalyze_single"""
+        return _run_sync(self.aanalyze_single(entry, budget_s))
+    
+    def chat(self, message: Dict[str, Any], budget_s: Optional[float] = None) -> Dict[str, Any]:
+        """Blocking shim for achat"""
+        return _run_sync(self.achat(message, budget_s))
+    
+    async def arun_weekly(self, data: Dict[str, Any], budget_s: Optional[float] = None) -> Dict[str, Any]:
         """
         Main entry point for comprehensive health analysis
+
+        The whole analysis shares one deadline of `budget_s` (default ROMA_REQUEST_BUDGET_S).
         """
         print("🚀 Starting ROMA weekly health analysis...")
         start_time = time.time()
@@ -312,7 +404,8 @@ class ROMARunner:
         }
         
         try:
-            result = self._solve(root_task)
+            with deadline_scope(budget_s or REQUEST_BUDGET_S):
+                result = await self._solve(root_task)
             
             execution_time = time.time() - start_time
             print(f"✅ ROMA analysis completed in {execution_time:.2f}s")
@@ -323,6 +416,7 @@ class ROMARunner:
                     "framework": "Sentient ROMA with Safety Limits",
                     "execution_time_seconds": round(execution_time, 2),
                     "max_depth_limit": self.max_depth,
+                    "budget_seconds": budget_s or REQUEST_BUDGET_S,
                     "version": "1.0.0-safe"
                 }
             
@@ -337,7 +431,7 @@ class ROMARunner:
                 "execution_time_seconds": round(execution_time, 2)
             }
     
-    def analyze_single(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+    async def aanalyze_single(self, entry: Dict[str, Any], budget_s: Optional[float] = None) -> Dict[str, Any]:
         """Quick single-entry analysis (should be atomic)"""
         task = {
             "kind": "metrics",
@@ -345,9 +439,10 @@ class ROMARunner:
             "data": entry,
             "complexity": "low"
         }
-        return self._solve(task)
+        with deadline_scope(budget_s or REQUEST_BUDGET_S):
+            return await self._solve(task)
     
-    def chat(self, message: Dict[str, Any]) -> Dict[str, Any]:
+    async def achat(self, message: Dict[str, Any], budget_s: Optional[float] = None) -> Dict[str, Any]:
         """Health coaching chat (should be atomic)"""
         task = {
             "kind": "coach",
@@ -355,7 +450,8 @@ class ROMARunner:
             "data": message,
             "complexity": "low"
         }
-        return self._solve(task)
+        with deadline_scope(budget_s or REQUEST_BUDGET_S):
+            return await self._solve(task)
     
     def get_system_info(self) -> Dict[str, Any]:
         """Get ROMA system information"""
@@ -363,10 +459,13 @@ class ROMARunner:
             "framework": "Sentient ROMA with Safety Limits",
             "version": "1.0.0-safe",
             "max_depth": self.max_depth,
+            "request_budget_seconds": REQUEST_BUDGET_S,
+            "subtask_timeout_seconds": SUBTASK_TIMEOUT_S,
+            "plan_templates": self.plan_templates.get_stats(),
             "safety_features": [
                 "Recursion depth limits",
                 "Subtask count limits", 
-                "Timeout protection",
+                "Per-request deadline propagation",
                 "Error fallbacks",
                 "Smart atomizer decisions"
             ]
@@ -1,6 +1,6 @@
 import os
 import logging
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify, request, Response, stream_with_context
 import requests
 import json
 from typing import Dict, Any, Optional
@@ -74,6 +74,54 @@ def call_openrouter_llm(prompt: str, system_prompt: str = "", model: str = None)
         logger.error(f"OpenRouter API call failed: {str(e)}")
         return None
 
+def stream_openrouter_llm(prompt: str, system_prompt: str = "", model: str = None):
+    """
+    Stream OpenRouter completion tokens as they arrive
+
+    Yields content chunks; yields nothing if the call cannot be made.
+    """
+    if not OPENROUTER_API_KEY:
+        return
+    
+    messages = []
+    if system_prompt:
+        messages.append({"role": "system", "content": system_prompt})
+    messages.append({"role": "user", "content": prompt})
+    
+    headers = {
+        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+        "Content-Type": "application/json",
+        "HTTP-Referer": "http://localhost:5000",
+        "X-Title": "ROMA Health Tracker"
+    }
+    payload = {
+        "model": model or DEFAULT_MODEL,
+        "messages": messages,
+        "temperature": 0.7,
+        "max_tokens": 1000,
+        "stream": True
+    }
+    
+    try:
+        with requests.post(OPENROUTER_BASE_URL, headers=headers, json=payload, timeout=30, stream=True) as response:
+            if response.status_code != 200:
+                logger.error(f"OpenRouter stream error: {response.status_code} - {response.text}")
+                return
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data: "):
+                    continue  # blank lines and ": OPENROUTER PROCESSING" keep-alives
+                data = line[len("data: "):]
+                if data == "[DONE]":
+                    break
+                try:
+                    delta = json.loads(data)["choices"][0].get("delta", {})
+                except (ValueError, KeyError, IndexError):
+                    continue
+                if delta.get("content"):
+                    yield delta["content"]
+    except Exception as e:
+        logger.error(f"OpenRouter stream failed: {str(e)}")
+
 def analyze_health_data(data: Dict[str, Any], description: str) -> str:
     """
     Generate health analysis using LLM
@@ -128,6 +176,11 @@ def execute_goal(goal: str) -> str:
         else:
             return f"Goal acknowledged: {goal}. Consider breaking this into specific, measurable steps."
 
+@app.get("/health")
+def health():
+    """Cheap liveness probe (no LLM call) for the container healthcheck and the API's upstream monitor"""
+    return jsonify({"ok": True, "service": "roma"})
+
 @app.get("/api/simple/status")
 def status():
     """Enhanced status with LLM availability"""
@@ -147,8 +200,10 @@ def status():
         "llm_working": llm_working,
         "model": DEFAULT_MODEL,
         "endpoints": [
+            "/health",
             "/api/simple/status", 
             "/api/simple/execute", 
+            "/api/simple/execute/stream", 
             "/api/simple/research", 
             "/api/simple/analysis"
         ]
@@ -185,6 +240,37 @@ def simple_execute():
             "error": str(e)
         }), 500
 
+@app.post("/api/simple/execute/stream")
+def simple_execute_stream():
+    """Streaming execute: server-sent `data: {"token": ...}` lines, then `data: [DONE]`"""
+    payload = request.get_json(silent=True) or {}
+    goal = payload.get("goal", "").strip()
+    
+    if not goal:
+        return jsonify({"error": "No goal provided", "status": "error"}), 400
+    
+    logger.info(f"Streaming goal: {goal[:50]}...")
+    
+    system_prompt = """You are a helpful AI assistant specialized in health and wellness. 
+    Provide practical, actionable responses. Be concise but thorough.
+    If the request is health-related, provide evidence-based advice."""
+    
+    def generate():
+        streamed = False
+        for token in stream_openrouter_llm(goal, system_prompt):
+            streamed = True
+            yield f"data: {json.dumps({'token': token})}\n\n"
+        if not streamed:
+            # Same fallback text as the blocking endpoint
+            yield f"data: {json.dumps({'token': execute_goal(goal)})}\n\n"
+        yield "data: [DONE]\n\n"
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.post("/api/simple/research")
 def simple_research():
     """Enhanced research with LLM integration"""
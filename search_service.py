@@ -1,8 +1,12 @@
 # search_service.py
 from cache_manager import search_cache
+from single_flight import SingleFlight
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 from opendeepsearch import OpenDeepSearchTool
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import threading
 import os
 import logging
 
@@ -14,6 +18,62 @@ app = FastAPI(title="Health Search Service")
 # Initialize OpenDeepSearch
 search_agent = None
 
+# Concurrent identical (cache-key equal) searches share one forward() call
+search_flight = SingleFlight("search")
+
+class SearchPoolFull(Exception):
+    """Raised when the worker pool and its queue are saturated"""
+
+class SearchWorkerPool:
+    """
+    Runs blocking search_agent.forward() calls off the event loop
+
+    A thread pool (the OpenDeepSearch tool holds clients that cannot be shared
+    across processes) with an admission limit: at most `workers` running plus
+    `max_queue` waiting; beyond that callers get SearchPoolFull immediately.
+    """
+    
+    def __init__(self, workers: int = 4, max_queue: int = 16):
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="search")
+        self.pending = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+    
+    async def run(self, fn, *args):
+        with self._lock:
+            if self.pending >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise SearchPoolFull(f"{self.pending} searches pending")
+            self.pending += 1
+        future = self.executor.submit(fn, *args)
+        # The slot is released when the work really finishes, even if the caller gave up
+        future.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(future)
+    
+    def _release(self):
+        with self._lock:
+            self.pending -= 1
+    
+    def get_stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "pending": self.pending,
+            "queued": max(0, self.pending - self.workers),
+            "rejected": self.rejected,
+        }
+
+search_pool = SearchWorkerPool(
+    workers=int(os.getenv("SEARCH_WORKERS", "4")),
+    max_queue=int(os.getenv("SEARCH_MAX_QUEUE", "16")),
+)
+
+# Per-request deadlines; the search keeps running (and fills the cache) after a timeout
+SEARCH_TIMEOUT_S = float(os.getenv("SEARCH_TIMEOUT_S", "45"))
+DEEP_SEARCH_TIMEOUT_S = float(os.getenv("DEEP_SEARCH_TIMEOUT_S", "90"))
+
 class SearchRequest(BaseModel):
     query: str
     deep_mode: bool = False  # False = quick, True = deep search
@@ -29,6 +89,9 @@ async def startup_event():
     """Initialize OpenDeepSearch on startup"""
     global search_agent
     
+    # Periodically drop expired cache entries (memory and disk tiers)
+    search_cache.start_sweeper(interval_seconds=float(os.getenv("SEARCH_CACHE_SWEEP_S", "300")))
+    
     try:
         logger.info("Initializing OpenDeepSearch...")
         
@@ -63,9 +126,33 @@ async def health_check():
     return {
         "status": "healthy" if search_agent else "initializing",
         "service": "OpenDeepSearch Health Service",
-        "initialized": search_agent is not None
+        "initialized": search_agent is not None,
+        "pool": search_pool.get_stats()
     }
 
+async def _run_search(query: str, deep_mode: bool) -> dict:
+    """Run OpenDeepSearch for a cache miss and store the result"""
+    logger.info(f"Cache miss, searching: {query} (deep_mode={deep_mode})")
+    
+    # Add health context to query for better results
+    enhanced_query = f"{query} site:nih.gov OR site:who.int OR site:mayoclinic.org OR site:cdc.gov OR site:ncbi.nlm.nih.gov"
+    
+    # Perform search in the worker pool so the event loop stays responsive
+    result = await search_pool.run(
+        search_agent.forward, enhanced_query if not deep_mode else query
+    )
+    
+    response_data = {
+        "query": query,
+        "result": result,
+        "sources": [],
+        "mode": "deep" if deep_mode else "quick"
+    }
+    
+    # Cache the result
+    search_cache.set(query, response_data, deep_mode)
+    return response_data
+
 @app.post("/search", response_model=SearchResponse)
 async def search(request: SearchRequest):
     """
@@ -82,30 +169,28 @@ async def search(request: SearchRequest):
         cached_result = search_cache.get(request.query, request.deep_mode)
         if cached_result:
             logger.info(f"Cache hit for: {request.query}")
-            return SearchResponse(**cached_result)
-        
-        logger.info(f"Cache miss, searching: {request.query} (deep_mode={request.deep_mode})")
+            # The entry may come from another user's (equivalent) wording
+            return SearchResponse(**{**cached_result, "query": request.query})
         
-        # Add health context to query for better results
-        enhanced_query = f"{request.query} site:nih.gov OR site:who.int OR site:mayoclinic.org OR site:cdc.gov OR site:ncbi.nlm.nih.gov"
-        
-        # Perform search
-        result = search_agent.forward(
-            enhanced_query if not request.deep_mode else request.query
+        key = search_cache.cache_key(request.query, request.deep_mode)
+        deadline = DEEP_SEARCH_TIMEOUT_S if request.deep_mode else SEARCH_TIMEOUT_S
+        response_data = await asyncio.wait_for(
+            search_flight.do(key, lambda: _run_search(request.query, request.deep_mode)),
+            timeout=deadline
         )
         
-        response_data = {
-            "query": request.query,
-            "result": result,
-            "sources": [],
-            "mode": "deep" if request.deep_mode else "quick"
-        }
-        
-        # Cache the result
-        search_cache.set(request.query, response_data, request.deep_mode)
-        
-        return SearchResponse(**response_data)
+        return SearchResponse(**{**response_data, "query": request.query})
         
+    except SearchPoolFull as e:
+        logger.warning(f"Search rejected, pool saturated: {e}")
+        raise HTTPException(
+            status_code=429,
+            detail="Search service is busy. Please retry shortly.",
+            headers={"Retry-After": "5"}
+        )
+    except asyncio.TimeoutError:
+        logger.warning(f"Search deadline exceeded for: {request.query}")
+        raise HTTPException(status_code=504, detail="Search timed out. Please try again.")
     except Exception as e:
         logger.error(f"Search error: {e}")
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
@@ -137,7 +222,7 @@ if __name__ == "__main__":
 @app.get("/cache/stats")
 async def cache_stats():
     """Get cache statistics"""
-    return search_cache.get_stats()
+    return {**search_cache.get_stats(), "single_flight": search_flight.get_stats()}
 
 @app.post("/cache/clear")
 async def clear_cache():
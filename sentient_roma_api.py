@@ -121,7 +121,7 @@ async def weekly_report(payload: WeeklyData):
     
     try:
         start_time = time.time()
-        result = roma_runner.run_weekly(payload.data)
+        result = await roma_runner.arun_weekly(payload.data)
         execution_time = time.time() - start_time
         
         # Add execution metadata
@@ -155,7 +155,7 @@ async def analyze(entry: HealthEntry):
         # Convert HealthEntry to dict
         entry_data = entry.dict(exclude_none=True)
         
-        result = roma_runner.analyze_single(entry_data)
+        result = await roma_runner.aanalyze_single(entry_data)
         
         return {
             "analysis": result,
@@ -184,7 +184,7 @@ async def chat(message: ChatMessage):
             "context": message.context or ""
         }
         
-        result = roma_runner.chat(chat_data)
+        result = await roma_runner.achat(chat_data)
         
         return {
             "chat_response": result,
@@ -212,7 +212,7 @@ async def normalize(payload: WeeklyData):
         from roma_agents.sentient_health_agents import DataIngestionAgent
         
         ingestion_agent = DataIngestionAgent()
-        result = ingestion_agent.run({"data": payload.data})
+        result = await ingestion_agent.arun({"data": payload.data})
         
         return {
             "normalized_data": result.get("normalized_data", {}),
@@ -283,7 +283,7 @@ async def test_roma():
     
     try:
         start_time = time.time()
-        result = roma_runner.run_weekly(test_data)
+        result = await roma_runner.arun_weekly(test_data)
         test_time = time.time() - start_time
         
         return {
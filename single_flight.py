@@ -0,0 +1,51 @@
+"""
+Single-flight request coalescing
+
+Concurrent callers asking for the same key share one in-flight call instead of
+each hitting the upstream. The shared call runs as its own task, so a caller
+that disconnects (is cancelled) does not cancel the work for the others.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+class SingleFlight:
+    """
+    Deduplicates concurrent async calls by key
+    """
+
+    def __init__(self, name: str = "single_flight"):
+        self.name = name
+        self.inflight: Dict[str, asyncio.Task] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn() once per key at a time; concurrent callers await the same result"""
+        task = self.inflight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(fn())
+            self.inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._finish(k, t))
+        else:
+            self.shared += 1
+            logger.info(f"{self.name}: joining in-flight call for {key!r}")
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        if self.inflight.get(key) is task:
+            del self.inflight[key]
+        # Mark the exception retrieved even if every waiter went away
+        if not task.cancelled():
+            task.exception()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self.inflight),
+            "upstream_calls": self.calls,
+            "coalesced_requests": self.shared,
+        }
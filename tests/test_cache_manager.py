@@ -0,0 +1,124 @@
+# tests/test_cache_manager.py
+import time
+from cache_manager import SearchCache, canonicalize_query
+
+class TestSearchCache:
+    def test_lru_eviction_by_entries(self):
+        cache = SearchCache(max_entries=2)
+        cache.set("a", {"result": "A"})
+        cache.set("b", {"result": "B"})
+        assert cache.get("a") == {"result": "A"}  # "a" becomes most recent
+        cache.set("c", {"result": "C"})
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_byte_budget(self):
+        cache = SearchCache(max_entries=100, max_bytes=60)
+        cache.set("a", {"result": "x" * 20})
+        cache.set("b", {"result": "y" * 20})
+
+        stats = cache.get_stats()
+        assert stats["bytes"] <= 60
+        assert stats["total_entries"] == 1
+
+    def test_sweep_drops_expired(self):
+        cache = SearchCache()
+        cache.set("a", {"result": "A"})
+        cache.ttl_seconds = 0
+        time.sleep(0.01)
+
+        assert cache.sweep_expired() == 1
+        assert cache.get_stats()["bytes"] == 0
+
+    def test_clear_empties_near_duplicate_index(self):
+        cache = SearchCache()
+        cache.set("foods for deep sleep", {"result": "A"})
+        cache.set("morning walk benefits", {"result": "B"})
+        cache.clear()
+
+        assert cache.near_index.entries == {}
+        assert cache.near_index.buckets == {}
+        assert cache.get("foods for deep sleep") is None
+
+    def test_hit_rate(self):
+        cache = SearchCache()
+        cache.set("a", {"result": "A"})
+        cache.get("a")
+        cache.get("missing")
+
+        assert cache.get_stats()["hit_rate"] == 0.5
+
+    def test_persistent_tier_survives_restart(self, tmp_path):
+        db_path = str(tmp_path / "cache.sqlite")
+        SearchCache(db_path=db_path).set("how to sleep better", {"result": "R"})
+
+        restarted = SearchCache(db_path=db_path)
+        assert restarted.get("how to sleep better") == {"result": "R"}
+        assert restarted.get_stats()["disk_hits"] == 1
+
+class TestQueryCanonicalization:
+    def test_synonyms_and_stopwords_fold_to_same_key(self):
+        assert canonicalize_query("how to improve HRV") == canonicalize_query(
+            "how can I improve my heart rate variability"
+        )
+        assert canonicalize_query("how to lower resting heart rate") == canonicalize_query(
+            "How to lower my resting HR?"
+        )
+
+    def test_different_meanings_do_not_collide(self):
+        pairs = [
+            ("how to rest after a workout", "how to sleep after a workout"),
+            ("daily water intake", "water intake during the day"),
+            ("how to increase heart rate", "how to improve heart rate"),
+            ("why did my HRV drop", "how to reduce HRV"),
+            ("daily step goal", "daily walk goal"),
+            ("good cholesterol foods", "cholesterol foods"),
+            ("sleep more", "sleep less"),
+            ("how many steps", "steps"),
+        ]
+        for first, second in pairs:
+            assert canonicalize_query(first) != canonicalize_query(second), (first, second)
+
+    def test_question_words_keep_questions_apart(self):
+        questions = ["how to sleep", "why sleep", "when should I sleep", "what is sleep",
+                     "how much sleep do I need", "best way to sleep", "sleep tips", "sleep more", "sleep"]
+        keys = [canonicalize_query(q) for q in questions]
+        assert len(set(keys)) == len(questions), dict(zip(questions, keys))
+
+    def test_filler_words_still_fold(self):
+        assert canonicalize_query("how do I sleep") == canonicalize_query("how to sleep")
+        assert canonicalize_query("please tell me why sleep") == canonicalize_query("why sleep")
+
+    def test_different_meanings_miss_cache(self):
+        cache = SearchCache()
+        cache.set("best rest routine for runners", {"result": "R"})
+        cache.set("how to increase resting heart rate", {"result": "H"})
+
+        assert cache.get("best sleep routine for runners") is None
+        assert cache.get("how to improve resting heart rate") is None
+        assert cache.get("how to boost resting heart rate") == {"result": "H"}
+
+    def test_question_kind_misses_cache(self):
+        cache = SearchCache()
+        cache.set("how much sleep do I need", {"result": "amount"})
+
+        assert cache.get("why do I need sleep") is None
+        assert cache.get("how much sleep") is None
+        assert cache.get("How much sleep do I need?") == {"result": "amount"}
+
+    def test_paraphrase_hits_cache(self):
+        cache = SearchCache()
+        cache.set("how to improve HRV", {"result": "R"})
+
+        assert cache.get("How can I improve my heart rate variability?") == {"result": "R"}
+        assert cache.get("how to improve HRV", deep_mode=True) is None
+
+    def test_near_duplicate_within_threshold(self):
+        cache = SearchCache(similarity_threshold=0.75)
+        cache.set("best foods for deep sleep recovery after marathon", {"result": "R"})
+
+        assert cache.get("foods for deep sleep recovery after a marathon race") == {"result": "R"}
+        assert cache.get_stats()["near_duplicate_hits"] == 1
+        assert cache.get("marathon pacing strategy") is None
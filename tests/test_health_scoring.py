@@ -0,0 +1,25 @@
+# tests/test_health_scoring.py
+import numpy as np
+from health_scoring import activity_score, columns, recovery_assessment, target_scores, weekly_scores
+
+class TestHealthScoring:
+    def test_scalar_and_batch_agree(self):
+        rows = [{"steps": 70000, "sleep_hours": 49, "workouts": 3, "water_liters": 10},
+                {"steps": "bad", "sleep_hours": None}]
+        cols = columns(rows, ["steps", "sleep_hours", "workouts", "water_liters"])
+        batch = weekly_scores(cols["steps"], cols["sleep_hours"], cols["workouts"], cols["water_liters"])
+        single = weekly_scores(70000, 49, 3, 10)
+        assert float(batch["overall"][0]) == float(single["overall"])
+        assert float(batch["overall"][1]) == 0.0
+
+    def test_target_scores_truncate_like_ints(self):
+        scores = target_scores(35000, 55.9, 5, 7)
+        assert {k: int(v) for k, v in scores.items()} == {
+            "steps": 50, "sleep": 99, "workouts": 100, "hydration": 50, "overall": 74}
+        assert float(activity_score(12000, 4)) == 100.0
+
+    def test_recovery_missing_values_are_not_flagged(self):
+        result = recovery_assessment([85, np.nan], [40, np.nan], [np.nan, 9000], [np.nan, 2])
+        assert result["flags"]["resting_hr_high"].tolist() == [True, False]
+        assert result["flags"]["calories_low"].tolist() == [False, True]
+        assert result["score"].tolist() == [50, 50]
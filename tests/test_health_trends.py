@@ -0,0 +1,36 @@
+# tests/test_health_trends.py
+from datetime import date, timedelta
+from health_trends import RollingAggregate, trend_lines
+
+class TestRollingAggregate:
+    def test_windows_slide_and_survive_state_roundtrip(self):
+        agg = RollingAggregate("steps")
+        start = date(2025, 1, 1)
+        for i in range(30):
+            agg.update(start + timedelta(days=i), 1000 * (i + 1))
+            agg = RollingAggregate("steps", agg.to_state())
+        snap = agg.snapshot()
+        assert snap["as_of"] == "2025-01-30"
+        assert snap["mean_7d"] == 27000.0          # days 24-30
+        assert snap["prev_7d_mean"] == 20000.0     # days 17-23
+        assert snap["wow_delta"] == 7000.0
+        assert snap["days_28d"] == 28
+        assert "baseline" not in snap
+
+    def test_corrections_and_stale_samples(self):
+        agg = RollingAggregate("hrv")
+        today = date(2025, 3, 1)
+        agg.update(today, 40)
+        agg.update(today, 60)                       # re-sent day replaces, baseline re-applied
+        assert agg.snapshot()["mean_7d"] == 60.0
+        assert agg.snapshot()["baseline"] == 60.0
+        assert agg.update(today - timedelta(days=40), 10) is False
+        assert trend_lines({"hrv": agg.snapshot()}, today=today) == ["HRV: 7-day avg 60, 28-day avg 60, baseline 60"]
+
+    def test_stale_trends_are_labelled_or_dropped(self):
+        agg = RollingAggregate("steps")
+        agg.update(date(2025, 3, 1), 8000)
+        trends = {"steps": agg.snapshot()}
+        assert trend_lines(trends, today=date(2025, 3, 7)) == ["Steps: 7-day avg 8000, 28-day avg 8000"]
+        assert trend_lines(trends, today=date(2025, 3, 10)) == ["Steps (as of 2025-03-01): 7-day avg 8000, 28-day avg 8000"]
+        assert trend_lines(trends, today=date(2025, 3, 29)) == []
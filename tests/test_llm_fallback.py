@@ -0,0 +1,71 @@
+# tests/test_llm_fallback.py
+import pytest
+
+litellm = pytest.importorskip("litellm")
+from collections import deque
+from llm_fallback import (CircuitBreaker, LLM_HEDGE_MIN_SAMPLES, LLM_QUOTA_COOLDOWN_S,
+                          LLM_RATE_LIMIT_COOLDOWN_S, LLMFallback, classify_error)
+
+class ProviderError(Exception):
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.status_code = status_code
+
+PROVIDER = {"name": "openrouter", "model": "m", "api_key": "k", "base_url": None, "timeout": 30.0}
+
+def fallback_with(*providers):
+    fallback = LLMFallback.__new__(LLMFallback)
+    fallback.providers = list(providers)
+    fallback.latencies = {p["name"]: deque(maxlen=100) for p in providers}
+    fallback.breakers = {p["name"]: CircuitBreaker(p["name"], p["timeout"]) for p in providers}
+    return fallback
+
+def breaker_after(error):
+    fallback = LLMFallback.__new__(LLMFallback)
+    fallback.breakers = {"openrouter": CircuitBreaker("openrouter", 30.0)}
+    fallback._record_failure(PROVIDER, error)
+    return fallback.breakers["openrouter"]
+
+class TestErrorClassification:
+    def test_context_length_error_is_an_ordinary_failure(self):
+        error = litellm.ContextWindowExceededError(
+            message="This model's maximum context length exceeded", model="gpt-4o-mini", llm_provider="openai")
+        assert classify_error(error) is None
+        assert breaker_after(error).state == "closed"
+
+    def test_keywords_in_other_errors_do_not_open_the_breaker(self):
+        for message in ("insufficient permissions for this model", "billing address missing", "token limit exceeded"):
+            error = ProviderError(message, 400)
+            assert classify_error(error) is None
+            assert breaker_after(error).state == "closed"
+
+    def test_rate_limit_gets_short_cooldown(self):
+        breaker = breaker_after(ProviderError("Too many requests", 429))
+        assert breaker.state == "open"
+        assert breaker.cooldown == LLM_RATE_LIMIT_COOLDOWN_S
+
+    def test_billing_errors_get_long_cooldown(self):
+        assert classify_error(ProviderError("Payment required", 402)) == "billing"
+        breaker = breaker_after(ProviderError("You exceeded your current quota (insufficient_quota)", 429))
+        assert breaker.state == "open"
+        assert breaker.cooldown == LLM_QUOTA_COOLDOWN_S
+
+class TestHedging:
+    def test_no_hedge_until_enough_latency_samples(self):
+        fallback = fallback_with(dict(PROVIDER, cost_per_1k=0.0001))
+        fallback.latencies["openrouter"].extend([1.0] * (LLM_HEDGE_MIN_SAMPLES - 1))
+        assert fallback.hedge_delay(PROVIDER) is None
+        fallback.latencies["openrouter"].append(1.0)
+        assert fallback.hedge_delay(PROVIDER) == 1.0
+
+    def test_hedge_never_moves_to_a_pricier_provider(self):
+        cheap = dict(PROVIDER, cost_per_1k=0.0001)
+        premium = dict(PROVIDER, name="premium", cost_per_1k=0.003)
+        other_cheap = dict(PROVIDER, name="local", cost_per_1k=0.0)
+        fallback = fallback_with(cheap, premium, other_cheap)
+        fallback.latencies["openrouter"].extend([1.0] * LLM_HEDGE_MIN_SAMPLES)
+
+        remaining = [premium, other_cheap]
+        assert fallback._hedge_after(cheap, [premium]) is None
+        assert fallback._take_provider(remaining, max_cost=cheap["cost_per_1k"]) is other_cheap
+        assert remaining == [premium]
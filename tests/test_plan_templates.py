@@ -0,0 +1,57 @@
+# tests/test_plan_templates.py
+from roma_engine.plan_templates import PlanTemplateRegistry
+
+PLAN = [
+    {"id": "a", "kind": "ingest", "depends_on": []},
+    {"id": "b", "kind": "coach", "depends_on": ["a"], "data": {"message": "hi"}},
+]
+WEEK = {"steps": 70000, "sleep_hours": 49, "workouts": 3, "water_liters": 14}
+
+class TestPlanTemplateRegistry:
+    def test_template_fills_task_data(self):
+        registry = PlanTemplateRegistry(enabled=True)
+        registry.register("weekly", PLAN, requires=["steps", "sleep_hours"])
+
+        hit = registry.lookup({"kind": "weekly", "data": WEEK})
+        assert hit["atomic"] is False
+        assert hit["plan"][0]["data"] == WEEK
+        assert hit["plan"][1]["data"] == {"message": "hi"}
+
+    def test_missing_required_fields_falls_back_to_llm(self):
+        registry = PlanTemplateRegistry(enabled=True)
+        registry.register("weekly", PLAN, requires=["steps", "sleep_hours"])
+
+        assert registry.lookup({"kind": "weekly", "data": {"notes": "tired"}}) is None
+        assert registry.get_stats()["misses"] == 1
+
+    def test_learned_plan_reused_for_same_schema(self):
+        registry = PlanTemplateRegistry(enabled=True)
+        task = {"kind": "novel", "data": WEEK}
+        registry.remember(task, atomic=False, plan=[dict(s, data=WEEK) for s in PLAN[:1]])
+
+        other_week = dict(WEEK, steps=1000)
+        hit = registry.lookup({"kind": "novel", "data": other_week})
+        assert hit["source"] == "learned"
+        assert hit["plan"][0]["data"] == other_week
+        assert registry.lookup({"kind": "novel", "data": {"steps": 1}}) is None
+
+    def test_learned_plan_never_replays_subtask_data(self):
+        registry = PlanTemplateRegistry(enabled=True)
+        user_a = dict(WEEK, steps=3200)
+        plan = [
+            {"id": "a", "kind": "metrics", "depends_on": [], "data": {"steps": 3200, "threshold": 5000}},
+            {"id": "b", "kind": "coach", "depends_on": ["a"], "data": {"message": "only 3200 steps"}},
+        ]
+        registry.remember({"kind": "novel", "data": user_a}, atomic=False, plan=plan)
+
+        user_b = dict(WEEK, steps=12000)
+        hit = registry.lookup({"kind": "novel", "data": user_b})
+        assert [s["data"] for s in hit["plan"]] == [user_b, user_b]
+        assert "3200" not in repr(hit["plan"])
+
+    def test_learned_entries_expire(self):
+        registry = PlanTemplateRegistry(enabled=True, ttl_s=0)
+        registry.remember({"kind": "novel", "data": WEEK}, atomic=True)
+
+        assert registry.lookup({"kind": "novel", "data": WEEK}) is None
+        assert registry.get_stats()["learned_shapes"] == 0
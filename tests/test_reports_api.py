@@ -0,0 +1,47 @@
+# tests/test_reports_api.py
+import os
+import tempfile
+import pytest
+
+pytest.importorskip("fastapi")
+os.environ["DB_URL"] = f"sqlite:///{tempfile.mkdtemp()}/reports.db"
+os.environ["API_KEY"] = ""
+from fastapi.testclient import TestClient
+import main
+
+client = TestClient(main.app)
+
+@pytest.fixture(scope="module", autouse=True)
+def reports():
+    for i in range(3):
+        r = client.post("/reports", json={"kind": "weekly", "input": {"n": i}, "output_text": f"report {i}", "metrics": {"score": i}})
+        assert r.status_code == 200
+
+class TestListReports:
+    def test_projection_returns_only_requested_fields(self):
+        r = client.get("/reports", params={"fields": "id,kind", "limit": 2})
+        assert r.status_code == 200
+        assert [set(item) for item in r.json()] == [{"id", "kind"}] * 2
+        assert "X-Next-Cursor" in r.headers
+
+        rest = client.get("/reports", params={"fields": "id,kind", "limit": 2, "cursor": r.headers["X-Next-Cursor"]})
+        assert len(rest.json()) == 1
+        assert "X-Next-Cursor" not in rest.headers
+        assert client.get("/reports", params={"fields": "id,secret"}).status_code == 400
+
+    def test_etag_answers_304_until_the_page_changes(self):
+        first = client.get("/reports", params={"limit": 2})
+        etag = first.headers["ETag"]
+        again = client.get("/reports", params={"limit": 2}, headers={"If-None-Match": etag})
+        assert again.status_code == 304
+        assert again.content == b""
+
+        assert client.get("/reports", params={"limit": 2, "fields": "id"}, headers={"If-None-Match": etag}).status_code == 200
+        client.post("/reports", json={"kind": "weekly", "output_text": "newer"})
+        assert client.get("/reports", params={"limit": 2}, headers={"If-None-Match": etag}).status_code == 200
+
+    def test_openapi_documents_projection_and_cursor(self):
+        op = client.get("/openapi.json").json()["paths"]["/reports"]["get"]["responses"]
+        assert op["200"]["content"]["application/json"]["schema"]["items"]["$ref"].endswith("/ReportFieldsOut")
+        assert "X-Next-Cursor" in op["200"]["headers"]
+        assert "304" in op
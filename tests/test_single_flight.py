@@ -0,0 +1,36 @@
+# tests/test_single_flight.py
+import asyncio
+from single_flight import SingleFlight
+
+class TestSingleFlight:
+    def test_concurrent_callers_share_one_call(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"result": "R"}
+
+        async def burst():
+            return await asyncio.gather(*[flight.do("hrv improve:False", fetch) for _ in range(5)])
+
+        results = asyncio.run(burst())
+        assert results == [{"result": "R"}] * 5
+        assert len(calls) == 1
+        assert flight.get_stats()["coalesced_requests"] == 4
+
+    def test_errors_propagate_and_key_is_released(self):
+        flight = SingleFlight()
+
+        async def failing():
+            raise RuntimeError("upstream down")
+
+        async def run():
+            try:
+                await flight.do("k", failing)
+            except RuntimeError:
+                pass
+            return flight.get_stats()["in_flight"]
+
+        assert asyncio.run(run()) == 0
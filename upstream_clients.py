@@ -0,0 +1,125 @@
+"""
+Pooled HTTP clients for upstream services
+
+One long-lived httpx.AsyncClient per upstream (roma, search, ...) so requests
+reuse keep-alive connections instead of paying a new TCP/TLS handshake each time.
+Clients are opened and closed by the app lifespan.
+"""
+
+import os
+import logging
+from typing import Dict, Any, Optional
+import httpx
+
+# HTTP/2 needs the optional `h2` package (pip install "httpx[http2]")
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+class UpstreamClients:
+    """
+    Registry of pooled AsyncClients, one per named upstream
+    """
+
+    def __init__(self):
+        self.configs: Dict[str, Dict[str, Any]] = {}
+        self.clients: Dict[str, httpx.AsyncClient] = {}
+
+    def register(
+        self,
+        name: str,
+        base_url: str,
+        timeout: float = 30.0,
+        connect_timeout: float = 5.0,
+        max_connections: int = 50,
+        max_keepalive: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: Optional[bool] = None,
+    ) -> None:
+        """
+        Register an upstream. Limits can be overridden per upstream via env,
+        e.g. SEARCH_MAX_CONNECTIONS, SEARCH_TIMEOUT, SEARCH_HTTP2.
+
+        HTTP/2 defaults to on only for https upstreams (negotiated via ALPN);
+        plain-http services such as the internal roma/search containers stay on HTTP/1.1.
+        """
+        prefix = name.upper()
+        if http2 is None:
+            http2 = os.getenv(f"{prefix}_HTTP2", str(base_url.startswith("https://"))).lower() == "true"
+        if http2 and not HTTP2_AVAILABLE:
+            logger.warning(f"HTTP/2 requested for {name} but 'h2' is not installed, using HTTP/1.1")
+            http2 = False
+
+        self.configs[name] = {
+            "base_url": base_url,
+            "timeout": _env_number(f"{prefix}_TIMEOUT", timeout),
+            "connect_timeout": _env_number(f"{prefix}_CONNECT_TIMEOUT", connect_timeout),
+            "max_connections": int(_env_number(f"{prefix}_MAX_CONNECTIONS", max_connections)),
+            "max_keepalive": int(_env_number(f"{prefix}_MAX_KEEPALIVE", max_keepalive)),
+            "keepalive_expiry": _env_number(f"{prefix}_KEEPALIVE_EXPIRY", keepalive_expiry),
+            "http2": http2,
+        }
+
+    def _build(self, name: str) -> httpx.AsyncClient:
+        cfg = self.configs[name]
+        return httpx.AsyncClient(
+            base_url=cfg["base_url"],
+            timeout=httpx.Timeout(cfg["timeout"], connect=cfg["connect_timeout"]),
+            limits=httpx.Limits(
+                max_connections=cfg["max_connections"],
+                max_keepalive_connections=cfg["max_keepalive"],
+                keepalive_expiry=cfg["keepalive_expiry"],
+            ),
+            http2=cfg["http2"],
+        )
+
+    async def start(self) -> None:
+        """Open a client for every registered upstream"""
+        for name in self.configs:
+            if name not in self.clients:
+                self.clients[name] = self._build(name)
+        logger.info(f"Opened pooled clients for: {', '.join(self.clients) or 'none'}")
+
+    async def aclose(self) -> None:
+        """Close all clients and release pooled connections"""
+        for name, client in list(self.clients.items()):
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Error closing client for {name}: {e}")
+        self.clients.clear()
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        """
+        Return the pooled client for an upstream
+
+        Clients are created lazily if the lifespan has not started them
+        (e.g. when the app is driven without startup events).
+        """
+        client = self.clients.get(name)
+        if client is None or client.is_closed:
+            if name not in self.configs:
+                raise KeyError(f"Unknown upstream: {name}")
+            client = self._build(name)
+            self.clients[name] = client
+        return client
+
+    def get_status(self) -> Dict[str, Any]:
+        """Per-upstream pool configuration"""
+        return {
+            name: {**cfg, "open": name in self.clients and not self.clients[name].is_closed}
+            for name, cfg in self.configs.items()
+        }
+
+# Global instance for easy access
+upstream_clients = UpstreamClients()
@@ -0,0 +1,159 @@
+"""
+Upstream Health Monitor
+
+Keeps a cached availability flag per upstream so request handlers can check
+liveness in O(1) without doing I/O. A background probe refreshes each upstream
+every `interval` seconds, and callers report the outcome of real calls
+(passive detection) so a failing upstream is marked down immediately.
+"""
+
+import asyncio
+import inspect
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+Probe = Callable[[], Union[bool, Awaitable[bool]]]
+
+class UpstreamHealthMonitor:
+    """
+    Per-upstream availability with TTL and passive failure detection
+
+    State older than `ttl` seconds is treated as unknown, and unknown upstreams
+    are reported available so the real call can decide (and mark them down).
+    """
+
+    def __init__(self, interval: float = 10.0, ttl: float = 30.0, failure_threshold: int = 1):
+        self.interval = interval
+        self.ttl = ttl
+        self.failure_threshold = max(1, failure_threshold)
+        self.probes: Dict[str, Probe] = {}
+        self.state: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+
+    def register(self, name: str, probe: Probe) -> None:
+        """Register an upstream with a probe returning True when it is healthy"""
+        self.probes[name] = probe
+        self.state.setdefault(name, {
+            "available": None,
+            "checked_at": 0.0,
+            "consecutive_failures": 0,
+            "last_error": None,
+            "source": None,
+        })
+
+    # ---- O(1) reads ----
+    def is_available(self, name: str) -> bool:
+        """Cached availability; no I/O"""
+        st = self.state.get(name)
+        if not st or st["available"] is None:
+            return True
+        if time.time() - st["checked_at"] > self.ttl:
+            return True
+        return st["available"]
+
+    # ---- Passive detection ----
+    def mark_success(self, name: str, source: str = "call") -> None:
+        with self._lock:
+            st = self.state.setdefault(name, {})
+            st.update(available=True, checked_at=time.time(), consecutive_failures=0,
+                      last_error=None, source=source)
+
+    def mark_failure(self, name: str, error: Optional[str] = None, source: str = "call") -> None:
+        with self._lock:
+            st = self.state.setdefault(name, {"consecutive_failures": 0})
+            failures = st.get("consecutive_failures", 0) + 1
+            was_available = st.get("available")
+            st.update(consecutive_failures=failures, checked_at=time.time(),
+                      last_error=error, source=source)
+            if failures >= self.failure_threshold:
+                st["available"] = False
+                if was_available is not False:
+                    logger.warning(f"Upstream {name} marked down ({source}): {error}")
+
+    def _record(self, name: str, ok: bool, error: Optional[str] = None) -> None:
+        if ok:
+            self.mark_success(name, source="probe")
+        else:
+            self.mark_failure(name, error or "probe failed", source="probe")
+
+    # ---- Active probing ----
+    async def check_now(self, name: str) -> bool:
+        """Run one probe immediately (async probes may be awaited, sync ones run in a thread)"""
+        probe = self.probes[name]
+        try:
+            if inspect.iscoroutinefunction(probe):
+                ok = bool(await probe())
+            else:
+                ok = bool(await asyncio.to_thread(probe))
+            self._record(name, ok)
+        except Exception as e:
+            ok = False
+            self._record(name, False, str(e))
+        return ok
+
+    def check_now_sync(self, name: str) -> bool:
+        """Run one synchronous probe immediately"""
+        try:
+            ok = bool(self.probes[name]())
+            self._record(name, ok)
+        except Exception as e:
+            ok = False
+            self._record(name, False, str(e))
+        return ok
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.gather(*(self.check_now(n) for n in list(self.probes)), return_exceptions=True)
+            await asyncio.sleep(self.interval)
+
+    async def start(self) -> None:
+        """Start probing on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def start_thread(self) -> None:
+        """Start probing from a daemon thread (for synchronous services)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+
+        def run():
+            while not self._stop_event.is_set():
+                for name in list(self.probes):
+                    self.check_now_sync(name)
+                self._stop_event.wait(self.interval)
+
+        self._thread = threading.Thread(target=run, name="upstream-health", daemon=True)
+        self._thread.start()
+
+    def stop_thread(self) -> None:
+        self._stop_event.set()
+
+    def get_status(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            name: {
+                "available": self.is_available(name),
+                "age_seconds": round(now - st.get("checked_at", 0.0), 1) if st.get("checked_at") else None,
+                "consecutive_failures": st.get("consecutive_failures", 0),
+                "last_error": st.get("last_error"),
+                "source": st.get("source"),
+            }
+            for name, st in self.state.items()
+        }